@@ -0,0 +1,86 @@
+"""add persons full_name trigram index
+
+Revision ID: 8c4f1a2b6d13
+Revises: 5b1e2c7d9a40
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c4f1a2b6d13"
+down_revision: Union[str, None] = "5b1e2c7d9a40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Размер пачки бэкфилла: каждая пачка - отдельная короткая транзакция
+BACKFILL_BATCH_SIZE = 5000
+
+FULL_NAME_FUNCTION = """
+CREATE OR REPLACE FUNCTION persons_set_full_name() RETURNS trigger AS $$
+BEGIN
+    NEW.full_name := lower(NEW.first_name || ' ' || NEW.last_name);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+FULL_NAME_TRIGGER = """
+CREATE TRIGGER persons_set_full_name
+BEFORE INSERT OR UPDATE OF first_name, last_name ON persons
+FOR EACH ROW EXECUTE FUNCTION persons_set_full_name()
+"""
+BACKFILL = sa.text(
+    """
+    UPDATE persons SET full_name = lower(first_name || ' ' || last_name)
+    WHERE id IN (
+        SELECT id FROM persons WHERE full_name IS NULL ORDER BY id LIMIT :limit
+    )
+    """
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Обычная nullable-колонка добавляется без перезаписи таблицы: ACCESS
+    # EXCLUSIVE держится только на изменение каталога. Триггер создается в той же
+    # транзакции, поэтому новые и измененные строки заполняются сразу
+    op.add_column(
+        "persons",
+        sa.Column("full_name", sa.String(length=511), nullable=True),
+    )
+    op.execute(FULL_NAME_FUNCTION)
+    op.execute(FULL_NAME_TRIGGER)
+    with op.get_context().autocommit_block():
+        # Существующие строки - пачками, каждая блокирует только свои строки
+        bind = op.get_bind()
+        while bind.execute(BACKFILL, {"limit": BACKFILL_BATCH_SIZE}).rowcount:
+            pass
+        # На большой таблице индекс строим без блокировки записи
+        op.create_index(
+            "ix_persons_full_name_trgm",
+            "persons",
+            ["full_name"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_persons_full_name_trgm",
+            table_name="persons",
+            postgresql_concurrently=True,
+        )
+    op.execute("DROP TRIGGER IF EXISTS persons_set_full_name ON persons")
+    op.execute("DROP FUNCTION IF EXISTS persons_set_full_name()")
+    op.drop_column("persons", "full_name")
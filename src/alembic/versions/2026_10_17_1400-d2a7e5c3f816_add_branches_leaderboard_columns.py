@@ -0,0 +1,69 @@
+"""add branches votes_count and rating
+
+Revision ID: d2a7e5c3f816
+Revises: 8c4f1a2b6d13
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a7e5c3f816"
+down_revision: Union[str, None] = "8c4f1a2b6d13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VOTES_COUNT_SQL = (
+    "rating_1_count + rating_2_count + rating_3_count + rating_4_count + rating_5_count"
+)
+RATING_SQL = (
+    f"CASE WHEN ({VOTES_COUNT_SQL}) = 0 THEN 0 "
+    "ELSE (1 * rating_1_count + 2 * rating_2_count + 3 * rating_3_count"
+    f" + 4 * rating_4_count + 5 * rating_5_count)::float / ({VOTES_COUNT_SQL}) END"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "branches",
+        sa.Column(
+            "votes_count",
+            sa.Integer(),
+            sa.Computed(VOTES_COUNT_SQL, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.add_column(
+        "branches",
+        sa.Column(
+            "rating",
+            sa.Float(),
+            sa.Computed(RATING_SQL, persisted=True),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_branches_votes_count",
+            "branches",
+            [sa.text("votes_count DESC"), "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_branches_votes_count",
+            table_name="branches",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("branches", "rating")
+    op.drop_column("branches", "votes_count")
@@ -0,0 +1,49 @@
+"""add feedback flushes
+
+Revision ID: e4b9c1f7a2d8
+Revises: d2a7e5c3f816
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4b9c1f7a2d8"
+down_revision: Union[str, None] = "d2a7e5c3f816"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "feedback_flushes",
+        sa.Column("flush_id", sa.String(length=32), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("deleted_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("is_deleted", sa.Boolean(), server_default="false", nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_feedback_flushes")),
+    )
+    op.create_index(
+        op.f("ix_feedback_flushes_flush_id"),
+        "feedback_flushes",
+        ["flush_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_feedback_flushes_flush_id"), table_name="feedback_flushes")
+    op.drop_table("feedback_flushes")
@@ -1,9 +1,12 @@
 __all__ = [
+    "CursorPageParams",
+    "PageParams",
     "get_current_active_auth_user",
     "get_current_auth_user",
     "get_current_superuser",
 ]
 
+from .pagination import CursorPageParams, PageParams
 from .user import (
     get_current_active_auth_user,
     get_current_auth_user,
@@ -0,0 +1,32 @@
+from fastapi import Query
+
+from app.schemas import CountStrategy
+
+
+class PageParams:
+    """Query-параметры постраничного списка: `params: PageParams = Depends()`."""
+
+    def __init__(
+        self,
+        page: int = Query(1, ge=1),
+        page_size: int = Query(10, ge=1),
+        count_strategy: CountStrategy = Query(CountStrategy.EXACT),
+    ) -> None:
+        self.page = page
+        self.page_size = page_size
+        self.count_strategy = count_strategy
+
+
+class CursorPageParams(PageParams):
+    def __init__(
+        self,
+        page: int = Query(1, ge=1),
+        page_size: int = Query(10, ge=1),
+        count_strategy: CountStrategy = Query(CountStrategy.EXACT),
+        cursor: str | None = Query(
+            None,
+            description="Курсор из pagination.next_cursor/prev_cursor; если передан, page игнорируется",
+        ),
+    ) -> None:
+        super().__init__(page, page_size, count_strategy)
+        self.cursor = cursor
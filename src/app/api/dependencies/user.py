@@ -14,7 +14,7 @@ from app.core.auth.validation import (
     get_user_by_token_sub,
     validate_token_type,
 )
-from app.core.db import db_helper
+from app.core.db import SessionDep
 from app.core.exceptions.http_exceptions import (
     ForbiddenException,
     UnauthorizedException,
@@ -31,7 +31,7 @@ class UserGetterFromToken:
     async def __call__(
         self,
         payload: dict = Depends(get_current_token_payload),
-        session: AsyncSession = Depends(db_helper.session_getter),
+        session: AsyncSession = SessionDep,
     ):
         validate_token_type(payload, self.token_type)
         user = await get_user_by_token_sub(session, payload)
@@ -67,7 +67,7 @@ async def get_current_superuser(
 
 async def get_optional_user(
     payload: dict = Depends(get_current_token_payload),
-    session: AsyncSession = Depends(db_helper.session_getter),
+    session: AsyncSession = SessionDep,
 ) -> dict | None:
     try:
         validate_token_type(payload, ACCESS_TOKEN_TYPE)
@@ -93,7 +93,7 @@ async def get_optional_user(
 
 async def get_optional_active_auth_user(
     payload: dict = Depends(get_current_token_payload_for_optional_user),
-    session: AsyncSession = Depends(db_helper.session_getter),
+    session: AsyncSession = SessionDep,
 ) -> dict | None:
     try:
         if not payload:
@@ -4,6 +4,7 @@ from app.core.config import settings
 
 from .auth import router as auth_router
 from .department import router as department_router
+from .exports import router as exports_router
 from .feedback import router as feedback_router
 from .person import router as person_router
 from .role import router as role_router
@@ -37,3 +38,6 @@ router.include_router(
 router.include_router(
     role_router,
 )
+router.include_router(
+    exports_router,
+)
@@ -12,7 +12,7 @@ from app.core.auth import (
     validate_token_type,
 )
 from app.core.config import settings
-from app.core.db import SessionDep, TransactionSessionDep
+from app.core.db import RequestSessionRoute, SessionDep, TransactionSessionDep
 from app.core.exceptions import (
     UnauthorizedException,
 )
@@ -28,6 +28,7 @@ REFRESH_TOKEN_KEY = "refresh_token"
 router = APIRouter(
     prefix=settings.api.v1.auth,
     tags=["Auth"],
+    route_class=RequestSessionRoute,
 )
 
 
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, status
 
+from app.api.dependencies.pagination import PageParams
 from app.api.dependencies.user import get_current_auth_user
 from app.core.config import settings
-from app.core.db import TransactionSessionDep
+from app.core.db import ReadSessionDep, RequestSessionRoute, TransactionSessionDep
 from app.dao.department import DepartmentDAO
-from app.schemas import DataResponse, PaginatedListResponse, get_pagination
+from app.schemas import (
+    DataResponse,
+    PaginatedListResponse,
+    get_pagination,
+)
 from app.schemas.department import (
     DepartmentCreate,
     DepartmentFilter,
@@ -16,6 +21,7 @@ from app.schemas.user import UserRead
 router = APIRouter(
     prefix=settings.api.v1.departments,
     tags=["Departments"],
+    route_class=RequestSessionRoute,
 )
 
 
@@ -57,29 +63,30 @@ async def update_department(
 )
 async def get_departments(
     role_id: int | None = None,
-    page: int = Query(1, ge=1),
-    page_size: int = Query(10, ge=1),
-    session=TransactionSessionDep,
+    params: PageParams = Depends(),
+    session=ReadSessionDep,
     current_user: UserRead = Depends(get_current_auth_user),
 ):
-    db_departments_count = await DepartmentDAO.count(
+    db_departments_count, count_strategy = await DepartmentDAO.count(
         session=session,
         filters=DepartmentFilter(
             role_id=role_id,
         ),
+        strategy=params.count_strategy,
     )
     db_departments = await DepartmentDAO.get_departments_with_count(
         session=session,
         role_id=role_id,
-        page=page,
-        page_size=page_size,
+        page=params.page,
+        page_size=params.page_size,
     )
     return PaginatedListResponse(
         data=db_departments,
         pagination=get_pagination(
             total_count=db_departments_count,
-            page=page,
-            page_size=page_size,
+            page=params.page,
+            page_size=params.page_size,
+            count_strategy=count_strategy,
         ),
     )
 
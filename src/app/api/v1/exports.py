@@ -0,0 +1,62 @@
+import os
+
+from fastapi import APIRouter, Depends, Path
+from fastapi.responses import FileResponse
+
+from app.api.dependencies.user import get_current_auth_user
+from app.core.config import settings
+from app.core.exceptions import ConflictException, NotFoundException
+from app.core.services.export_jobs import (
+    JOB_ID_PATTERN,
+    export_path,
+    get_export_job,
+)
+from app.core.utils import task_queue
+from app.schemas import DataResponse
+from app.schemas.export import ExportJobRead, ExportStatus
+from app.schemas.user import UserRead
+
+router = APIRouter(
+    prefix=settings.api.v1.exports,
+    tags=["Exports"],
+)
+
+
+async def _get_job(job_id: str) -> ExportJobRead:
+    job = await get_export_job(task_queue.pool, job_id)
+    if job is None:
+        raise NotFoundException(message="Export not found")
+    return job
+
+
+@router.get(
+    "/{job_id}",
+    response_model=DataResponse[ExportJobRead],
+)
+async def get_export(
+    job_id: str = Path(pattern=JOB_ID_PATTERN),
+    current_user: UserRead = Depends(get_current_auth_user),
+):
+    return DataResponse(data=await _get_job(job_id))
+
+
+@router.get(
+    "/{job_id}/download",
+    response_class=FileResponse,
+)
+async def download_export(
+    job_id: str = Path(pattern=JOB_ID_PATTERN),
+    current_user: UserRead = Depends(get_current_auth_user),
+):
+    job = await _get_job(job_id)
+    if job.status != ExportStatus.DONE:
+        raise ConflictException(message=f"Export is {job.status.value}")
+    path = export_path(job_id)
+    if not os.path.isfile(path):
+        raise NotFoundException(message="Export file expired")
+    # FileResponse сам обрабатывает Range и отвечает 206
+    return FileResponse(
+        path,
+        media_type="application/zip",
+        filename=f"person_{job_id}.zip",
+    )
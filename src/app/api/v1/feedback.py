@@ -1,9 +1,17 @@
-import httpx
-from fastapi import APIRouter, Depends, Form, HTTPException, status
+from fastapi import APIRouter, Depends, Form, HTTPException, Request, Response, status
 
 from app.api.dependencies.user import get_current_auth_user
 from app.core.config import settings
-from app.core.db import SessionDep, TransactionSessionDep
+from app.core.db import RequestSessionRoute, TransactionSessionDep
+from app.core.exceptions import NotFoundException
+from app.core.services.captcha import captcha_client
+from app.core.services.feedback_counters import (
+    add_vote,
+    get_branch_pending,
+    merge_pending,
+)
+from app.core.services.leaderboard import etag_matches, get_leaderboard
+from app.core.utils import redis_client
 from app.dao.branch import BranchDAO
 from app.schemas import DataResponse
 from app.schemas.branch import (
@@ -18,18 +26,8 @@ from app.schemas.user import UserRead
 router = APIRouter(
     prefix=settings.api.v1.feedback,
     tags=["feedback"],
+    route_class=RequestSessionRoute,
 )
-SMARTCAPTCHA_SECRET = settings.crypt.CAPTCHA_SECRET
-
-
-async def verify_captcha(token: str) -> bool:
-    url = "https://smartcaptcha.yandexcloud.net/validate"
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            url, data={"secret": SMARTCAPTCHA_SECRET, "token": token}
-        )
-        data = resp.json()
-        return data.get("status") == "ok"
 
 
 @router.post("add_branch")
@@ -65,28 +63,42 @@ async def delete_branch(
     status_code=status.HTTP_200_OK,
     response_model=ListResponse[BranchRead],
 )
-async def get_all_feedback(
-    session=SessionDep,
-):
-    branches = await BranchDAO.get_all(session=session)
-    return ListResponse(
-        data=branches,
-        total=len(branches),
-    )
+async def get_all_feedback(request: Request):
+    # Публичный эндпоинт: отдаем готовый JSON из Redis без сериализации
+    body, etag = await get_leaderboard()
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.feedback.LEADERBOARD_CACHE_EXPIRATION}",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.post("/feedbackadd_feedback")
 async def add_feedback(
+    request: Request,
     branch_id: int = Form(...),
     rating: int = Form(ge=1, le=5),
     smart_token: str = Form(...),
     session=TransactionSessionDep,
 ):
-    if not await verify_captcha(smart_token):
+    ip = request.client.host if request.client else None
+    if not await captcha_client.verify(smart_token, ip=ip):
         raise HTTPException(status_code=400, detail="Captcha failed")
 
     feedback = Feedback(branch_id=branch_id, rating=rating)
-    branch = await BranchDAO.add_feedback(session=session, feedback=feedback)
+    branch = await BranchDAO.get_branch(session=session, branch_id=branch_id)
+    if branch is None:
+        raise NotFoundException(message="Branch not found")
+    if await add_vote(redis_client.client, branch_id, rating):
+        # Строку филиала не блокируем: голос попадет в Postgres при flush
+        branch = merge_pending(
+            branch,
+            await get_branch_pending(redis_client.client, branch_id),
+        )
+    else:
+        branch = await BranchDAO.add_feedback(session=session, feedback=feedback)
     return DataResponse(
         data=branch,
     )
@@ -1,20 +1,43 @@
+import asyncio
 import os
-import uuid
+from typing import List, Literal
 
 from fastapi import APIRouter, Depends, File, Form, Query, UploadFile, status
+from fastapi.responses import FileResponse, StreamingResponse
 
+from app.api.dependencies.pagination import CursorPageParams
 from app.api.dependencies.user import get_current_auth_user
 from app.core.config import settings
-from app.core.db import TransactionSessionDep, SessionDep
+from app.core.db import (
+    ReadSessionDep,
+    RequestSessionRoute,
+    TransactionSessionDep,
+)
 from app.core.exceptions import NotFoundException
+from app.core.services.export_jobs import create_export_job, new_job_id
+from app.core.services.image_io import ImageReadStage
+from app.core.services.image_storage import person_images
+from app.core.services.image_variants import PERSONS_IMAGE_ROOT, ensure_variant
+from app.core.services.person_search import search_persons as cached_search
+from app.core.services.zip_stream import stream_zip
 from app.core.utils import task_queue
-from app.dao.person import PersonDAO
-from app.schemas import DataResponse, PaginatedListResponse, get_pagination
+from app.core.utils.create_zip import person_export_entries
+from app.core.utils.spreadsheet import SpreadsheetFormat
+from app.dao.person import SEARCH_LIMIT, PersonDAO
+from app.schemas import (
+    DataResponse,
+    PaginatedListResponse,
+    get_pagination,
+)
+from app.schemas.export import ExportJobRead
 from app.schemas.person import (
+    ExportColumn,
     PersonCreate,
+    PersonExportSpec,
     PersonFilter,
     PersonFullRead,
     PersonRead,
+    PersonSearchFilter,
     PersonUpdate,
 )
 from app.schemas.response import ListResponse
@@ -23,6 +46,7 @@ from app.schemas.user import UserRead
 router = APIRouter(
     prefix=settings.api.v1.persons,
     tags=["Persons"],
+    route_class=RequestSessionRoute,
 )
 
 @router.post(
@@ -38,23 +62,55 @@ async def create_person(
     session=TransactionSessionDep,
     current_user: UserRead = Depends(get_current_auth_user),
 ):
-
-    os.makedirs("storage/persons", exist_ok=True)
-    save_path = f"storage/persons/{uuid.uuid4()}.{image.filename.split(".")[-1]}"
-    with open(save_path, "wb") as buffer:
-        buffer.write(await image.read())
+    # Если транзакция откатится, новый файл удалится вместе с записью
+    image_url = await person_images.save(
+        session=session,
+        upload=image,
+        max_size=settings.upload_settings.MAX_FILE_SIZE,
+    )
 
     person_data = PersonCreate(
         first_name=first_name,
         last_name=last_name,
         department_id=department_id,
-        image_url=save_path,
+        image_url=image_url,
     )
 
     person = await PersonDAO.add(session=session, values=person_data)
+    # Варианты для одинаковых изображений общие, поэтому job_id по пути
+    await task_queue.pool.enqueue_job(
+        "generate_person_image_variants",
+        image_url=image_url,
+        _job_id=f"image_variants:{image_url}",
+    )
 
     return DataResponse(data=PersonRead.model_validate(person))
 
+@router.get(
+    "/images/{variant}/{image_path:path}",
+    response_class=FileResponse,
+)
+async def get_person_image_variant(
+    variant: Literal["thumbnail", "medium"],
+    image_path: str,
+):
+    """
+    Отдает превью или изображение среднего размера.
+    Если вариант еще не создан воркером, он создается сразу и кешируется на диске.
+    """
+    image_url = os.path.normpath(os.path.join(PERSONS_IMAGE_ROOT, image_path))
+    if not image_url.startswith(PERSONS_IMAGE_ROOT + os.sep) or not (
+        await asyncio.to_thread(os.path.isfile, image_url)
+    ):
+        raise NotFoundException(
+            message="Image not found",
+        )
+    path = await ensure_variant(image_url, variant)
+    return FileResponse(
+        path,
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
 @router.get(
     "/get_by_id/{person_id}",
     response_model=DataResponse[PersonFullRead],
@@ -77,51 +133,105 @@ async def get_person_by_id(
 )
 async def get_persons(
     department_id: int | None = None,
-    page: int = Query(1, ge=1),
-    page_size: int = Query(10, ge=1),
-    session=TransactionSessionDep,
+    params: CursorPageParams = Depends(),
+    session=ReadSessionDep,
     current_user: UserRead = Depends(get_current_auth_user),
 ):
-    db_persons_count = await PersonDAO.count(
-        session=session,
-        filters=PersonFilter(
-            department_id=department_id,
-        ),
-    )
-    db_persons = await PersonDAO.paginate(
+    db_persons_count, count_strategy = await PersonDAO.count(
         session=session,
         filters=PersonFilter(
             department_id=department_id,
         ),
-        page=page,
-        page_size=page_size,
-        order_by="id",
-        order_direction="desc",
+        strategy=params.count_strategy,
     )
+    next_cursor = prev_cursor = None
+    if params.cursor is None and params.page > 1:
+        # Старый режим page/page_size для существующих клиентов
+        db_persons = await PersonDAO.paginate(
+            session=session,
+            filters=PersonFilter(
+                department_id=department_id,
+            ),
+            page=params.page,
+            page_size=params.page_size,
+            order_by="id",
+            order_direction="desc",
+        )
+    else:
+        db_persons, next_cursor, prev_cursor = await PersonDAO.paginate_by_cursor(
+            session=session,
+            filters=PersonFilter(
+                department_id=department_id,
+            ),
+            cursor=params.cursor,
+            page_size=params.page_size,
+            order_by="id",
+            order_direction="desc",
+        )
+    # Схемы собираем, пока сессия открыта: RequestSessionRoute закрывает ее до сериализации
     return PaginatedListResponse(
-        data=db_persons,
+        data=[PersonRead.model_validate(person) for person in db_persons],
         pagination=get_pagination(
             total_count=db_persons_count,
-            page=page,
-            page_size=page_size,
-        ),
+            page=None if params.cursor else params.page,
+            page_size=params.page_size,
+            count_strategy=count_strategy,
+        ).model_copy(update={"next_cursor": next_cursor, "prev_cursor": prev_cursor}),
     )
 
 @router.get(
     "/get_excel",
-    #response_model=DataResponse[List[PersonExcel]],
+    response_model=DataResponse[ExportJobRead],
 )
 async def get_persons_excel(
-    session=SessionDep,
+    department_id: int | None = None,
+    role_id: int | None = None,
+    columns: List[ExportColumn] | None = Query(None),
+    format: SpreadsheetFormat = "xlsx",
     current_user: UserRead = Depends(get_current_auth_user),
 ):
-    persons = await PersonDAO.get_persons_excel(session=session)
-    #path = await create_zip(persons_data=persons)
+    """Ставит выгрузку в очередь; статус и архив - в `/exports/{job_id}`."""
+    # В очередь уходят только параметры, строки воркер читает из БД сам
+    spec = PersonExportSpec(
+        department_id=department_id,
+        role_id=role_id,
+        columns=columns,
+        format=format,
+    )
+    job_id = new_job_id()
+    job = await create_export_job(task_queue.pool, job_id)
     await task_queue.pool.enqueue_job(
         "create_zip",
-        persons_data=persons,
+        spec=spec.model_dump(),
+        _job_id=job_id,
+    )
+    return DataResponse(data=job)
+
+
+@router.get(
+    "/get_zip",
+    response_class=StreamingResponse,
+)
+async def stream_persons_zip(
+    department_id: int | None = None,
+    role_id: int | None = None,
+    columns: List[ExportColumn] | None = Query(None),
+    format: SpreadsheetFormat = "xlsx",
+    current_user: UserRead = Depends(get_current_auth_user),
+):
+    """Выгрузка тем же архивом, что и `/get_excel`, но сразу в ответ, без файла на диске."""
+    spec = PersonExportSpec(
+        department_id=department_id,
+        role_id=role_id,
+        columns=columns,
+        format=format,
+    )
+    images = ImageReadStage(workers=settings.export.IMAGE_IO_WORKERS)
+    return StreamingResponse(
+        stream_zip(images.run(person_export_entries(spec))),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="person.zip"'},
     )
-    return "ok"
 
 
 @router.delete(
@@ -142,7 +252,7 @@ async def delete_person(
         raise NotFoundException(
             message="Person not found",
         )
-    os.remove(db_person.image_url)
+    await person_images.release(session=session, path=db_person.image_url)
     await PersonDAO.delete(
         session=session,
         filters=PersonFilter(
@@ -189,15 +299,27 @@ async def update_person(
 @router.get(
     "/search/{search}",
     response_model=ListResponse[PersonFullRead],
-    
+    dependencies=[Depends(get_current_auth_user)],
 )
 async def search_persons(
     search: str,
-    session=TransactionSessionDep,
-    current_user: UserRead = Depends(get_current_auth_user),
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=100),
+    cursor: str | None = Query(
+        None,
+        description="Курсор из next_cursor предыдущего ответа",
+    ),
+    filters: PersonSearchFilter = Depends(),
+    session=ReadSessionDep,
 ):
-    persons = await PersonDAO.search(session=session, search=search)
+    persons, next_cursor = await cached_search(
+        session=session,
+        search=search,
+        limit=limit,
+        cursor=cursor,
+        filters=filters,
+    )
     return ListResponse(
         data=persons,
         total=len(persons),
+        next_cursor=next_cursor,
     )
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, status
 
 from app.api.dependencies.user import get_current_auth_user
 from app.core.config import settings
-from app.core.db import TransactionSessionDep
+from app.core.db import ReadSessionDep, RequestSessionRoute, TransactionSessionDep
 from app.core.exceptions import NotFoundException
 from app.dao.role import RoleDAO
 from app.schemas import DataResponse
@@ -13,6 +13,7 @@ from app.schemas.user import UserRead
 router = APIRouter(
     prefix=settings.api.v1.roles,
     tags=["Roles"],
+    route_class=RequestSessionRoute,
 )
 
 
@@ -36,7 +37,7 @@ async def create_role(
     response_model=ListResponse[RoleRead],
 )
 async def get_roles(
-    session=TransactionSessionDep,
+    session=ReadSessionDep,
     current_user: UserRead = Depends(get_current_auth_user),
 ):
     roles = await RoleDAO.find_all(
@@ -47,7 +48,8 @@ async def get_roles(
         raise NotFoundException(
             message="Roles not found",
         )
+    # Схемы собираем, пока сессия открыта: RequestSessionRoute закрывает ее до сериализации
     return ListResponse(
-        data=roles,
+        data=[RoleRead.model_validate(role) for role in roles],
         total=len(roles),
     )
\ No newline at end of file
@@ -4,6 +4,7 @@ from app.api.dependencies import (
     get_current_auth_user,
 )
 from app.core.config import settings
+from app.core.db import RequestSessionRoute
 from app.schemas import DataResponse
 from app.schemas.user import (
     UserRead,
@@ -12,6 +13,7 @@ from app.schemas.user import (
 router = APIRouter(
     prefix=settings.api.v1.users,
     tags=["Users"],
+    route_class=RequestSessionRoute,
 )
 
 
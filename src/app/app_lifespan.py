@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
@@ -9,8 +10,12 @@ from redis.asyncio import ConnectionPool, Redis
 # from app.core.utils import queue, rate_limit, cache,redis_client
 # from arq import create_pool
 # from arq.connections import RedisSettings
+from app.core.auth.blacklist import token_blacklist
+from app.core.auth.user_cache import user_cache
 from app.core.config import settings
-from app.core.db import db_helper
+from app.core.db import db_helper, replica_router
+from app.core.services.captcha import captcha_client
+from app.core.services.password_hasher import password_hasher
 from app.core.utils import redis_client, task_queue
 from app.models import Base
 
@@ -20,6 +25,8 @@ logger = logging.getLogger(__name__)
 # -------------- database --------------
 async def create_tables() -> None:
     async with db_helper.engine.begin() as conn:
+        # Нужен для триграммного индекса persons.full_name
+        await conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
         await conn.run_sync(Base.metadata.create_all)
 
 
@@ -28,6 +35,29 @@ async def drop_tables() -> None:
         await conn.run_sync(Base.metadata.drop_all)
 
 
+async def stop_background_task(task: asyncio.Task) -> None:
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+async def start_replica_health_checks() -> asyncio.Task | None:
+    if not replica_router.replicas:
+        return None
+    await replica_router.check_health()
+    return asyncio.create_task(
+        replica_router.run_health_checks(settings.db.replica_health_check_interval)
+    )
+
+
+async def stop_replica_health_checks(task: asyncio.Task | None) -> None:
+    if task is not None:
+        await stop_background_task(task)
+    await replica_router.dispose()
+
+
 # -------------- redis --------------
 async def create_redis_pool() -> None:
     try:
@@ -46,6 +76,17 @@ async def close_redis_pool() -> None:
     await redis_client.client.aclose()  # type: ignore
 
 
+# -------------- auth caches --------------
+def start_blacklist_listener() -> asyncio.Task:
+    return asyncio.create_task(
+        token_blacklist.listen(settings.crypt.BLACKLIST_REBUILD_INTERVAL)
+    )
+
+
+def start_user_cache_listener() -> asyncio.Task:
+    return asyncio.create_task(user_cache.listen())
+
+
 # -------------- queue --------------
 async def create_redis_queue_pool() -> None:
     task_queue.pool = await create_pool(
@@ -62,6 +103,15 @@ async def close_redis_queue_pool() -> None:
     await task_queue.pool.aclose()  # type: ignore
 
 
+# -------------- captcha --------------
+async def start_captcha_client() -> None:
+    await captcha_client.start()
+
+
+async def close_captcha_client() -> None:
+    await captcha_client.close()
+
+
 # -------------- cache --------------
 # async def create_redis_cache_pool() -> None:
 #     cache.pool = ConnectionPool.from_url(settings.redis_cache.REDIS_CACHE_URL)
@@ -102,11 +152,20 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     if settings.db.DROP_TABLES_ON_START:
         await drop_tables()
     await create_redis_pool()
+    blacklist_task = start_blacklist_listener()
+    user_cache_task = start_user_cache_listener()
     await create_redis_queue_pool()
+    replica_health_task = await start_replica_health_checks()
+    await start_captcha_client()
     yield
     # shutdown
+    await stop_background_task(blacklist_task)
+    await stop_background_task(user_cache_task)
     await close_redis_pool()
 
     await close_redis_queue_pool()
+    await close_captcha_client()
 
+    await stop_replica_health_checks(replica_health_task)
+    password_hasher.shutdown()
     await db_helper.dispose()
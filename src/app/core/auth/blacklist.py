@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import UTC, datetime
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.db import db_helper
+from app.core.utils import redis_client
+from app.models.token_blacklist import TokenBlacklist
+
+logger = logging.getLogger(__name__)
+
+BLACKLIST_KEY_PREFIX = "blacklist"
+BLACKLIST_CHANNEL = "blacklist:jti"
+RECONNECT_DELAY = 5
+
+
+class BloomFilter:
+    """
+    Bloom-фильтр: `in` без ложноотрицательных ответов,
+    ложноположительные с вероятностью около `error_rate` при `capacity` элементов.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+def _blacklist_key(jti: str) -> str:
+    return f"{BLACKLIST_KEY_PREFIX}:{jti}"
+
+
+class TokenBlacklistCache:
+    """
+    Черный список JTI: ключи Redis с TTL до истечения токена
+    и локальный Bloom-фильтр, который обновляется через pub/sub.
+
+    Если JTI нет в фильтре, проверка не ходит в сеть.
+    Пока подписка не активна, ни фильтру, ни Redis не доверяем: в Redis еще может
+    не быть ключей для старых JTI, поэтому проверку делает Postgres.
+    Postgres остается постоянным хранилищем и источником для пересборки фильтра.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.synced = False
+        # JTI, пришедшие во время пересборки: в выборке из Postgres их может не быть
+        self._added_during_rebuild: set[str] | None = None
+
+    def _remember(self, jti: str) -> None:
+        self.bloom.add(jti)
+        if self._added_during_rebuild is not None:
+            self._added_during_rebuild.add(jti)
+
+    async def add(self, jti: str, expires_at: datetime) -> None:
+        """Публикует JTI; вызывать после коммита записи в Postgres."""
+        self._remember(jti)
+        ttl = int((expires_at - datetime.now(UTC)).total_seconds())
+        if redis_client.client is None or ttl <= 0:
+            return
+        try:
+            async with redis_client.client.pipeline(transaction=False) as pipe:
+                pipe.set(_blacklist_key(jti), 1, ex=ttl)
+                pipe.publish(BLACKLIST_CHANNEL, jti)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Не удалось записать JTI в черный список Redis: {e}")
+
+    async def is_blacklisted(self, jti: str) -> bool | None:
+        """
+        Возвращает None, если ответить без Postgres не получилось: фильтр и Redis
+        еще не синхронизированы или Redis недоступен.
+        """
+        if not self.synced:
+            return None
+        if jti not in self.bloom:
+            return False
+        if redis_client.client is None:
+            return None
+        try:
+            return bool(await redis_client.client.exists(_blacklist_key(jti)))
+        except RedisError as e:
+            logger.warning(f"Не удалось проверить JTI в Redis: {e}")
+            return None
+
+    @staticmethod
+    async def _load_active(now: datetime) -> list[tuple[str, datetime]]:
+        async with db_helper.session_factory() as session:
+            result = await session.execute(
+                select(TokenBlacklist.jti, TokenBlacklist.expires_at).where(
+                    TokenBlacklist.is_blacklisted.is_(True),
+                    TokenBlacklist.expires_at > now,
+                )
+            )
+            return [tuple(row) for row in result.all()]
+
+    async def rebuild(self) -> None:
+        """
+        Пересобирает фильтр из Postgres и дописывает недостающие ключи в Redis.
+
+        JTI, добавленные после выборки (сообщения pub/sub, `add`), переносятся
+        в новый фильтр, чтобы замена фильтра их не потеряла.
+        """
+        now = datetime.now(UTC)
+        self._added_during_rebuild = set()
+        try:
+            rows = await self._load_active(now)
+            bloom = BloomFilter(max(self.capacity, len(rows)), self.error_rate)
+            for jti, _ in rows:
+                bloom.add(jti)
+            # Между переносом и заменой нет await, новых JTI здесь не появится
+            for jti in self._added_during_rebuild:
+                bloom.add(jti)
+            self.bloom = bloom
+        finally:
+            self._added_during_rebuild = None
+
+        if redis_client.client is not None:
+            async with redis_client.client.pipeline(transaction=False) as pipe:
+                for jti, expires_at in rows:
+                    ttl = int((expires_at - now).total_seconds())
+                    if ttl > 0:
+                        pipe.set(_blacklist_key(jti), 1, ex=ttl, nx=True)
+                await pipe.execute()
+        logger.info(f"Фильтр черного списка пересобран: {len(rows)} JTI")
+
+    async def listen(self, rebuild_interval: int) -> None:
+        """
+        Слушает канал новых JTI. После (пере)подключения и раз в `rebuild_interval`
+        секунд фильтр пересобирается, чтобы не терять пропущенные сообщения
+        и избавляться от истекших JTI.
+        """
+        while True:
+            try:
+                async with redis_client.client.pubsub() as pubsub:
+                    await pubsub.subscribe(BLACKLIST_CHANNEL)
+                    await self.rebuild()
+                    self.synced = True
+                    rebuild_at = time.monotonic() + rebuild_interval
+                    while True:
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True,
+                            timeout=1.0,
+                        )
+                        if message is not None:
+                            self._remember(message["data"].decode())
+                        if time.monotonic() >= rebuild_at:
+                            await self.rebuild()
+                            rebuild_at = time.monotonic() + rebuild_interval
+            except (RedisError, SQLAlchemyError, OSError) as e:
+                self.synced = False
+                logger.warning(f"Подписка на черный список прервана: {e}")
+                await asyncio.sleep(RECONNECT_DELAY)
+            except asyncio.CancelledError:
+                self.synced = False
+                raise
+
+
+token_blacklist = TokenBlacklistCache(
+    capacity=settings.crypt.BLACKLIST_BLOOM_CAPACITY,
+    error_rate=settings.crypt.BLACKLIST_BLOOM_ERROR_RATE,
+)
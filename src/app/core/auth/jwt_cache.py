@@ -0,0 +1,68 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass
+class JwtCacheStats:
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    evictions: int = 0
+
+
+class JwtCache:
+    """
+    Кеш уже проверенных JWT: ключ - sha256 токена, значение - payload до его `exp`.
+
+    Зависимости с `decode_jwt` синхронные и выполняются в пуле потоков,
+    поэтому доступ к словарю защищен блокировкой.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.stats = JwtCacheStats()
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token: str | bytes) -> bytes:
+        if isinstance(token, str):
+            token = token.encode()
+        return hashlib.sha256(token).digest()
+
+    def get(self, digest: bytes) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[digest]
+                self.stats.expired += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.stats.hits += 1
+        return dict(payload)
+
+    def set(self, digest: bytes, payload: dict) -> None:
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)) or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[digest] = (float(expires_at), dict(payload))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
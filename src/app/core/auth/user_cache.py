@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from pydantic import ValidationError
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.utils import redis_client
+from app.schemas.user import UserRead
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_KEY = "user_cache"
+USER_CACHE_CHANNEL = "user_cache:invalidate"
+INVALIDATE_ALL = "*"
+RECONNECT_DELAY = 5
+
+
+class UserCache:
+    """
+    Двухуровневый кеш `UserRead` по id пользователя.
+
+    Первый уровень - LRU в памяти процесса с коротким TTL, второй - hash в Redis.
+    Сброс публикуется в канал, чтобы остальные процессы очистили свои LRU.
+    """
+
+    def __init__(self, max_size: int, local_ttl: float, redis_ttl: int) -> None:
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self._local: OrderedDict[int, tuple[float, UserRead]] = OrderedDict()
+
+    def _get_local(self, user_id: int) -> UserRead | None:
+        entry = self._local.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._local[user_id]
+            return None
+        self._local.move_to_end(user_id)
+        return user
+
+    def _set_local(self, user: UserRead) -> None:
+        self._local[user.id] = (time.monotonic() + self.local_ttl, user)
+        self._local.move_to_end(user.id)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    def _drop_local(self, message: str) -> None:
+        if message == INVALIDATE_ALL:
+            self._local.clear()
+        else:
+            self._local.pop(int(message), None)
+
+    async def get(self, user_id: int) -> UserRead | None:
+        user = self._get_local(user_id)
+        if user is not None or redis_client.client is None:
+            return user
+        try:
+            raw = await redis_client.client.hget(USER_CACHE_KEY, str(user_id))
+        except RedisError as e:
+            logger.warning(f"Не удалось прочитать пользователя из Redis: {e}")
+            return None
+        if raw is None:
+            return None
+        try:
+            user = UserRead.model_validate_json(raw)
+        except ValidationError:
+            return None
+        self._set_local(user)
+        return user
+
+    async def set(self, user: UserRead) -> None:
+        self._set_local(user)
+        if redis_client.client is None:
+            return
+        try:
+            async with redis_client.client.pipeline(transaction=False) as pipe:
+                pipe.hset(USER_CACHE_KEY, str(user.id), user.model_dump_json())
+                pipe.expire(USER_CACHE_KEY, self.redis_ttl, nx=True)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Не удалось записать пользователя в Redis: {e}")
+
+    async def invalidate(self, user_id: int | None = None) -> None:
+        """Сбрасывает одного пользователя или, без `user_id`, весь кеш."""
+        message = INVALIDATE_ALL if user_id is None else str(user_id)
+        self._drop_local(message)
+        if redis_client.client is None:
+            return
+        try:
+            async with redis_client.client.pipeline(transaction=False) as pipe:
+                if user_id is None:
+                    pipe.delete(USER_CACHE_KEY)
+                else:
+                    pipe.hdel(USER_CACHE_KEY, message)
+                pipe.publish(USER_CACHE_CHANNEL, message)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Не удалось сбросить кеш пользователей: {e}")
+
+    async def listen(self) -> None:
+        """Применяет сбросы из других процессов к локальному LRU."""
+        while True:
+            try:
+                async with redis_client.client.pubsub() as pubsub:
+                    await pubsub.subscribe(USER_CACHE_CHANNEL)
+                    # Пока подписки не было, сбросы могли потеряться
+                    self._local.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._drop_local(message["data"].decode())
+            except (RedisError, OSError) as e:
+                logger.warning(f"Подписка на сброс кеша пользователей прервана: {e}")
+                self._local.clear()
+                await asyncio.sleep(RECONNECT_DELAY)
+
+
+user_cache = UserCache(
+    max_size=settings.redis_cache.USER_CACHE_SIZE,
+    local_ttl=settings.redis_cache.USER_CACHE_LOCAL_TTL,
+    redis_ttl=settings.redis_cache.USER_CACHE_EXPIRATION,
+)
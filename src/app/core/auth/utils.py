@@ -1,18 +1,27 @@
 import uuid
 from datetime import UTC, datetime, timedelta
-from pathlib import Path
+from typing import Any
 
-import bcrypt
 import jwt
 
 from app.core.config import settings
+from app.core.services.password_hasher import password_hasher
+
+from .jwt_cache import JwtCache
 
 # from app.core.utils.eskiz_client import code_generator
 
+# Ключи разбираются один раз при импорте, а не на каждом вызове
+_jwt_algorithm = jwt.get_algorithm_by_name(settings.crypt.ALGORITHM)
+PRIVATE_KEY = _jwt_algorithm.prepare_key(settings.crypt.PRIVATE_KEY.read_text())
+PUBLIC_KEY = _jwt_algorithm.prepare_key(settings.crypt.PUBLIC_KEY.read_text())
+
+jwt_cache = JwtCache(max_size=settings.crypt.JWT_CACHE_SIZE)
+
 
 def encode_jwt(
     payload: dict,
-    private_key: Path = settings.crypt.PRIVATE_KEY.read_text(),
+    private_key: Any = PRIVATE_KEY,
     algorithm: str = settings.crypt.ALGORITHM,
     expire_minutes: int = settings.crypt.ACCESS_TOKEN_EXPIRE_MINUTES,
     expire_timedelta: timedelta | None = None,
@@ -39,33 +48,38 @@ def encode_jwt(
 
 def decode_jwt(
     token: str | bytes,
-    public_key: Path = settings.crypt.PUBLIC_KEY.read_text(),
+    public_key: Any = PUBLIC_KEY,
     algorithm: str = settings.crypt.ALGORITHM,
 ) -> dict:
+    # Кешируем только проверку ключом и алгоритмом по умолчанию
+    use_cache = public_key is PUBLIC_KEY and algorithm == settings.crypt.ALGORITHM
+    if use_cache:
+        digest = jwt_cache.digest(token)
+        payload = jwt_cache.get(digest)
+        if payload is not None:
+            return payload
     decoded = jwt.decode(
         token,
         public_key,
         algorithms=algorithm,
     )
+    if use_cache:
+        jwt_cache.set(digest, decoded)
     return decoded
 
 
 def hash_password(
     password: str,
 ) -> bytes:
-    salt = bcrypt.gensalt()
-    pwd_bytes: bytes = password.encode()
-    return bcrypt.hashpw(pwd_bytes, salt)
+    # Синхронный вариант для скриптов; в обработчиках используйте password_hasher.hash
+    return password_hasher.hash_sync(password)
 
 
 async def verify_password(
     password: str,
     hashed_password: str | bytes,
 ) -> bool:
-    pwd_bytes: bytes = password.encode()
-    if isinstance(hashed_password, str):
-        hashed_password = hashed_password.encode()
-    return bcrypt.checkpw(
-        password=pwd_bytes,
+    return await password_hasher.verify(
+        password=password,
         hashed_password=hashed_password,
     )
@@ -7,9 +7,10 @@ from jwt import InvalidTokenError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import UnauthorizedException
+from app.core.services.password_hasher import password_hasher
 from app.dao.token_blacklist import TokenBlacklistDAO
 from app.dao.user import UserDAO
-from app.schemas.user import UserFilter, UserRead
+from app.schemas.user import UserFilter, UserPasswordUpdate, UserRead
 
 from .helpers import TOKEN_TYPE_FIELD
 from .utils import decode_jwt, verify_password
@@ -97,11 +98,10 @@ async def get_refresh_token_payload(
 async def get_user_by_token_sub(session: AsyncSession, payload: dict) -> UserRead:
     user_id: str | None = payload.get("sub")
     jti = payload.get("jti")
-    is_blacklisted = await TokenBlacklistDAO.get_token_by_jti(
+    if await TokenBlacklistDAO.is_token_blacklisted(
         session=session,
         jti=jti,
-    )
-    if is_blacklisted:
+    ):
         raise UnauthorizedException(
             message="Invalid token (blacklisted)",
         )
@@ -116,9 +116,9 @@ async def get_user_by_token_sub(session: AsyncSession, payload: dict) -> UserRea
             message="Invalid token format",
         )
 
-    user = await UserDAO.find_one_or_none_by_id(
+    user = await UserDAO.get_user_read_by_id(
         session=session,
-        data_id=user_id_int,
+        user_id=user_id_int,
     )
     if user:
         if not user.is_active:
@@ -151,4 +151,14 @@ async def authenticate_user(
     ):
         return None
 
+    if password_hasher.needs_rehash(db_user.hashed_password):
+        # Cost в настройках поменялся: пересчитываем хеш, пока знаем пароль
+        await UserDAO.update(
+            session=session,
+            filters=UserFilter(id=db_user.id),
+            values=UserPasswordUpdate(
+                hashed_password=await password_hasher.hash(password),
+            ),
+        )
+
     return db_user
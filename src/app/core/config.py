@@ -70,6 +70,7 @@ class ApiV1Prefix(BaseModel):
     persons: str = "/persons"
     departments: str = "/departments"
     feedback: str = "/feedback"
+    exports: str = "/exports"
 
 class ApiPrefix(BaseModel):
     prefix: str = "/api"
@@ -90,6 +91,12 @@ class CryptSettings(BaseModel):
     REFRESH_TOKEN_COOKIE_SECURE: bool = True
     REFRESH_TOKEN_COOKIE_SAMESITE: str = "Lax"
     CAPTCHA_SECRET: str = ""
+    BLACKLIST_BLOOM_CAPACITY: int = 100_000
+    BLACKLIST_BLOOM_ERROR_RATE: float = 0.001
+    BLACKLIST_REBUILD_INTERVAL: int = 3600
+    JWT_CACHE_SIZE: int = 10_000
+    BCRYPT_ROUNDS: int = 12  # при изменении хеши пересчитываются при входе
+    PASSWORD_HASHER_WORKERS: int = 4
 
 
 class RedisClient(BaseModel):
@@ -100,6 +107,12 @@ class RedisClient(BaseModel):
 
 class RedisCache(BaseModel):
     CACHE_EXPIRATION: int = 3600
+    COUNT_CACHE_EXPIRATION: int = 300
+    USER_CACHE_EXPIRATION: int = 300
+    USER_CACHE_LOCAL_TTL: float = 5.0
+    USER_CACHE_SIZE: int = 10_000
+    SEARCH_CACHE_EXPIRATION: int = 60
+    SEARCH_CACHE_MAX_RESULTS: int = 200
 
 
 class RateLimitConfig(BaseModel):
@@ -111,6 +124,46 @@ class ImageSettings(BaseModel):
     UPLOAD_PATH: str = "storage"
     BASE_URL: str = "https://example.com"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10 MB
+    VARIANTS_PATH: str = "storage/variants"
+    THUMBNAIL_SIZE: int = 160
+    MEDIUM_SIZE: int = 640
+    VARIANT_QUALITY: int = 80
+
+
+class ExportSettings(BaseModel):
+    # Вне storage/: он раздается StaticFiles без авторизации, а архивы отдает
+    # только /exports/{job_id}/download
+    EXPORT_PATH: str = "exports"
+    # Сколько хранятся архивы и статусы выгрузок
+    EXPORT_TTL: int = 24 * 60 * 60
+    # Прогресс пишется в Redis раз в столько строк
+    PROGRESS_INTERVAL: int = 100
+    # Сколько изображений читается параллельно при сборке архива
+    IMAGE_IO_WORKERS: int = 8
+
+
+class FeedbackSettings(BaseModel):
+    # Как часто голоса из Redis переносятся в Postgres, секунд
+    COUNTERS_FLUSH_INTERVAL: int = 10
+    # TTL готового JSON рейтинга филиалов; голоса из Redis попадут в него не позже
+    LEADERBOARD_CACHE_EXPIRATION: int = 10
+    # Сколько хранятся отметки перенесенных пачек голосов, секунд
+    FLUSH_MARKER_TTL: int = 7 * 24 * 60 * 60
+
+
+class CaptchaSettings(BaseModel):
+    URL: str = "https://smartcaptcha.yandexcloud.net/validate"
+    CONNECT_TIMEOUT: float = 1.0
+    TIMEOUT: float = 3.0
+    MAX_CONNECTIONS: int = 20
+    MAX_KEEPALIVE_CONNECTIONS: int = 10
+    # Столько ошибок подряд размыкают circuit breaker на RECOVERY_TIMEOUT секунд
+    FAILURE_THRESHOLD: int = 5
+    RECOVERY_TIMEOUT: float = 30.0
+    # True - при недоступной проверке голос принимается, False - отклоняется
+    FAIL_OPEN: bool = False
+    REPLAY_CACHE_TTL: float = 300.0
+    REPLAY_CACHE_SIZE: int = 10_000
 
 
 class FirstTierConfig(BaseModel):
@@ -142,6 +195,12 @@ class DbConfig(BaseModel):
     CREATE_TABLES_ON_START: bool
     DROP_TABLES_ON_START: bool
 
+    # Реплики для чтения, например APP__DB__REPLICA_URLS='["postgresql+asyncpg://..."]'
+    replica_urls: list[PostgresDsn] = []
+    replica_strategy: Literal["round_robin", "health"] = "round_robin"
+    replica_retry_after: int = 10  # сколько секунд не использовать упавшую реплику
+    replica_health_check_interval: int = 5
+
     naming_convention: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
         "uq": "uq_%(table_name)s_%(column_0_N_name)s",
@@ -173,6 +232,9 @@ class Settings(BaseSettings):
     redis_cache: RedisCache = RedisCache()
     rate_limit: RateLimitConfig = RateLimitConfig()
     upload_settings: ImageSettings = ImageSettings()
+    export: ExportSettings = ExportSettings()
+    feedback: FeedbackSettings = FeedbackSettings()
+    captcha: CaptchaSettings = CaptchaSettings()
     first_tier: FirstTierConfig = FirstTierConfig()
     first_superuser: SuperUserConfig = SuperUserConfig()
     eskiz: EskizSettings = EskizSettings()
@@ -1,9 +1,24 @@
 __all__ = (
     "DatabaseHelper",
+    "ReadSessionDep",
+    "RequestSessionRoute",
     "SessionDep",
     "TransactionSessionDep",
     "db_helper",
+    "mark_write",
+    "on_commit",
+    "on_rollback",
+    "replica_router",
 )
 
 from .db_helper import DatabaseHelper, db_helper
-from .session_maker import SessionDep, TransactionSessionDep
+from .replicas import replica_router
+from .routing import RequestSessionRoute
+from .session_maker import (
+    ReadSessionDep,
+    SessionDep,
+    TransactionSessionDep,
+    mark_write,
+    on_commit,
+    on_rollback,
+)
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from itertools import count
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+from .db_helper import DatabaseHelper
+
+logger = logging.getLogger(__name__)
+
+READ_ONLY_OPTIONS = {"postgresql_readonly": True}
+# Сглаживание задержки для стратегии "health"
+LATENCY_SMOOTHING = 0.3
+
+
+@dataclass
+class Replica:
+    name: str
+    helper: DatabaseHelper
+    down_until: float = 0.0
+    latency: float | None = None
+
+    @property
+    def is_healthy(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+
+class ReplicaRouter:
+    """
+    Выбор реплики для чтения.
+
+    - `round_robin`: реплики по очереди;
+    - `health`: реплика с наименьшей задержкой по результатам фоновых проверок.
+
+    Упавшая реплика пропускается `retry_after` секунд. Если доступных реплик нет,
+    `open_session` возвращает None и чтение идет с основной базы.
+    """
+
+    def __init__(
+        self,
+        replicas: list[Replica],
+        strategy: str = "round_robin",
+        retry_after: int = 10,
+    ) -> None:
+        self.replicas = replicas
+        self.strategy = strategy
+        self.retry_after = retry_after
+        self._counter = count()
+
+    def candidates(self) -> list[Replica]:
+        healthy = [replica for replica in self.replicas if replica.is_healthy]
+        if not healthy:
+            return []
+        if self.strategy == "health":
+            return sorted(
+                healthy,
+                key=lambda replica: (replica.latency is None, replica.latency or 0.0),
+            )
+        start = next(self._counter) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def mark_down(self, replica: Replica, error: Exception) -> None:
+        replica.down_until = time.monotonic() + self.retry_after
+        replica.latency = None
+        logger.warning(
+            f"Реплика {replica.name} недоступна, исключена на {self.retry_after} с: {error}"
+        )
+
+    async def open_session(self) -> AsyncSession | None:
+        """Открывает READ ONLY сессию на первой доступной реплике."""
+        for replica in self.candidates():
+            session = replica.helper.session_factory()
+            try:
+                # Соединение берем сразу, чтобы упавшая реплика обнаружилась до запроса
+                await session.connection(execution_options=READ_ONLY_OPTIONS)
+            except (OSError, asyncio.TimeoutError, SQLAlchemyError) as e:
+                await session.close()
+                self.mark_down(replica, e)
+                continue
+            return session
+        return None
+
+    async def check_health(self) -> None:
+        for replica in self.replicas:
+            started = time.monotonic()
+            try:
+                async with replica.helper.engine.connect() as conn:
+                    await conn.exec_driver_sql("SELECT 1")
+            except (OSError, asyncio.TimeoutError, SQLAlchemyError) as e:
+                self.mark_down(replica, e)
+                continue
+            latency = time.monotonic() - started
+            if replica.latency is None:
+                replica.latency = latency
+            else:
+                replica.latency += LATENCY_SMOOTHING * (latency - replica.latency)
+            replica.down_until = 0.0
+
+    async def run_health_checks(self, interval: int) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.helper.dispose()
+
+
+replica_router = ReplicaRouter(
+    replicas=[
+        Replica(
+            name=f"replica-{index}",
+            helper=DatabaseHelper(
+                url=str(url),
+                echo=settings.db.echo,
+                echo_pool=settings.db.echo_pool,
+                pool_size=settings.db.pool_size,
+                max_overflow=settings.db.max_overflow,
+            ),
+        )
+        for index, url in enumerate(settings.db.replica_urls)
+    ],
+    strategy=settings.db.replica_strategy,
+    retry_after=settings.db.replica_retry_after,
+)
@@ -0,0 +1,27 @@
+import asyncio
+from collections.abc import Callable
+from functools import wraps
+
+from fastapi.routing import APIRoute
+
+from .session_maker import session_manager
+
+
+class RequestSessionRoute(APIRoute):
+    """
+    Маршрут, который завершает сессии запроса сразу после обработчика.
+    Без него соединение держится до конца сериализации ответа.
+    """
+
+    def get_route_handler(self) -> Callable:
+        endpoint = self.dependant.call
+        if asyncio.iscoroutinefunction(endpoint):
+
+            @wraps(endpoint)
+            async def call_and_release(*args, **kwargs):
+                response = await endpoint(*args, **kwargs)
+                await session_manager.release_request_sessions()
+                return response
+
+            self.dependant.call = call_and_release
+        return super().get_route_handler()
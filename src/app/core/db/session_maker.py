@@ -1,26 +1,155 @@
+import asyncio
 import logging
-from collections.abc import AsyncGenerator, Callable
+from collections.abc import AsyncGenerator, Awaitable, Callable
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from functools import wraps
 
 from fastapi import Depends
-from sqlalchemy import text
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql.elements import TextClause
 
 from .db_helper import db_helper
+from .replicas import READ_ONLY_OPTIONS, ReplicaRouter, replica_router
 
 async_session_maker = db_helper.session_factory
 
 logger = logging.getLogger(__name__)
 
+HAS_WRITES_KEY = "has_writes"
+AFTER_COMMIT_KEY = "after_commit"
+AFTER_COMMIT_TASKS_KEY = "after_commit_tasks"
+AFTER_ROLLBACK_KEY = "after_rollback"
+READ_ONLY_PREFIXES = ("SELECT", "WITH", "EXPLAIN", "SHOW")
+
+# Сессии текущего запроса; у каждого запроса своя задача asyncio, а значит и свой контекст
+_request_sessions: ContextVar[list[AsyncSession] | None] = ContextVar(
+    "request_sessions",
+    default=None,
+)
+
+
+def mark_write(session: AsyncSession | Session) -> None:
+    """Помечает сессию как изменявшую данные (для записи в обход ORM, например COPY)."""
+    session.info[HAS_WRITES_KEY] = True
+
+
+def has_writes(session: AsyncSession) -> bool:
+    return bool(
+        session.info.get(HAS_WRITES_KEY)
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
+
+# Ссылки на задачи после исхода транзакции, чтобы их не собрал сборщик мусора
+_after_transaction_tasks: set[asyncio.Task] = set()
+
+TransactionCallback = Callable[[], Awaitable[None]]
+
+
+def on_commit(
+    session: AsyncSession | Session,
+    key: str,
+    callback: TransactionCallback,
+) -> None:
+    """
+    Выполняет `callback` после коммита транзакции; при откате он отбрасывается.
+
+    Нужен для сброса кешей: до коммита параллельный запрос еще читает старые
+    строки и может положить их обратно в кеш. Колбэк с тем же `key` за одну
+    транзакцию выполняется один раз.
+    """
+    session.info.setdefault(AFTER_COMMIT_KEY, {}).setdefault(key, callback)
+
+
+def on_rollback(
+    session: AsyncSession | Session,
+    key: str,
+    callback: TransactionCallback,
+) -> None:
+    """То же, что `on_commit`, но для отката транзакции."""
+    session.info.setdefault(AFTER_ROLLBACK_KEY, {}).setdefault(key, callback)
+
+
+async def _run_callbacks(callbacks: dict[str, TransactionCallback]) -> None:
+    for key, callback in callbacks.items():
+        try:
+            await callback()
+        except Exception as e:
+            logger.warning(f"Ошибка в обработчике после транзакции {key}: {e}")
+
+
+def _schedule(callbacks: dict[str, TransactionCallback]) -> asyncio.Task | None:
+    # События синхронные, поэтому колбэки запускаются задачей в текущем event loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.warning(
+            f"Нет event loop, обработчики после транзакции пропущены: {list(callbacks)}"
+        )
+        return None
+    task = loop.create_task(_run_callbacks(callbacks))
+    _after_transaction_tasks.add(task)
+    task.add_done_callback(_after_transaction_tasks.discard)
+    return task
+
+
+@event.listens_for(Session, "after_commit")
+def _schedule_after_commit(session: Session) -> None:
+    session.info.pop(AFTER_ROLLBACK_KEY, None)
+    callbacks = session.info.pop(AFTER_COMMIT_KEY, None)
+    if callbacks and (task := _schedule(callbacks)) is not None:
+        session.info.setdefault(AFTER_COMMIT_TASKS_KEY, []).append(task)
+
+
+@event.listens_for(Session, "after_rollback")
+def _schedule_after_rollback(session: Session) -> None:
+    session.info.pop(AFTER_COMMIT_KEY, None)
+    callbacks = session.info.pop(AFTER_ROLLBACK_KEY, None)
+    if callbacks:
+        _schedule(callbacks)
+
+
+async def wait_after_commit(session: AsyncSession) -> None:
+    """Дожидается обработчиков после коммита, например до ответа клиенту."""
+    tasks = session.info.pop(AFTER_COMMIT_TASKS_KEY, None)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_write_statements(orm_execute_state: ORMExecuteState) -> None:
+    statement = orm_execute_state.statement
+    if isinstance(statement, TextClause):
+        is_write = not statement.text.lstrip().upper().startswith(READ_ONLY_PREFIXES)
+    else:
+        is_write = not orm_execute_state.is_select
+    if is_write:
+        mark_write(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    mark_write(session)
+
 
 class DatabaseSessionManager:
     """
     Класс для управления асинхронными сессиями базы данных, включая поддержку транзакций и зависимости FastAPI.
     """
 
-    def __init__(self, session_maker: async_sessionmaker[AsyncSession]):
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        replicas: ReplicaRouter | None = None,
+    ):
         self.session_maker = session_maker
+        self.replicas = replicas
+        self.get_read_session = self._build_read_session_getter()
 
     @asynccontextmanager
     async def create_session(self) -> AsyncGenerator[AsyncSession, None]:
@@ -45,6 +174,7 @@ class DatabaseSessionManager:
         try:
             yield
             await session.commit()
+            await wait_after_commit(session)
         except Exception as e:
             await session.rollback()
             logger.exception(f"Ошибка транзакции: {e}")
@@ -65,6 +195,98 @@ class DatabaseSessionManager:
             async with self.transaction(session):
                 yield session
 
+    async def get_request_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Зависимость для FastAPI: одна сессия на весь запрос.
+
+        FastAPI кеширует зависимость в пределах запроса, поэтому авторизация и эндпоинт
+        получают один и тот же объект, а соединение берется из пула только при первом запросе к БД.
+        Коммит выполняется, только если в сессии были изменения, иначе транзакция откатывается.
+        """
+        sessions = _request_sessions.get()
+        if sessions is None:
+            sessions = []
+            _request_sessions.set(sessions)
+        session = self.session_maker()
+        sessions.append(session)
+        try:
+            yield session
+        except Exception as e:
+            await session.rollback()
+            logger.exception(f"Ошибка транзакции: {e}")
+            raise
+        else:
+            await self.finish_session(session)
+        finally:
+            sessions.remove(session)
+            await session.close()
+
+    async def finish_session(self, session: AsyncSession) -> None:
+        """
+        Завершает работу с сессией: коммит при наличии изменений, иначе откат.
+        Соединение сразу возвращается в пул.
+        """
+        try:
+            if session.in_transaction():
+                if has_writes(session):
+                    await session.commit()
+                    await wait_after_commit(session)
+                else:
+                    # Ответ сериализуется уже после завершения сессии: откат
+                    # expire-ит загруженные объекты, поэтому сначала их отвязываем
+                    session.expunge_all()
+                    await session.rollback()
+        except Exception as e:
+            await session.rollback()
+            logger.exception(f"Ошибка транзакции: {e}")
+            raise
+        finally:
+            session.info.pop(HAS_WRITES_KEY, None)
+            await session.close()
+
+    async def release_request_sessions(self) -> None:
+        """
+        Освобождает соединения текущего запроса сразу после обработчика,
+        не дожидаясь сериализации ответа.
+        """
+        for session in list(_request_sessions.get() or ()):
+            await self.finish_session(session)
+
+    def _build_read_session_getter(self) -> Callable:
+        async def get_read_session(
+            request_session: AsyncSession = Depends(self.get_request_session),
+        ) -> AsyncGenerator[AsyncSession, None]:
+            """
+            Зависимость для FastAPI: сессия только для чтения.
+
+            Если настроены реплики, открывает READ ONLY транзакцию на одной из них.
+            Иначе (или если все реплики недоступны) отдает общую сессию запроса на основной базе,
+            переводя ее в READ ONLY, если она еще не начала транзакцию.
+            """
+            session = await self.replicas.open_session() if self.replicas else None
+            if session is None:
+                if not request_session.in_transaction():
+                    await request_session.connection(
+                        execution_options=READ_ONLY_OPTIONS
+                    )
+                yield request_session
+                return
+
+            sessions = _request_sessions.get()
+            if sessions is None:
+                sessions = []
+                _request_sessions.set(sessions)
+            sessions.append(session)
+            try:
+                yield session
+            finally:
+                sessions.remove(session)
+                session.expunge_all()
+                await session.rollback()
+                await session.close()
+
+        return get_read_session
+
     def connection(self, isolation_level: str | None = None, commit: bool = True):
         """
         Декоратор для управления сессией с возможностью настройки уровня изоляции и коммита.
@@ -90,6 +312,7 @@ class DatabaseSessionManager:
 
                         if commit:
                             await session.commit()
+                            await wait_after_commit(session)
 
                         return result
                     except Exception as e:
@@ -105,21 +328,30 @@ class DatabaseSessionManager:
 
     @property
     def session_dependency(self) -> Callable:
-        """Возвращает зависимость для FastAPI, обеспечивающую доступ к сессии без транзакции."""
-        return Depends(self.get_session)
+        """Возвращает зависимость для FastAPI с общей сессией запроса."""
+        return Depends(self.get_request_session)
 
     @property
     def transaction_session_dependency(self) -> Callable:
-        """Возвращает зависимость для FastAPI с поддержкой транзакций."""
-        return Depends(self.get_transaction_session)
+        """
+        Возвращает зависимость для FastAPI с поддержкой транзакций.
+        Это та же сессия запроса: коммит выполняется только при наличии изменений.
+        """
+        return Depends(self.get_request_session)
+
+    @property
+    def read_session_dependency(self) -> Callable:
+        """Возвращает зависимость для FastAPI с READ ONLY сессией (реплика или основная база)."""
+        return Depends(self.get_read_session)
 
 
 # Инициализация менеджера сессий базы данных
-session_manager = DatabaseSessionManager(async_session_maker)
+session_manager = DatabaseSessionManager(async_session_maker, replica_router)
 
 # Зависимости FastAPI для использования сессий
 SessionDep = session_manager.session_dependency
 TransactionSessionDep = session_manager.transaction_session_dependency
+ReadSessionDep = session_manager.read_session_dependency
 
 # Пример использования декоратора
 # @session_manager.connection(isolation_level="SERIALIZABLE", commit=True)
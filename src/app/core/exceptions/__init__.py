@@ -1,9 +1,11 @@
 __all__ = [
     "BadRequestException",
+    "ConflictException",
     "CustomException",
     "DuplicateValueException",
     "ForbiddenException",
     "NotFoundException",
+    "PayloadTooLargeException",
     "RateLimitException",
     "TooManyRequestsException",
     "UnauthorizedException",
@@ -12,10 +14,12 @@ __all__ = [
 
 from .http_exceptions import (
     BadRequestException,
+    ConflictException,
     CustomException,
     DuplicateValueException,
     ForbiddenException,
     NotFoundException,
+    PayloadTooLargeException,
     RateLimitException,
     TooManyRequestsException,
     UnauthorizedException,
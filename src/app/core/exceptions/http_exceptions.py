@@ -87,6 +87,32 @@ class UnprocessableEntityException(CustomException):
         )  # pragma: no cover
 
 
+class PayloadTooLargeException(CustomException):
+    def __init__(
+        self,
+        detail: Union[str, None] = None,
+        message: Union[str, None] = None,
+    ):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=detail,
+            message=message,
+        )  # pragma: no cover
+
+
+class ConflictException(CustomException):
+    def __init__(
+        self,
+        detail: Union[str, None] = None,
+        message: Union[str, None] = None,
+    ):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=detail,
+            message=message,
+        )  # pragma: no cover
+
+
 class DuplicateValueException(CustomException):
     def __init__(
         self,
@@ -0,0 +1,192 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+
+import httpx
+
+from app.core.config import CaptchaSettings, settings
+
+logger = logging.getLogger(__name__)
+
+# С этого кода ответ считается недоступностью сервиса, 4xx - ошибкой запроса
+SERVER_ERROR = 500
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    После `failure_threshold` ошибок подряд запросы не отправляются `recovery_timeout`
+    секунд. Затем пропускается один пробный запрос: успех замыкает цепь, ошибка
+    размыкает снова.
+    """
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_progress = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self.opened_at is None:
+            return CircuitState.CLOSED
+        if time.monotonic() - self.opened_at >= self.recovery_timeout:
+            return CircuitState.HALF_OPEN
+        return CircuitState.OPEN
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and not self._trial_in_progress:
+            self._trial_in_progress = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("Проверка капчи снова доступна, circuit breaker замкнут")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_progress = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                logger.warning(
+                    f"Проверка капчи недоступна, circuit breaker разомкнут на {self.recovery_timeout} с"
+                )
+            self.opened_at = time.monotonic()
+
+    def finish_trial(self) -> None:
+        """Снимает флаг пробного запроса, даже если он завершился без результата."""
+        self._trial_in_progress = False
+
+
+@dataclass
+class CaptchaStats:
+    verified: int = 0
+    rejected: int = 0
+    replays: int = 0
+    errors: int = 0
+    short_circuited: int = 0
+
+
+class CaptchaClient:
+    """
+    Проверка токенов SmartCaptcha через один долгоживущий httpx.AsyncClient.
+
+    Соединения переиспользуются (keep-alive), у запроса жесткие таймауты. Если
+    сервис недоступен, решение принимает политика `fail_open`. Успешно проверенные
+    токены запоминаются на `replay_ttl` секунд: повторная отправка того же токена
+    отклоняется без запроса. Кеш локальный для процесса.
+    """
+
+    def __init__(self, config: CaptchaSettings, secret: str) -> None:
+        self.url = config.URL
+        self.secret = secret
+        self.timeout = httpx.Timeout(config.TIMEOUT, connect=config.CONNECT_TIMEOUT)
+        self.limits = httpx.Limits(
+            max_connections=config.MAX_CONNECTIONS,
+            max_keepalive_connections=config.MAX_KEEPALIVE_CONNECTIONS,
+        )
+        self.fail_open = config.FAIL_OPEN
+        self.replay_ttl = config.REPLAY_CACHE_TTL
+        self.replay_cache_size = config.REPLAY_CACHE_SIZE
+        self.breaker = CircuitBreaker(config.FAILURE_THRESHOLD, config.RECOVERY_TIMEOUT)
+        self.stats = CaptchaStats()
+        self._client: httpx.AsyncClient | None = None
+        self._seen: OrderedDict[bytes, float] = OrderedDict()
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def _is_replay(self, digest: bytes) -> bool:
+        now = time.monotonic()
+        # Записи добавляются по времени, поэтому устаревшие - в начале
+        while self._seen:
+            oldest, expires_at = next(iter(self._seen.items()))
+            if expires_at > now:
+                break
+            del self._seen[oldest]
+        return digest in self._seen
+
+    def _remember(self, digest: bytes) -> None:
+        self._seen[digest] = time.monotonic() + self.replay_ttl
+        while len(self._seen) > self.replay_cache_size:
+            self._seen.popitem(last=False)
+
+    def _unavailable(self) -> bool:
+        if not self.fail_open:
+            self.stats.rejected += 1
+        return self.fail_open
+
+    async def verify(self, token: str, ip: str | None = None) -> bool:
+        if not token:
+            self.stats.rejected += 1
+            return False
+        digest = self._digest(token)
+        if self._is_replay(digest):
+            self.stats.replays += 1
+            return False
+        if not self.breaker.allow_request():
+            self.stats.short_circuited += 1
+            return self._unavailable()
+
+        await self.start()
+        data = {"secret": self.secret, "token": token}
+        if ip:
+            data["ip"] = ip
+        try:
+            try:
+                response = await self._client.post(self.url, data=data)
+                if response.status_code >= SERVER_ERROR:
+                    raise httpx.HTTPStatusError(
+                        f"SmartCaptcha ответил {response.status_code}",
+                        request=response.request,
+                        response=response,
+                    )
+                result = response.json()
+                if not isinstance(result, dict):
+                    raise ValueError(f"Неожиданный ответ SmartCaptcha: {result!r}")
+            except (httpx.HTTPError, ValueError) as e:
+                self.stats.errors += 1
+                self.breaker.record_failure()
+                logger.warning(f"Ошибка проверки капчи: {e!r}")
+                return self._unavailable()
+        finally:
+            # Отмена запроса или непредвиденная ошибка не должны навсегда
+            # занять пробный запрос полуоткрытой цепи
+            self.breaker.finish_trial()
+
+        self.breaker.record_success()
+        if result.get("status") != "ok":
+            self.stats.rejected += 1
+            return False
+        self._remember(digest)
+        self.stats.verified += 1
+        return True
+
+
+captcha_client = CaptchaClient(settings.captcha, settings.crypt.CAPTCHA_SECRET)
@@ -0,0 +1,130 @@
+import contextlib
+import hashlib
+import logging
+import os
+import shutil
+import zipfile
+
+import orjson
+
+from app.schemas.person import PersonExcel, PersonExportSpec
+
+from .export_jobs import CACHE_DIR, export_dir
+from .image_storage import ContentAddressedStorage
+from .zip_stream import ZipEntry
+
+logger = logging.getLogger(__name__)
+
+
+def spec_key(spec: PersonExportSpec) -> str:
+    raw = orjson.dumps(spec.model_dump(), option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha1(raw).hexdigest()
+
+
+def image_key(image_url: str) -> str:
+    # Для content-addressed файлов sha256 уже в имени, старые пути сравниваем как есть
+    return ContentAddressedStorage.sha256_from_path(image_url) or image_url
+
+
+def _link_or_copy(source: str, destination: str) -> None:
+    tmp_path = f"{destination}.part"
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(tmp_path)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+class ExportCache:
+    """
+    Последний архив выгрузки для набора параметров и его манифест.
+
+    Манифест хранит версию данных (`PersonDAO.get_export_version`) и для каждого
+    изображения - (person id, хеш изображения, updated_at). Если версия не изменилась,
+    архив отдается как есть; иначе неизмененные изображения копируются из
+    предыдущего архива, а не читаются из хранилища заново.
+    """
+
+    def __init__(self, spec: PersonExportSpec) -> None:
+        key = spec_key(spec)
+        directory = os.path.join(export_dir(), CACHE_DIR)
+        self.archive_path = os.path.join(directory, f"{key}.zip")
+        self.manifest_path = os.path.join(directory, f"{key}.json")
+        self.previous: dict | None = None
+        self.entries: dict[str, list] = {}
+        self.reused = 0
+        self._archive: zipfile.ZipFile | None = None
+
+    def load(self) -> None:
+        try:
+            with open(self.manifest_path, "rb") as file:
+                self.previous = orjson.loads(file.read())
+        except FileNotFoundError:
+            return
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"Поврежден манифест выгрузки {self.manifest_path}: {e}")
+            return
+        if not os.path.isfile(self.archive_path):
+            self.previous = None
+
+    def is_fresh(self, version: str) -> bool:
+        return self.previous is not None and self.previous["version"] == version
+
+    @property
+    def rows(self) -> int:
+        return len(self.previous["entries"]) if self.previous else 0
+
+    def materialize(self, destination: str) -> str:
+        """Кладет закешированный архив в `destination` (жесткой ссылкой, если можно)."""
+        _link_or_copy(self.archive_path, destination)
+        # Ссылка наследует mtime кеша, а по нему remove_expired_exports считает
+        # возраст архива задачи. У ссылок общий inode, так что кеш тоже освежается
+        os.utime(destination)
+        return destination
+
+    def open_previous(self) -> None:
+        if self.previous is None:
+            return
+        try:
+            self._archive = zipfile.ZipFile(self.archive_path)
+        except (OSError, zipfile.BadZipFile) as e:
+            logger.warning(
+                f"Не удалось открыть архив выгрузки {self.archive_path}: {e}"
+            )
+            self.previous = None
+
+    def close(self) -> None:
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def image_entry(self, person: PersonExcel, arcname: str, path: str) -> ZipEntry:
+        """Entry изображения: из предыдущего архива, если сотрудник не менялся."""
+        record = [image_key(person.image_url), person.updated_at, arcname]
+        self.entries[str(person.id)] = record
+        if (
+            self._archive is not None
+            and self.previous["entries"].get(str(person.id)) == record
+        ):
+            try:
+                entry = ZipEntry.from_archive(self._archive, arcname, path=path)
+            except KeyError:
+                # Изображение не попало в прошлый архив (ошибка чтения) - читаем заново
+                pass
+            else:
+                self.reused += 1
+                return entry
+        return ZipEntry(arcname=arcname, path=path)
+
+    def save(self, archive_path: str, version: str) -> None:
+        os.makedirs(os.path.dirname(self.archive_path), exist_ok=True)
+        # Сначала архив, потом манифест: манифест не должен описывать чужой архив
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.manifest_path)
+        _link_or_copy(archive_path, self.archive_path)
+        tmp_path = f"{self.manifest_path}.part"
+        with open(tmp_path, "wb") as file:
+            file.write(orjson.dumps({"version": version, "entries": self.entries}))
+        os.replace(tmp_path, self.manifest_path)
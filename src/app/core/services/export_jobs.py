@@ -0,0 +1,151 @@
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+from redis.asyncio import Redis
+
+from app.core.config import SOURCE_DIR, settings
+from app.schemas.export import ExportJobRead, ExportStatus
+
+from .zip_stream import ZipEntry
+
+logger = logging.getLogger(__name__)
+
+EXPORT_KEY_PREFIX = "export"
+# Каталог последних архивов для инкрементальной выгрузки, см. ExportCache
+CACHE_DIR = "cache"
+JOB_ID_PATTERN = r"^[0-9a-f]{32}$"
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+def export_dir() -> str:
+    return os.path.join(SOURCE_DIR, settings.export.EXPORT_PATH)
+
+
+def export_path(job_id: str) -> str:
+    """Архив выгрузки: у каждой задачи свой файл."""
+    return os.path.join(export_dir(), f"{job_id}.zip")
+
+
+def _job_key(job_id: str) -> str:
+    return f"{EXPORT_KEY_PREFIX}:{job_id}"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+async def update_export_job(redis: Redis, job_id: str, **fields) -> None:
+    # Статус живет столько же, сколько архив: после очистки задачи как будто не было
+    key = _job_key(job_id)
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.hset(key, mapping={name: str(value) for name, value in fields.items()})
+        pipe.expire(key, settings.export.EXPORT_TTL)
+        await pipe.execute()
+
+
+async def create_export_job(redis: Redis, job_id: str) -> ExportJobRead:
+    await update_export_job(
+        redis,
+        job_id,
+        status=ExportStatus.QUEUED.value,
+        created_at=_now(),
+    )
+    return await get_export_job(redis, job_id)
+
+
+async def get_export_job(redis: Redis, job_id: str) -> ExportJobRead | None:
+    data = await redis.hgetall(_job_key(job_id))
+    if not data:
+        return None
+    fields = {key.decode(): value.decode() for key, value in data.items()}
+    return ExportJobRead(job_id=job_id, **fields)
+
+
+class ExportProgress:
+    """Счетчики выгрузки, которые воркер пишет в статус задачи."""
+
+    def __init__(self, redis: Redis, job_id: str) -> None:
+        self.redis = redis
+        self.job_id = job_id
+        self.rows = 0
+        self.images = 0
+        self.failed_images = 0
+        self._reported_rows = 0
+
+    async def on_entry(self, entry: ZipEntry) -> None:
+        if entry.path is None:
+            return
+        self.rows += 1
+        self.images += 1
+        await self._maybe_report()
+
+    async def on_error(self, entry: ZipEntry, error: Exception) -> None:
+        # Строка выгружена в таблицу, не удалось только изображение
+        self.rows += 1
+        self.failed_images += 1
+        await self._maybe_report()
+
+    async def _maybe_report(self) -> None:
+        if self.rows - self._reported_rows >= settings.export.PROGRESS_INTERVAL:
+            await self.report()
+
+    async def report(self, **fields) -> None:
+        self._reported_rows = self.rows
+        await update_export_job(
+            self.redis,
+            self.job_id,
+            rows=self.rows,
+            images=self.images,
+            failed_images=self.failed_images,
+            **fields,
+        )
+
+    async def start(self) -> None:
+        await self.report(status=ExportStatus.RUNNING.value)
+
+    async def finish(self) -> None:
+        await self.report(status=ExportStatus.DONE.value, finished_at=_now())
+
+    async def fail(self, error: str) -> None:
+        await self.report(
+            status=ExportStatus.FAILED.value,
+            finished_at=_now(),
+            error=error,
+        )
+
+
+def _remove_expired(directory: str, deadline: float) -> int:
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < deadline:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Не удалось удалить архив выгрузки {entry.path}: {e}")
+    return removed
+
+
+def remove_expired_exports(max_age: int) -> int:
+    """
+    Удаляет архивы (и недописанные `*.part`) старше `max_age` секунд.
+
+    Кеш инкрементальной выгрузки тоже чистится: после удаления архив просто соберется заново.
+    """
+    deadline = time.time() - max_age
+    return _remove_expired(export_dir(), deadline) + _remove_expired(
+        os.path.join(export_dir(), CACHE_DIR),
+        deadline,
+    )
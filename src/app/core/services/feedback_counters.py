@@ -0,0 +1,154 @@
+import logging
+import uuid
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.utils.cache import LEADERBOARD_CACHE_KEY
+from app.dao.branch import RATINGS, BranchDAO
+from app.dao.feedback_flush import FeedbackFlushDAO
+from app.schemas.branch import BranchRead
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "feedback:pending"
+# Пачка, которую сейчас переносит flush; остается до успешного коммита
+FLUSHING_KEY = "feedback:flushing"
+# id этой пачки: по нему Postgres узнает уже перенесенную пачку
+FLUSH_ID_KEY = "feedback:flush_id"
+
+Deltas = dict[int, list[int]]
+
+
+def _field(branch_id: int, rating: int) -> str:
+    return f"{branch_id}:{rating}"
+
+
+def _parse(raw: dict, deltas: Deltas | None = None) -> Deltas:
+    deltas = {} if deltas is None else deltas
+    for field, value in raw.items():
+        branch_id, rating = (int(part) for part in field.decode().split(":"))
+        counts = deltas.setdefault(branch_id, [0] * len(RATINGS))
+        counts[rating - 1] += int(value)
+    return deltas
+
+
+async def add_vote(redis: Redis | None, branch_id: int, rating: int) -> bool:
+    """
+    Записывает голос в Redis вместо UPDATE строки филиала.
+
+    False - Redis недоступен, голос нужно записать в Postgres напрямую.
+    """
+    if redis is None:
+        return False
+    try:
+        await redis.hincrby(PENDING_KEY, _field(branch_id, rating), 1)
+    except RedisError as e:
+        logger.warning(f"Не удалось записать голос в Redis: {e}")
+        return False
+    return True
+
+
+async def get_pending(redis: Redis | None) -> Deltas:
+    """Голоса, которые еще не перенесены в Postgres, включая переносимую пачку."""
+    if redis is None:
+        return {}
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(PENDING_KEY)
+            pipe.hgetall(FLUSHING_KEY)
+            pending, flushing = await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Не удалось прочитать голоса из Redis: {e}")
+        return {}
+    return _parse(flushing, _parse(pending))
+
+
+async def get_branch_pending(redis: Redis | None, branch_id: int) -> Deltas:
+    """То же, что `get_pending`, но только для одного филиала."""
+    if redis is None:
+        return {}
+    fields = [_field(branch_id, rating) for rating in RATINGS]
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hmget(PENDING_KEY, fields)
+            pipe.hmget(FLUSHING_KEY, fields)
+            pending, flushing = await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Не удалось прочитать голоса из Redis: {e}")
+        return {}
+    counts = [int(a or 0) + int(b or 0) for a, b in zip(pending, flushing)]
+    return {branch_id: counts}
+
+
+def branch_rating(counts: list[int]) -> float:
+    votes = sum(counts)
+    if votes == 0:
+        return 0
+    return sum(rating * count for rating, count in zip(RATINGS, counts)) / votes
+
+
+def votes_count(branch: BranchRead) -> int:
+    return sum(getattr(branch, f"rating_{rating}_count") for rating in RATINGS)
+
+
+def merge_pending(branch: BranchRead, deltas: Deltas) -> BranchRead:
+    """Прибавляет к счетчикам из Postgres еще не перенесенные голоса."""
+    delta = deltas.get(branch.id)
+    if not delta:
+        return branch
+    counts = [
+        getattr(branch, f"rating_{rating}_count") + delta[index]
+        for index, rating in enumerate(RATINGS)
+    ]
+    return branch.model_copy(
+        update={
+            **{
+                f"rating_{rating}_count": counts[index]
+                for index, rating in enumerate(RATINGS)
+            },
+            "rating": branch_rating(counts),
+        }
+    )
+
+
+async def flush_votes(redis: Redis, session: AsyncSession) -> int:
+    """
+    Переносит накопленные голоса в Postgres одним UPDATE.
+
+    Пачка забирается атомарным RENAME и удаляется только после коммита: если
+    коммит не прошел, она переносится при следующем запуске. Вместе с голосами
+    в той же транзакции записывается id пачки, поэтому пачку, которая уже
+    закоммичена, но не удалена из Redis, повторный запуск не прибавит второй
+    раз. Голоса, пришедшие во время переноса, копятся в новом `PENDING_KEY`.
+    """
+    if not await redis.exists(FLUSHING_KEY):
+        if not await redis.exists(PENDING_KEY):
+            return 0
+        # Пачку забирает только этот cron, поэтому между EXISTS и RENAME ключ не пропадет
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.rename(PENDING_KEY, FLUSHING_KEY)
+            pipe.set(FLUSH_ID_KEY, uuid.uuid4().hex)
+            await pipe.execute()
+    # Пачка, забранная до появления FLUSH_ID_KEY, получает id здесь
+    await redis.set(FLUSH_ID_KEY, uuid.uuid4().hex, nx=True)
+    flush_id = (await redis.get(FLUSH_ID_KEY)).decode()
+    deltas = _parse(await redis.hgetall(FLUSHING_KEY))
+    updated = 0
+    if await FeedbackFlushDAO.mark_applied(session=session, flush_id=flush_id):
+        updated = await BranchDAO.apply_feedback_deltas(session=session, deltas=deltas)
+        await FeedbackFlushDAO.remove_older_than(
+            session=session,
+            max_age=settings.feedback.FLUSH_MARKER_TTL,
+        )
+        await session.commit()
+        logger.info(
+            f"Перенесены голоса: филиалов {updated}, голосов {sum(map(sum, deltas.values()))}"
+        )
+    else:
+        await session.rollback()
+        logger.warning(f"Пачка голосов {flush_id} уже перенесена, удаляем ее из Redis")
+    await redis.delete(FLUSHING_KEY, FLUSH_ID_KEY, LEADERBOARD_CACHE_KEY)
+    return updated
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import os
+import time
+import zipfile
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+
+from .zip_stream import ZipEntry
+
+logger = logging.getLogger(__name__)
+
+ERRORS_NAME = "errors.txt"
+
+ReadErrorHandler = Callable[[ZipEntry, Exception], Awaitable[None]]
+
+
+@dataclass
+class ImageIOStats:
+    files: int = 0
+    failed: int = 0
+    bytes: int = 0
+    # Суммарное время чтения в потоках и время, которое писатель ждал чтения
+    read_time: float = 0.0
+    stall_time: float = 0.0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return max((self.finished_at or time.monotonic()) - self.started_at, 1e-9)
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.elapsed
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes / 1024 / 1024 / self.elapsed
+
+
+class ImageReadStage:
+    """
+    Параллельное чтение изображений перед записью в архив.
+
+    Файлы entries с `path` читаются в пуле из `workers` потоков на `workers * 2`
+    entries вперед, в архив они уходят в исходном порядке уже прочитанными.
+    Память ограничена окном упреждения. Файл, который не удалось прочитать,
+    пропускается, а не обрывает выгрузку: ошибка передается в `on_error`
+    и попадает в `errors.txt` в конце архива.
+    """
+
+    def __init__(self, workers: int, on_error: ReadErrorHandler | None = None) -> None:
+        self.workers = max(workers, 1)
+        self.on_error = on_error
+        self.stats = ImageIOStats()
+        self.errors: list[tuple[str, str]] = []
+
+    @staticmethod
+    def _read(entry: ZipEntry) -> tuple[bytes, tuple, float]:
+        started = time.monotonic()
+        if entry.opener is not None:
+            with entry.opener() as source:
+                data = source.read()
+            date_time = entry.date_time
+        else:
+            with open(entry.path, "rb") as source:
+                data = source.read()
+                date_time = time.localtime(os.fstat(source.fileno()).st_mtime)[:6]
+        return data, date_time, time.monotonic() - started
+
+    async def _resolve(
+        self,
+        entry: ZipEntry,
+        future: asyncio.Future,
+    ) -> ZipEntry | None:
+        waiting_since = time.monotonic()
+        try:
+            data, date_time, read_time = await future
+        except (OSError, zipfile.BadZipFile) as e:
+            self.stats.failed += 1
+            self.errors.append((entry.arcname, str(e)))
+            logger.warning(
+                f"Не удалось прочитать изображение {entry.path} для {entry.arcname}: {e}"
+            )
+            if self.on_error is not None:
+                await self.on_error(entry, e)
+            return None
+        finally:
+            self.stats.stall_time += time.monotonic() - waiting_since
+        self.stats.files += 1
+        self.stats.bytes += len(data)
+        self.stats.read_time += read_time
+        return replace(entry, data=data, opener=None, date_time=date_time)
+
+    async def _drain(
+        self,
+        pending: deque[tuple[ZipEntry, asyncio.Future]],
+        keep: int = 0,
+    ) -> AsyncIterator[ZipEntry]:
+        """Отдает прочитанные entries по порядку, пока в очереди больше `keep`."""
+        while len(pending) > keep:
+            if (ready := await self._resolve(*pending.popleft())) is not None:
+                yield ready
+
+    def _errors_entry(self) -> ZipEntry:
+        report = "\n".join(f"{arcname}: {error}" for arcname, error in self.errors)
+        return ZipEntry(arcname=ERRORS_NAME, data=f"{report}\n".encode(), compress=True)
+
+    async def run(self, entries: AsyncIterable[ZipEntry]) -> AsyncIterator[ZipEntry]:
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="export-io",
+        )
+        pending: deque[tuple[ZipEntry, asyncio.Future]] = deque()
+        self.stats.started_at = time.monotonic()
+        try:
+            async for entry in entries:
+                if entry.path is None or entry.write is not None:
+                    # Остальные entries (таблица, write) могут быть большими - их не
+                    # читаем заранее. Отдаем сразу, не запрашивая следующий entry:
+                    # источник может жить только до следующего шага генератора
+                    async for ready in self._drain(pending):
+                        yield ready
+                    yield entry
+                    continue
+                pending.append(
+                    (entry, loop.run_in_executor(executor, self._read, entry))
+                )
+                async for ready in self._drain(pending, keep=self.workers * 2):
+                    yield ready
+            async for ready in self._drain(pending):
+                yield ready
+            if self.errors:
+                yield self._errors_entry()
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.stats.finished_at = time.monotonic()
+            self.log_stats()
+
+    def log_stats(self) -> None:
+        stats = self.stats
+        logger.info(
+            f"Изображения: прочитано {stats.files}, ошибок {stats.failed}, "
+            f"{stats.bytes / 1024 / 1024:.1f} MB за {stats.elapsed:.2f} с "
+            f"({stats.files_per_second:.0f} файлов/с, {stats.megabytes_per_second:.1f} MB/с), "
+            f"чтение {stats.read_time:.2f} с, ожидание чтения {stats.stall_time:.2f} с"
+        )
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+import re
+import shutil
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+from fastapi import UploadFile
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.db import db_helper, on_commit, on_rollback
+from app.dao.stored_file import StoredFileDAO
+
+from .image_upload import receive_upload
+from .image_variants import PERSONS_IMAGE_ROOT, variant_paths
+
+logger = logging.getLogger(__name__)
+
+UNLINK_ON_COMMIT_KEY = "storage_unlink_on_commit"
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Не удалось удалить файл {path}: {e}")
+
+
+# Файлы, которые ни с кем не разделяются (сохранены до content-addressed хранилища),
+# удаляются только после коммита. os.remove быстрый, поэтому прямо в событии.
+@event.listens_for(Session, "after_commit")
+def _unlink_after_commit(session: Session) -> None:
+    for path in session.info.pop(UNLINK_ON_COMMIT_KEY, ()):
+        _remove_quietly(path)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_unlink(session: Session) -> None:
+    session.info.pop(UNLINK_ON_COMMIT_KEY, None)
+
+
+class ImageStorage(ABC):
+    """Хранилище изображений. В БД сохраняется путь, который возвращает `save`."""
+
+    @abstractmethod
+    async def save(
+        self, session: AsyncSession, upload: UploadFile, max_size: int
+    ) -> str:
+        """Сохраняет загрузку и возвращает путь для `image_url`."""
+
+    @abstractmethod
+    async def release(self, session: AsyncSession, path: str) -> None:
+        """Убирает ссылку на файл; сам файл удаляется после коммита, если ссылок не осталось."""
+
+    @abstractmethod
+    def local_path(self, path: str) -> str:
+        """Путь к файлу в локальной файловой системе."""
+
+    def materialize(self, path: str, destination: str) -> None:
+        """Кладет файл в `destination` жесткой ссылкой, а если нельзя - копией."""
+        source = self.local_path(path)
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
+
+
+class ContentAddressedStorage(ImageStorage):
+    """
+    Файлы хранятся по sha256 содержимого: `<root>/ab/cd/<sha256>.<ext>`.
+
+    Одинаковые изображения лежат на диске один раз, число ссылок ведется в `stored_files`.
+    `derived_paths` возвращает производные файлы, которые удаляются вместе с оригиналом.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        derived_paths: Callable[[str], list[str]] | None = None,
+    ) -> None:
+        self.root = root
+        self.derived_paths = derived_paths
+
+    def path_for(self, sha256: str, extension: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], f"{sha256}.{extension}")
+
+    @staticmethod
+    def sha256_from_path(path: str) -> str | None:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return stem if SHA256_RE.match(stem) else None
+
+    @staticmethod
+    def _place(tmp_path: str, path: str) -> bool:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+        return True
+
+    async def save(
+        self, session: AsyncSession, upload: UploadFile, max_size: int
+    ) -> str:
+        received = await receive_upload(
+            upload=upload, directory=self.root, max_size=max_size
+        )
+        path = self.path_for(received.sha256, received.extension)
+        try:
+            # acquire блокирует sha256 до конца транзакции, поэтому файл кладем после
+            # него: удаление файла без ссылок (_unlink_unreferenced) ждет этой блокировки
+            ref_count = await StoredFileDAO.acquire(
+                session=session,
+                sha256=received.sha256,
+                path=path,
+                size=received.size,
+            )
+            placed = await asyncio.to_thread(self._place, received.path, path)
+        except BaseException:
+            await asyncio.to_thread(_remove_quietly, received.path)
+            raise
+        if placed and ref_count == 1:
+            on_rollback(
+                session,
+                f"unlink:{received.sha256}",
+                lambda: self._unlink_unreferenced(received.sha256, [path]),
+            )
+        return path
+
+    async def _unlink_unreferenced(self, sha256: str, paths: list[str]) -> None:
+        """
+        Удаляет файлы, если на sha256 больше нет ссылок.
+
+        Выполняется после исхода транзакции под той же advisory-блокировкой, что и
+        `StoredFileDAO.acquire`: параллельное сохранение того же файла либо уже
+        закоммитило новую ссылку (файл остается), либо дождется удаления и положит
+        файл заново.
+        """
+        async with db_helper.session_factory() as session, session.begin():
+            await StoredFileDAO.lock_digest(session, sha256)
+            if await StoredFileDAO.is_referenced(session, sha256):
+                return
+            for path in paths:
+                await asyncio.to_thread(_remove_quietly, path)
+
+    async def release(self, session: AsyncSession, path: str) -> None:
+        sha256 = self.sha256_from_path(path)
+        ref_count = (
+            await StoredFileDAO.release(session=session, sha256=sha256)
+            if sha256
+            else None
+        )
+        if ref_count is not None and ref_count > 0:
+            return
+        paths = [self.local_path(path)]
+        if self.derived_paths is not None:
+            paths.extend(self.derived_paths(path))
+        if ref_count is None:
+            # Файл сохранен до content-addressed хранилища, он ни с кем не разделяется
+            session.info.setdefault(UNLINK_ON_COMMIT_KEY, []).extend(paths)
+            return
+        on_commit(
+            session,
+            f"unlink:{sha256}",
+            lambda: self._unlink_unreferenced(sha256, paths),
+        )
+
+    def local_path(self, path: str) -> str:
+        return path
+
+
+person_images = ContentAddressedStorage(
+    root=PERSONS_IMAGE_ROOT,
+    derived_paths=variant_paths,
+)
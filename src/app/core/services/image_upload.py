@@ -0,0 +1,105 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from fastapi import UploadFile
+
+from app.core.exceptions import BadRequestException, PayloadTooLargeException
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+# Самая длинная проверяемая сигнатура - WebP: RIFF????WEBP
+SIGNATURE_SIZE = 12
+
+
+@dataclass
+class SavedUpload:
+    path: str
+    sha256: str
+    size: int
+    extension: str
+
+
+def detect_image_type(header: bytes) -> str | None:
+    """Определяет тип изображения по magic bytes, а не по имени файла или Content-Type."""
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def _write_chunk(file: BinaryIO, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    file.write(chunk)
+
+
+def _finalize(file: BinaryIO) -> None:
+    file.flush()
+    os.fsync(file.fileno())
+    file.close()
+    # NamedTemporaryFile создается с правами 0600
+    os.chmod(file.name, 0o644)
+
+
+def _discard(file: BinaryIO, tmp_path: str) -> None:
+    file.close()
+    try:
+        os.remove(tmp_path)
+    except FileNotFoundError:
+        pass
+
+
+async def receive_upload(
+    upload: UploadFile,
+    directory: str,
+    max_size: int,
+    chunk_size: int = CHUNK_SIZE,
+) -> SavedUpload:
+    """
+    Принимает загруженное изображение во временный файл `*.part` в `directory`.
+
+    Файл читается кусками и пишется вне event loop, sha256 считается по ходу записи.
+    Размер проверяется по фактически прочитанным байтам, а тип - по magic bytes
+    первого куска. Переносить файл на постоянное место должен вызывающий код.
+    """
+    await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
+    file = await asyncio.to_thread(
+        tempfile.NamedTemporaryFile,
+        dir=directory,
+        suffix=".part",
+        delete=False,
+    )
+    hasher = hashlib.sha256()
+    size = 0
+    extension = None
+    try:
+        while chunk := await upload.read(chunk_size):
+            if extension is None:
+                extension = detect_image_type(chunk[:SIGNATURE_SIZE])
+                if extension is None:
+                    raise BadRequestException(
+                        message="Unsupported image type, expected JPEG, PNG or WebP",
+                    )
+            size += len(chunk)
+            if size > max_size:
+                raise PayloadTooLargeException(
+                    message=f"Image is larger than {max_size} bytes",
+                )
+            await asyncio.to_thread(_write_chunk, file, hasher, chunk)
+        if extension is None:
+            raise BadRequestException(message="Empty image")
+        await asyncio.to_thread(_finalize, file)
+    except BaseException:
+        await asyncio.to_thread(_discard, file, file.name)
+        raise
+    return SavedUpload(
+        path=file.name,
+        sha256=hasher.hexdigest(),
+        size=size,
+        extension=extension,
+    )
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import os
+import tempfile
+
+from PIL import Image, ImageOps, features
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL = "thumbnail"
+MEDIUM = "medium"
+VARIANTS = (THUMBNAIL, MEDIUM)
+
+PERSONS_IMAGE_ROOT = "storage/persons"
+
+
+def _variant_format() -> tuple[str, str]:
+    if features.check("webp"):
+        return "WEBP", "webp"
+    return "JPEG", "jpg"
+
+
+VARIANT_FORMAT, VARIANT_EXTENSION = _variant_format()
+
+
+def relative_image_path(image_url: str) -> str:
+    """Путь изображения относительно каталога оригиналов."""
+    return os.path.relpath(image_url, PERSONS_IMAGE_ROOT)
+
+
+def variant_path(image_url: str, variant: str) -> str:
+    """
+    Путь производного изображения. Имя берется от оригинала, поэтому для
+    content-addressed файлов варианты тоже общие у одинаковых изображений.
+    """
+    stem = os.path.splitext(relative_image_path(image_url))[0]
+    return os.path.join(
+        settings.upload_settings.VARIANTS_PATH,
+        variant,
+        f"{stem}.{VARIANT_EXTENSION}",
+    )
+
+
+def variant_paths(image_url: str) -> list[str]:
+    return [variant_path(image_url, variant) for variant in VARIANTS]
+
+
+def variant_url(image_url: str, variant: str) -> str:
+    """URL эндпоинта, который отдает вариант и при необходимости создает его."""
+    return (
+        f"{settings.api.prefix}{settings.api.v1.prefix}{settings.api.v1.persons}"
+        f"/images/{variant}/{relative_image_path(image_url)}"
+    )
+
+
+def _render(source: str, destination: str, variant: str) -> None:
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if variant == THUMBNAIL:
+            size = settings.upload_settings.THUMBNAIL_SIZE
+            # Превью фиксированного размера: обрезаем по центру
+            image = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        else:
+            size = settings.upload_settings.MEDIUM_SIZE
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        if VARIANT_FORMAT == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        # Пишем во временный файл и переименовываем, чтобы параллельные запросы
+        # не увидели недописанный вариант
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(destination),
+            suffix=".part",
+        )
+        try:
+            with os.fdopen(fd, "wb") as file:
+                image.save(
+                    file,
+                    VARIANT_FORMAT,
+                    quality=settings.upload_settings.VARIANT_QUALITY,
+                    optimize=True,
+                )
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, destination)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def generate_variant(image_url: str, variant: str) -> str:
+    """Создает вариант, если его еще нет."""
+    destination = variant_path(image_url, variant)
+    if not os.path.exists(destination):
+        _render(image_url, destination, variant)
+    return destination
+
+
+def generate_variants(image_url: str) -> list[str]:
+    return [generate_variant(image_url, variant) for variant in VARIANTS]
+
+
+async def ensure_variant(image_url: str, variant: str) -> str:
+    path = variant_path(image_url, variant)
+    if await asyncio.to_thread(os.path.exists, path):
+        return path
+    return await asyncio.to_thread(generate_variant, image_url, variant)
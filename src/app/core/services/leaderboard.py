@@ -0,0 +1,57 @@
+import hashlib
+
+from app.core.db import db_helper
+from app.core.utils import redis_client
+from app.core.utils.cache import get_cached_leaderboard, set_cached_leaderboard
+from app.dao.branch import BranchDAO
+from app.schemas.branch import BranchRead
+from app.schemas.response import ListResponse
+
+from .feedback_counters import get_pending, merge_pending, votes_count
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Проверка If-None-Match: список тегов, слабые теги W/ и `*`."""
+    if not if_none_match:
+        return False
+    for tag in map(str.strip, if_none_match.split(",")):
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def get_leaderboard() -> tuple[bytes, str]:
+    """
+    Рейтинг филиалов уже сериализованным JSON и его ETag.
+
+    Ответ один для всех анонимных посетителей, поэтому JSON хранится в Redis
+    целиком. Кеш сбрасывается при переносе голосов и изменении филиалов,
+    голоса, еще не перенесенные из Redis, учитываются при построении.
+
+    Сессия открывается только при промахе кеша: зависимость сессии запроса
+    взяла бы соединение из пула на каждый запрос.
+    """
+    if (cached := await get_cached_leaderboard()) is not None:
+        return cached
+
+    async with db_helper.session_factory() as session:
+        branches = await BranchDAO.get_all(session=session)
+    pending = await get_pending(redis_client.client)
+    if pending:
+        branches = sorted(
+            (merge_pending(branch, pending) for branch in branches),
+            key=votes_count,
+            reverse=True,
+        )
+    body = (
+        ListResponse[BranchRead](data=branches, total=len(branches))
+        .model_dump_json()
+        .encode()
+    )
+    etag = make_etag(body)
+    await set_cached_leaderboard(body, etag)
+    return body, etag
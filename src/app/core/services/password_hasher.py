@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import bcrypt
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# `$2b$12$<salt+hash>`: версия, cost, соль и хеш
+BCRYPT_HASH = re.compile(r"^\$2[abxy]?\$(\d+)\$.")
+
+
+@dataclass
+class PasswordHasherStats:
+    submitted: int = 0
+    completed: int = 0
+    queued: int = 0
+    in_progress: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.completed if self.completed else 0.0
+
+
+def get_rounds(hashed_password: str | bytes) -> int | None:
+    """Возвращает cost из bcrypt-хеша вида `$2b$12$...`."""
+    if isinstance(hashed_password, bytes):
+        hashed_password = hashed_password.decode()
+    match = BCRYPT_HASH.match(hashed_password)
+    return int(match[1]) if match else None
+
+
+class PasswordHasher:
+    """
+    bcrypt в отдельном пуле потоков, чтобы хеширование не блокировало event loop.
+
+    bcrypt отпускает GIL, поэтому потоков достаточно. Размер пула ограничивает
+    число одновременных вычислений, остальные ждут в очереди (см. `stats`).
+    """
+
+    def __init__(self, rounds: int, max_workers: int) -> None:
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.stats = PasswordHasherStats()
+        # Счетчики меняются и из event loop, и из потоков пула
+        self._stats_lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="bcrypt",
+            )
+        return self._executor
+
+    def hash_sync(self, password: str) -> bytes:
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=self.rounds))
+
+    @staticmethod
+    def verify_sync(password: str, hashed_password: str | bytes) -> bool:
+        if isinstance(hashed_password, str):
+            hashed_password = hashed_password.encode()
+        return bcrypt.checkpw(password.encode(), hashed_password)
+
+    def needs_rehash(self, hashed_password: str | bytes) -> bool:
+        return get_rounds(hashed_password) != self.rounds
+
+    async def _run(self, func, *args):
+        submitted_at = time.monotonic()
+        with self._stats_lock:
+            self.stats.submitted += 1
+            self.stats.queued += 1
+
+        def job():
+            wait = time.monotonic() - submitted_at
+            with self._stats_lock:
+                self.stats.queued -= 1
+                self.stats.in_progress += 1
+            try:
+                return func(*args), wait
+            finally:
+                with self._stats_lock:
+                    self.stats.in_progress -= 1
+
+        loop = asyncio.get_running_loop()
+        result, wait = await loop.run_in_executor(self.executor, job)
+        with self._stats_lock:
+            self.stats.completed += 1
+            self.stats.total_wait += wait
+            self.stats.max_wait = max(self.stats.max_wait, wait)
+        if wait > 1:
+            logger.warning(
+                f"Очередь bcrypt: ожидание {wait:.2f} с, в очереди {self.stats.queued}"
+            )
+        return result
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(self.hash_sync, password)
+        return hashed.decode()
+
+    async def verify(self, password: str, hashed_password: str | bytes) -> bool:
+        return await self._run(self.verify_sync, password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.crypt.BCRYPT_ROUNDS,
+    max_workers=settings.crypt.PASSWORD_HASHER_WORKERS,
+)
@@ -0,0 +1,149 @@
+import logging
+import re
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.utils.cache import get_cached_searches, set_cached_search
+from app.dao.person import (
+    PersonDAO,
+    decode_search_cursor,
+    encode_search_cursor,
+    normalize_search,
+)
+from app.schemas.person import PersonFullRead, PersonSearchFilter
+
+logger = logging.getLogger(__name__)
+
+# pg_trgm.similarity_threshold по умолчанию - порог оператора %
+SIMILARITY_THRESHOLD = 0.3
+# Слова pg_trgm - последовательности букв и цифр
+WORD_RE = re.compile(r"[^\W_]+")
+
+Ranked = list[tuple[int, str, float]]
+
+
+def trigrams(value: str) -> set[str]:
+    """Триграммы как в pg_trgm: слово дополняется двумя пробелами слева и одним справа."""
+    result = set()
+    for word in WORD_RE.findall(value.lower()):
+        padded = f"  {word} "
+        result.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def similarity(left: str, right: str) -> float:
+    """Аналог `similarity()` из pg_trgm: доля общих триграмм."""
+    left_trigrams, right_trigrams = trigrams(left), trigrams(right)
+    if not left_trigrams or not right_trigrams:
+        return 0.0
+    common = len(left_trigrams & right_trigrams)
+    return common / (len(left_trigrams) + len(right_trigrams) - common)
+
+
+def _rank(rows: Ranked) -> Ranked:
+    # Оценки округляются, чтобы курсор одинаково сравнивался для оценок из БД и из Python
+    ranked = [(person_id, name, round(score, 6)) for person_id, name, score in rows]
+    ranked.sort(key=lambda row: (row[2], row[0]), reverse=True)
+    return ranked
+
+
+def filter_ranked(rows: Ranked, term: str) -> Ranked:
+    """Отбирает из результата префикса строки, подходящие под более длинный запрос."""
+    matched = []
+    for person_id, name, _ in rows:
+        score = similarity(name, term)
+        if term in name or score >= SIMILARITY_THRESHOLD:
+            matched.append((person_id, name, score))
+    return _rank(matched)
+
+
+def _prefixes(term: str) -> list[str]:
+    """Более короткие префиксы запроса, от длинного к короткому."""
+    return [
+        term[:length]
+        for length in range(len(term) - 1, 0, -1)
+        if not term[:length].endswith(" ")
+    ]
+
+
+async def _get_ranked(
+    session: AsyncSession,
+    term: str,
+    filters: PersonSearchFilter,
+) -> tuple[Ranked, bool]:
+    """
+    Ранжированный список для запроса и признак, что он полный.
+
+    Запрос и все его префиксы читаются из Redis одним HMGET. Если есть полный
+    результат более короткого префикса, новый результат считается из него в памяти.
+    """
+    department_id, role_id = filters.department_id, filters.role_id
+    prefixes = _prefixes(term)
+    cached = await get_cached_searches([term, *prefixes], department_id, role_id)
+    if cached[0] is not None:
+        return [tuple(row) for row in cached[0]["r"]], cached[0]["c"]
+
+    for prefix, entry in zip(prefixes, cached[1:]):
+        # Неполный список префикса может не содержать совпадений для запроса
+        if entry is None or not entry["c"]:
+            continue
+        ranked = filter_ranked(entry["r"], term)
+        logger.debug(f"Поиск {term!r}: {len(ranked)} из кеша префикса {prefix!r}")
+        await set_cached_search(term, department_id, role_id, ranked, complete=True)
+        return ranked, True
+
+    max_results = settings.redis_cache.SEARCH_CACHE_MAX_RESULTS
+    rows = await PersonDAO.search_ranked(
+        session=session,
+        term=term,
+        max_results=max_results,
+        filters=filters,
+    )
+    ranked = _rank(rows)
+    complete = len(ranked) < max_results
+    await set_cached_search(term, department_id, role_id, ranked, complete=complete)
+    return ranked, complete
+
+
+async def search_persons(
+    session: AsyncSession,
+    search: str,
+    limit: int,
+    cursor: str | None = None,
+    filters: PersonSearchFilter | None = None,
+) -> tuple[list[PersonFullRead], str | None]:
+    """
+    Поиск сотрудников через кеш ранжированных id, см. `PersonDAO.search`.
+
+    Курсор совместим с `PersonDAO.search`: если закешированный список неполный
+    и закончился, следующая страница берется напрямую из БД.
+    """
+    term = normalize_search(search)
+    if not term:
+        return [], None
+    filters = filters or PersonSearchFilter()
+    ranked, complete = await _get_ranked(session, term, filters)
+    if cursor:
+        position = decode_search_cursor(cursor)
+        ranked = [row for row in ranked if (row[2], row[0]) < position]
+
+    page = ranked[: limit + 1]
+    if len(page) <= limit and not complete:
+        return await PersonDAO.search(
+            session=session,
+            search=term,
+            limit=limit,
+            cursor=cursor,
+            filters=filters,
+        )
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_search_cursor(page[-1][2], page[-1][0])
+    persons = await PersonDAO.get_full_by_ids(
+        session=session,
+        ids=[person_id for person_id, _, _ in page],
+    )
+    return persons, next_cursor
@@ -0,0 +1,165 @@
+import asyncio
+import contextlib
+import os
+import shutil
+import time
+import zipfile
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from functools import partial
+from typing import BinaryIO
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+@dataclass
+class ZipEntry:
+    """
+    Файл архива: либо готовый файл `path`, либо `write`, который пишет содержимое сам.
+
+    JPEG/PNG/WebP уже сжаты, поэтому по умолчанию entry хранится без сжатия.
+    """
+
+    arcname: str
+    path: str | None = None
+    write: Callable[[BinaryIO], None] | None = None
+    compress: bool = False
+    # Источник данных вместо `path`, например entry предыдущего архива
+    opener: Callable[[], BinaryIO] | None = None
+    # Уже прочитанное содержимое, см. ImageReadStage
+    data: bytes | None = None
+    date_time: tuple[int, int, int, int, int, int] | None = None
+
+    @classmethod
+    def from_archive(
+        cls,
+        archive: zipfile.ZipFile,
+        name: str,
+        arcname: str | None = None,
+        path: str | None = None,
+    ) -> "ZipEntry":
+        """Entry, который копирует содержимое `name` из уже готового архива."""
+        info = archive.getinfo(name)
+        return cls(
+            arcname=arcname or name,
+            path=path,
+            compress=info.compress_type != zipfile.ZIP_STORED,
+            opener=partial(archive.open, info),
+            date_time=info.date_time,
+        )
+
+
+class _ChunkSink:
+    """Несмещаемый поток: копит записанные байты, пока их не заберет `drain`."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStreamWriter:
+    """
+    Пишет entries прямо в zip без промежуточных копий файлов.
+
+    `fileobj` может быть и обычным файлом, и несмещаемым потоком: тогда zipfile
+    пишет размеры и crc в data descriptor после данных entry.
+    """
+
+    def __init__(self, fileobj: BinaryIO, chunk_size: int = CHUNK_SIZE) -> None:
+        self.chunk_size = chunk_size
+        self._zip = zipfile.ZipFile(fileobj, "w", allowZip64=True)
+
+    @staticmethod
+    def _info(entry: ZipEntry) -> zipfile.ZipInfo:
+        if entry.opener is None and entry.data is None and entry.path:
+            info = zipfile.ZipInfo.from_file(entry.path, entry.arcname)
+        else:
+            info = zipfile.ZipInfo(
+                entry.arcname,
+                date_time=entry.date_time or time.localtime()[:6],
+            )
+        info.compress_type = (
+            zipfile.ZIP_DEFLATED if entry.compress else zipfile.ZIP_STORED
+        )
+        return info
+
+    def add(self, entry: ZipEntry) -> None:
+        info = self._info(entry)
+        # Размер заранее неизвестен для write, а на несмещаемом потоке его не поправить
+        with self._zip.open(info, "w", force_zip64=True) as target:
+            if entry.write is not None:
+                entry.write(target)
+                return
+            if entry.data is not None:
+                target.write(entry.data)
+                return
+            opener = entry.opener or partial(open, entry.path, "rb")
+            with opener() as source:
+                shutil.copyfileobj(source, target, self.chunk_size)
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def __enter__(self) -> "ZipStreamWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+async def stream_zip(
+    entries: AsyncIterable[ZipEntry],
+    chunk_size: int = CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Отдает zip кусками по мере записи, например как тело StreamingResponse.
+
+    Чтение файлов и сжатие идут в потоке, в памяти - не больше одного entry.
+    """
+    sink = _ChunkSink()
+    writer = ZipStreamWriter(sink, chunk_size=chunk_size)
+    async for entry in entries:
+        await asyncio.to_thread(writer.add, entry)
+        if data := sink.drain():
+            yield data
+    await asyncio.to_thread(writer.close)
+    if data := sink.drain():
+        yield data
+
+
+async def write_zip(
+    path: str,
+    entries: AsyncIterable[ZipEntry],
+    on_entry: Callable[[ZipEntry], Awaitable[None]] | None = None,
+) -> str:
+    """
+    Пишет zip в `path` через временный `*.part`, чтобы не отдать недописанный архив.
+
+    `on_entry` вызывается после записи каждого entry, например для прогресса.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.part"
+    try:
+        with open(tmp_path, "wb") as file:
+            with ZipStreamWriter(file) as writer:
+                async for entry in entries:
+                    await asyncio.to_thread(writer.add, entry)
+                    if on_entry is not None:
+                        await on_entry(entry)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+    return path
@@ -0,0 +1,168 @@
+import hashlib
+import logging
+from typing import Any
+
+import orjson
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+from . import redis_client
+
+logger = logging.getLogger(__name__)
+
+COUNT_CACHE_PREFIX = "count"
+SEARCH_CACHE_KEY = "search:persons"
+LEADERBOARD_CACHE_KEY = "feedback:leaderboard"
+
+
+def _count_key(table_name: str) -> str:
+    return f"{COUNT_CACHE_PREFIX}:{table_name}"
+
+
+def _filter_field(filter_dict: dict[str, Any]) -> str:
+    raw = orjson.dumps(filter_dict, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha1(raw).hexdigest()
+
+
+async def get_cached_count(table_name: str, filter_dict: dict[str, Any]) -> int | None:
+    """Возвращает закешированное количество записей или None, если кеша нет."""
+    if redis_client.client is None:
+        return None
+    try:
+        value = await redis_client.client.hget(
+            _count_key(table_name),
+            _filter_field(filter_dict),
+        )
+    except RedisError as e:
+        logger.warning(f"Не удалось прочитать count из Redis: {e}")
+        return None
+    return int(value) if value is not None else None
+
+
+async def set_cached_count(
+    table_name: str,
+    filter_dict: dict[str, Any],
+    count: int,
+) -> None:
+    # Все счетчики таблицы лежат в одном hash, чтобы сбрасывать их одним DEL
+    if redis_client.client is None:
+        return
+    key = _count_key(table_name)
+    try:
+        async with redis_client.client.pipeline(transaction=False) as pipe:
+            pipe.hset(key, _filter_field(filter_dict), count)
+            pipe.expire(key, settings.redis_cache.COUNT_CACHE_EXPIRATION, nx=True)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Не удалось записать count в Redis: {e}")
+
+
+async def invalidate_counts(table_name: str) -> None:
+    if redis_client.client is None:
+        return
+    try:
+        await redis_client.client.delete(_count_key(table_name))
+    except RedisError as e:
+        logger.warning(f"Не удалось сбросить count-кеш {table_name}: {e}")
+
+
+def _search_field(term: str, department_id: int | None, role_id: int | None) -> str:
+    return f"{department_id or ''}:{role_id or ''}:{term}"
+
+
+async def get_cached_searches(
+    terms: list[str],
+    department_id: int | None,
+    role_id: int | None,
+) -> list[dict | None]:
+    """
+    Закешированные результаты поиска для нескольких запросов за один HMGET.
+
+    Значение - `{"c": полный ли список, "r": [[id, full_name, score], ...]}` или None.
+    """
+    if redis_client.client is None or not terms:
+        return [None] * len(terms)
+    try:
+        values = await redis_client.client.hmget(
+            SEARCH_CACHE_KEY,
+            [_search_field(term, department_id, role_id) for term in terms],
+        )
+    except RedisError as e:
+        logger.warning(f"Не удалось прочитать кеш поиска из Redis: {e}")
+        return [None] * len(terms)
+    return [orjson.loads(value) if value is not None else None for value in values]
+
+
+async def set_cached_search(
+    term: str,
+    department_id: int | None,
+    role_id: int | None,
+    results: list[tuple[int, str, float]],
+    complete: bool,
+) -> None:
+    # Как и count-кеш: один hash с коротким TTL, сбрасывается одним DEL
+    if redis_client.client is None:
+        return
+    value = orjson.dumps({"c": complete, "r": results})
+    try:
+        async with redis_client.client.pipeline(transaction=False) as pipe:
+            pipe.hset(
+                SEARCH_CACHE_KEY, _search_field(term, department_id, role_id), value
+            )
+            pipe.expire(
+                SEARCH_CACHE_KEY,
+                settings.redis_cache.SEARCH_CACHE_EXPIRATION,
+                nx=True,
+            )
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Не удалось записать кеш поиска в Redis: {e}")
+
+
+async def invalidate_search() -> None:
+    if redis_client.client is None:
+        return
+    try:
+        await redis_client.client.delete(SEARCH_CACHE_KEY)
+    except RedisError as e:
+        logger.warning(f"Не удалось сбросить кеш поиска: {e}")
+
+
+async def get_cached_leaderboard() -> tuple[bytes, str] | None:
+    """Готовый JSON рейтинга филиалов и его ETag."""
+    if redis_client.client is None:
+        return None
+    try:
+        body, etag = await redis_client.client.hmget(
+            LEADERBOARD_CACHE_KEY, ["body", "etag"]
+        )
+    except RedisError as e:
+        logger.warning(f"Не удалось прочитать рейтинг филиалов из Redis: {e}")
+        return None
+    if body is None or etag is None:
+        return None
+    return body, etag.decode()
+
+
+async def set_cached_leaderboard(body: bytes, etag: str) -> None:
+    if redis_client.client is None:
+        return
+    try:
+        async with redis_client.client.pipeline(transaction=True) as pipe:
+            pipe.hset(LEADERBOARD_CACHE_KEY, mapping={"body": body, "etag": etag})
+            pipe.expire(
+                LEADERBOARD_CACHE_KEY, settings.feedback.LEADERBOARD_CACHE_EXPIRATION
+            )
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Не удалось записать рейтинг филиалов в Redis: {e}")
+
+
+async def invalidate_leaderboard() -> None:
+    if redis_client.client is None:
+        return
+    try:
+        await redis_client.client.delete(LEADERBOARD_CACHE_KEY)
+    except RedisError as e:
+        logger.warning(f"Не удалось сбросить рейтинг филиалов: {e}")
@@ -1,22 +1,106 @@
+import asyncio
+import contextlib
+import os
+import tempfile
+from collections.abc import AsyncIterator
+from functools import partial
 from typing import List
 
-import pandas as pd
+from app.core.db import db_helper
+from app.core.services.export_cache import ExportCache
+from app.core.services.image_storage import person_images
+from app.core.services.zip_stream import ZipEntry
+from app.core.utils.spreadsheet import open_spreadsheet
+from app.dao.person import PersonDAO
+from app.schemas.person import ExportColumn, PersonExcel, PersonExportSpec
 
-from app.schemas.person import PersonExcel
+SHEET_NAME = "person"
+IMAGES_DIR = "images"
 
+EXPORT_COLUMNS: dict[str, str] = {
+    "id": "Идентификатор",
+    "first_name": "Имя",
+    "last_name": "Фамилия",
+    "department": "Департамент",
+    "created_at": "Начало срока действия",
+    "extented_at": "Конец срока действия",
+}
 
-async def create_excel(file_path: str, persons_data: List[PersonExcel]):
-    data = [
-        {
-            "Идентификатор": p.id,
-            "Имя": p.first_name.upper(),
-            "Фамилия": p.last_name.upper(),
-            "Департамент": p.department,
-            "Начало срока действия": p.created_at,
-            "Конец срока действия": p.extented_at,
-        } for p in persons_data
-    ]
-    df = pd.DataFrame(data)
-    df.to_excel(file_path, index=False)
-    return file_path
 
+def export_columns(columns: List[ExportColumn] | None = None) -> List[ExportColumn]:
+    return columns or list(EXPORT_COLUMNS)
+
+
+def export_headers(columns: List[ExportColumn] | None = None) -> list[str]:
+    return [EXPORT_COLUMNS[column] for column in export_columns(columns)]
+
+
+def export_row(person: PersonExcel, columns: List[ExportColumn] | None = None) -> list:
+    row = {
+        "id": person.id,
+        "first_name": person.first_name.upper(),
+        "last_name": person.last_name.upper(),
+        "department": person.department,
+        "created_at": person.created_at,
+        "extented_at": person.extented_at,
+    }
+    return [row[column] for column in export_columns(columns)]
+
+
+def image_arcname(person: PersonExcel) -> str:
+    extension = os.path.splitext(person.image_url)[1]
+    return f"{IMAGES_DIR}/{person.first_name.upper()}+{person.last_name.upper()}_{person.id}{extension}"
+
+
+async def person_export_entries(
+    spec: PersonExportSpec,
+    cache: ExportCache | None = None,
+) -> AsyncIterator[ZipEntry]:
+    """
+    Entries архива выгрузки: изображения, таблица в конце.
+
+    Сначала все строки читаются из БД и пишутся во временный файл таблицы, и
+    только после закрытия сессии entries отдаются в архив. Так соединение и
+    серверный курсор не держатся, пока медленный клиент скачивает архив. В памяти
+    остаются только пути изображений, не строки.
+
+    Сессия открывается здесь, а не берется из запроса: при отдаче архива
+    StreamingResponse читает entries уже после выхода из эндпоинта.
+    С `cache` неизмененные изображения берутся из предыдущего архива.
+    """
+    fd, sheet_path = tempfile.mkstemp(suffix=f".{spec.format}")
+    os.close(fd)
+    try:
+        sheet = await asyncio.to_thread(
+            open_spreadsheet,
+            sheet_path,
+            export_headers(spec.columns),
+            spec.format,
+        )
+        images: list[ZipEntry] = []
+        async with db_helper.session_factory() as session:
+            async for person in PersonDAO.stream_persons_excel(
+                session=session,
+                department_id=spec.department_id,
+                role_id=spec.role_id,
+            ):
+                # append только буферизует строку, в поток его не выносим
+                sheet.append(export_row(person, spec.columns))
+                arcname = image_arcname(person)
+                path = person_images.local_path(person.image_url)
+                if cache is not None:
+                    images.append(cache.image_entry(person, arcname, path))
+                else:
+                    images.append(ZipEntry(arcname=arcname, path=path))
+        await asyncio.to_thread(sheet.close)
+        for entry in images:
+            yield entry
+        # xlsx уже сжат внутри, csv - нет
+        yield ZipEntry(
+            arcname=f"{SHEET_NAME}.{spec.format}",
+            opener=partial(open, sheet_path, "rb"),
+            compress=spec.format == "csv",
+        )
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(sheet_path)
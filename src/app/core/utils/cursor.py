@@ -0,0 +1,31 @@
+import base64
+import binascii
+from typing import Any
+
+import orjson
+
+
+def encode_cursor(payload: dict[str, Any]) -> str:
+    """
+    Кодирует позицию keyset-пагинации в непрозрачную строку.
+
+    >>> decode_cursor(encode_cursor({"k": "id", "v": 10, "id": 10, "d": "next"}))
+    {'k': 'id', 'v': 10, 'id': 10, 'd': 'next'}
+    """
+    raw = orjson.dumps(payload)
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """
+    Декодирует курсор, созданный `encode_cursor`.
+    Бросает ValueError, если курсор поврежден.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        payload = orjson.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, orjson.JSONDecodeError, UnicodeEncodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor: payload is not an object")
+    return payload
@@ -0,0 +1,116 @@
+import asyncio
+import csv
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable, Sequence
+from typing import Literal
+
+from openpyxl import Workbook
+
+SpreadsheetFormat = Literal["xlsx", "csv"]
+
+BATCH_SIZE = 1000
+
+
+class SpreadsheetWriter(ABC):
+    """
+    Построчная запись таблицы в файл: память не зависит от числа строк.
+
+    `append` дешевый и синхронный, `close` дописывает файл и может занять время.
+    """
+
+    def __init__(self, path: str, headers: Sequence[str]) -> None:
+        self.path = path
+        self.headers = list(headers)
+        self.rows = 0
+
+    @abstractmethod
+    def append(self, row: Sequence) -> None:
+        """Добавляет строку в порядке `headers`."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Завершает файл."""
+
+    def __enter__(self) -> "SpreadsheetWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class XlsxWriter(SpreadsheetWriter):
+    """openpyxl в режиме write_only: строки сразу уходят во временный XML листа."""
+
+    def __init__(self, path: str, headers: Sequence[str]) -> None:
+        super().__init__(path, headers)
+        self._workbook = Workbook(write_only=True)
+        # Имя листа как у прежней выгрузки через pandas
+        self._sheet = self._workbook.create_sheet("Sheet1")
+        self._sheet.append(self.headers)
+
+    def append(self, row: Sequence) -> None:
+        self._sheet.append(row)
+        self.rows += 1
+
+    def close(self) -> None:
+        if self._workbook is not None:
+            self._workbook.save(self.path)
+            self._workbook = None
+
+
+class CsvWriter(SpreadsheetWriter):
+    def __init__(self, path: str, headers: Sequence[str]) -> None:
+        super().__init__(path, headers)
+        # utf-8-sig: Excel иначе не узнает кодировку кириллицы
+        self._file = open(path, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.headers)
+
+    def append(self, row: Sequence) -> None:
+        self._writer.writerow(row)
+        self.rows += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+WRITERS: dict[str, type[SpreadsheetWriter]] = {
+    "xlsx": XlsxWriter,
+    "csv": CsvWriter,
+}
+
+
+def open_spreadsheet(
+    path: str,
+    headers: Sequence[str],
+    format: SpreadsheetFormat = "xlsx",
+) -> SpreadsheetWriter:
+    return WRITERS[format](path, headers)
+
+
+async def write_spreadsheet(
+    path: str,
+    headers: Sequence[str],
+    rows: AsyncIterable[Sequence],
+    format: SpreadsheetFormat = "xlsx",
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """Пишет строки асинхронного итератора по мере поступления, пачками вне event loop."""
+    writer = await asyncio.to_thread(open_spreadsheet, path, headers, format)
+    batch = []
+
+    def flush(rows: list) -> None:
+        for row in rows:
+            writer.append(row)
+
+    try:
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                await asyncio.to_thread(flush, batch)
+                batch = []
+        if batch:
+            await asyncio.to_thread(flush, batch)
+    finally:
+        await asyncio.to_thread(writer.close)
+    return writer.rows
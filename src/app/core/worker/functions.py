@@ -1,17 +1,24 @@
 import asyncio
 import logging
-import os
-import shutil
-from shutil import make_archive
-from typing import List
 
 import uvloop
 from arq.worker import Worker
 
-from app.core.config import SOURCE_DIR
+from app.core.config import settings
 from app.core.db import db_helper
-from app.core.utils.create_zip import create_excel
-from app.schemas.person import PersonExcel
+from app.core.services.export_cache import ExportCache
+from app.core.services.export_jobs import (
+    ExportProgress,
+    export_path,
+    remove_expired_exports,
+)
+from app.core.services.feedback_counters import flush_votes
+from app.core.services.image_io import ImageReadStage
+from app.core.services.image_variants import generate_variants
+from app.core.services.zip_stream import write_zip
+from app.core.utils.create_zip import person_export_entries
+from app.dao.person import PersonDAO
+from app.schemas.person import PersonExportSpec
 
 asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
@@ -21,36 +28,75 @@ logger = logging.getLogger(__name__)
 # -------- background tasks --------
 
 
-async def create_zip(ctx: Worker, persons_data: List[PersonExcel]):
-    zip_path = f"{SOURCE_DIR}/storage/person.zip"
-    tmp_dir = f"{SOURCE_DIR}/storage/tmp"
+async def create_zip(ctx: Worker, spec: dict):
+    """
+    Выгрузка сотрудников в zip. В задачу передаются только параметры выгрузки,
+    строки воркер читает из Postgres сам через серверный курсор.
 
-    # Удалить старый zip (если есть)
-    try:
-        os.remove(zip_path)
-    except FileNotFoundError:
-        pass
-
-    # Создать временные папки один раз
-    os.makedirs(f"{tmp_dir}/images", exist_ok=True)
-
-    # Скопировать изображения
-    for person in persons_data:
-        shutil.copyfile(
-            person.image_url,
-            f"{tmp_dir}/images/{person.first_name.upper()}+{person.last_name.upper()}_{person.id}.{person.image_url.split('.')[-1]}",
-        )
-
-    # Создать Excel
-    await create_excel(file_path=f"{tmp_dir}/person.xlsx", persons_data=persons_data)
+    Изображения и таблица пишутся прямо в entries архива, без временного каталога.
+    Статус и прогресс лежат в Redis под id задачи arq, архив - в `export_path(job_id)`.
 
-    # Создать ZIP-архив
-    make_archive(f"{SOURCE_DIR}/storage/person", "zip", tmp_dir)
-
-    # Удалить временные файлы
-    shutil.rmtree(tmp_dir)
-
-    return zip_path
+    Выгрузка инкрементальная: если persons, departments и roles не менялись с прошлой
+    сборки с теми же параметрами, сразу отдается прошлый архив.
+    """
+    spec = PersonExportSpec.model_validate(spec)
+    job_id = ctx["job_id"]
+    progress = ExportProgress(ctx["redis"], job_id)
+    await progress.start()
+    cache = ExportCache(spec)
+    try:
+        # Версию берем до чтения строк: изменения во время сборки дадут новую версию
+        async with db_helper.session_factory() as session:
+            version = await PersonDAO.get_export_version(session)
+        await asyncio.to_thread(cache.load)
+        if cache.is_fresh(version):
+            path = await asyncio.to_thread(cache.materialize, export_path(job_id))
+            progress.rows = progress.images = cache.rows
+            logger.info(f"Выгрузка {job_id}: данные не менялись, отдан прошлый архив")
+        else:
+            await asyncio.to_thread(cache.open_previous)
+            try:
+                images = ImageReadStage(
+                    workers=settings.export.IMAGE_IO_WORKERS,
+                    on_error=progress.on_error,
+                )
+                path = await write_zip(
+                    export_path(job_id),
+                    images.run(person_export_entries(spec, cache=cache)),
+                    on_entry=progress.on_entry,
+                )
+            finally:
+                cache.close()
+            await asyncio.to_thread(cache.save, path, version)
+            logger.info(
+                f"Выгрузка {job_id}: из прошлого архива взято изображений: {cache.reused}"
+            )
+    except Exception as e:
+        logger.error(f"Выгрузка {job_id} завершилась ошибкой: {e}")
+        await progress.fail(str(e))
+        raise
+    await progress.finish()
+    return path
+
+
+async def cleanup_exports(ctx: Worker) -> int:
+    removed = await asyncio.to_thread(
+        remove_expired_exports,
+        settings.export.EXPORT_TTL,
+    )
+    if removed:
+        logger.info(f"Удалено устаревших архивов выгрузки: {removed}")
+    return removed
+
+
+async def flush_feedback_votes(ctx: Worker) -> int:
+    async with db_helper.session_factory() as session:
+        return await flush_votes(ctx["redis"], session)
+
+
+async def generate_person_image_variants(ctx: Worker, image_url: str) -> list[str]:
+    # Pillow держит GIL не все время, но ресайз все равно выносим из event loop воркера
+    return await asyncio.to_thread(generate_variants, image_url)
 
 
 async def sample_background_task(
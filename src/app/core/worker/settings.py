@@ -1,11 +1,15 @@
 from typing import ClassVar
 
+from arq import cron
 from arq.connections import RedisSettings
 
 from app.core.config import settings
 
 from .functions import (
+    cleanup_exports,
     create_zip,
+    flush_feedback_votes,
+    generate_person_image_variants,
     sample_background_task,
     shutdown,
     startup,
@@ -16,9 +20,16 @@ class WorkerSettings:
     functions: ClassVar[list] = [
         sample_background_task,
         create_zip,
+        generate_person_image_variants,
     ]
     # Настройка периодических задач
     cron_jobs = [  # noqa
+        cron(cleanup_exports, minute=0, run_at_startup=True),
+        cron(
+            flush_feedback_votes,
+            second=set(range(0, 60, settings.feedback.COUNTERS_FLUSH_INTERVAL)),
+            run_at_startup=True,
+        ),
         # cron(
         #     sample_background_task,
         #     minute=list(range(0, 60)),
@@ -1,3 +1,6 @@
-__all__ = ("BaseDAO",)
+__all__ = (
+    "BaseDAO",
+    "OnConflict",
+)
 
-from .base import BaseDAO
+from .base import BaseDAO, OnConflict
@@ -1,23 +1,49 @@
 import logging
+import uuid
+from datetime import date, datetime
+from enum import Enum
+from itertools import batched
 from typing import Any, Generic, List, TypeVar
 
+import orjson
 from asyncpg.exceptions import NotNullViolationError, UniqueViolationError
 from fastapi import HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy import delete as sqlalchemy_delete
-from sqlalchemy import func
+from sqlalchemy import column, func, literal_column, text, tuple_, values
 from sqlalchemy import update as sqlalchemy_update
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import CompileError, IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.db import mark_write, on_commit
+from app.core.exceptions import BadRequestException
+from app.core.utils.cache import (
+    get_cached_count,
+    invalidate_counts,
+    set_cached_count,
+)
+from app.core.utils.cursor import decode_cursor, encode_cursor
 from app.models.base import Base
+from app.schemas.bulk import BulkInsertResult, BulkUpdateResult
+from app.schemas.response import CountStrategy
 
 logger = logging.getLogger(__name__)
 
 # Объявляем типовой параметр T с ограничением, что это наследник Base
 T = TypeVar("T", bound=Base)
 
+# Лимит bind-параметров в одном запросе Postgres (int16)
+POSTGRES_MAX_PARAMS = 32767
+BULK_BATCH_SIZE = 5000
+
+
+class OnConflict(str, Enum):
+    ERROR = "error"
+    SKIP = "skip"
+    UPDATE = "update"
+
 
 class BaseDAO(Generic[T]):
     model: type[T]
@@ -92,6 +118,7 @@ class BaseDAO(Generic[T]):
         try:
             await session.flush()
             logger.info(f"Запись {cls.model.__name__} успешно добавлена.")
+            await cls._on_write(session)
         except IntegrityError as e:
             if isinstance(e.orig, UniqueViolationError):
                 raise HTTPException(
@@ -121,6 +148,7 @@ class BaseDAO(Generic[T]):
         try:
             await session.flush()
             logger.info(f"Успешно добавлено {len(new_instances)} записей.")
+            await cls._on_write(session)
         except IntegrityError as e:
             if isinstance(e.orig, UniqueViolationError):
                 raise HTTPException(
@@ -139,6 +167,205 @@ class BaseDAO(Generic[T]):
             raise e
         return new_instances
 
+    @classmethod
+    async def bulk_insert(
+        cls,
+        session: AsyncSession,
+        instances: List[BaseModel],
+        on_conflict: OnConflict = OnConflict.ERROR,
+        conflict_fields: List[str] | None = None,
+        batch_size: int = BULK_BATCH_SIZE,
+        use_copy: bool = True,
+    ) -> BulkInsertResult:
+        """
+        Массовая вставка без создания ORM-объектов.
+
+        Через asyncpg строки передаются потоком COPY (copy_records_to_table),
+        для остальных драйверов - пачками INSERT ... VALUES.
+        При конфликте по `conflict_fields` строки пропускаются (SKIP) или обновляются (UPDATE).
+        """
+        if on_conflict != OnConflict.ERROR and not conflict_fields:
+            raise ValueError("Для обработки конфликтов нужен conflict_fields.")
+        groups: dict[tuple[str, ...], list[dict]] = {}
+        for item in instances:
+            values = item.model_dump(exclude_unset=True)
+            groups.setdefault(tuple(values), []).append(values)
+        logger.info(
+            f"Массовая вставка {cls.model.__name__}. Количество: {len(instances)}, конфликт: {on_conflict.value}"
+        )
+
+        result = BulkInsertResult()
+        try:
+            driver_connection = await cls._copy_connection(session) if use_copy else None
+            for columns, rows in groups.items():
+                if driver_connection is not None:
+                    size = batch_size
+                else:
+                    # Python-default колонки тоже уходят параметрами, считаем по всей таблице
+                    params_per_row = len(cls.model.__table__.columns)
+                    size = min(batch_size, POSTGRES_MAX_PARAMS // params_per_row)
+                for batch in batched(rows, size):
+                    if driver_connection is not None:
+                        inserted, updated = await cls._copy_batch(
+                            driver_connection,
+                            columns,
+                            batch,
+                            on_conflict,
+                            conflict_fields,
+                        )
+                    else:
+                        inserted, updated = await cls._insert_batch(
+                            session,
+                            columns,
+                            batch,
+                            on_conflict,
+                            conflict_fields,
+                        )
+                    result.inserted += inserted
+                    result.updated += updated
+                    result.skipped += len(batch) - inserted - updated
+            if driver_connection is not None:
+                # COPY не проходит через ORM-события, сессию помечаем явно
+                mark_write(session)
+            if any("id" in columns for columns in groups):
+                await cls._sync_id_sequence(session)
+            await session.flush()
+        except IntegrityError as e:
+            cls._raise_integrity_error(e.orig)
+            raise
+        except (UniqueViolationError, NotNullViolationError) as e:
+            # COPY идет мимо SQLAlchemy, поэтому ошибки asyncpg приходят как есть
+            cls._raise_integrity_error(e)
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Ошибка при массовой вставке: {e}")
+            raise
+        logger.info(
+            f"Массовая вставка {cls.model.__name__} завершена: добавлено {result.inserted}, "
+            f"обновлено {result.updated}, пропущено {result.skipped}."
+        )
+        await cls._on_write(session)
+        return result
+
+    @classmethod
+    async def _copy_connection(cls, session: AsyncSession):
+        """Возвращает соединение asyncpg текущей транзакции или None, если драйвер другой."""
+        connection = await session.connection()
+        if connection.dialect.driver != "asyncpg":
+            return None
+        # Адаптер asyncpg открывает транзакцию лениво, на первом запросе -
+        # без него COPY выполнился бы вне транзакции сессии
+        await connection.exec_driver_sql("SELECT 1")
+        raw_connection = await connection.get_raw_connection()
+        return raw_connection.driver_connection
+
+    @classmethod
+    async def _copy_batch(
+        cls,
+        driver_connection: Any,
+        columns: tuple[str, ...],
+        batch: tuple[dict, ...],
+        on_conflict: OnConflict,
+        conflict_fields: List[str] | None,
+    ) -> tuple[int, int]:
+        table = cls.model.__tablename__
+        records = [tuple(row[column] for column in columns) for row in batch]
+        if on_conflict == OnConflict.ERROR:
+            await driver_connection.copy_records_to_table(
+                table, records=records, columns=list(columns)
+            )
+            return len(records), 0
+
+        # COPY не умеет ON CONFLICT: грузим во временную таблицу и переливаем одним INSERT
+        tmp_table = f"tmp_{table}_{uuid.uuid4().hex[:12]}"
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        await driver_connection.execute(
+            f'CREATE TEMP TABLE "{tmp_table}" ON COMMIT DROP AS '
+            f'SELECT {column_list} FROM "{table}" WITH NO DATA'
+        )
+        try:
+            await driver_connection.copy_records_to_table(
+                tmp_table, records=records, columns=list(columns)
+            )
+            conflict = cls._conflict_clause(columns, on_conflict, conflict_fields)
+            rows = await driver_connection.fetch(
+                f'INSERT INTO "{table}" ({column_list}) '
+                f'SELECT {column_list} FROM "{tmp_table}" {conflict} '
+                "RETURNING (xmax = 0) AS inserted"
+            )
+        finally:
+            await driver_connection.execute(f'DROP TABLE IF EXISTS "{tmp_table}"')
+        inserted = sum(1 for row in rows if row["inserted"])
+        return inserted, len(rows) - inserted
+
+    @staticmethod
+    def _conflict_clause(
+        columns: tuple[str, ...],
+        on_conflict: OnConflict,
+        conflict_fields: List[str],
+    ) -> str:
+        target = ", ".join(f'"{field}"' for field in conflict_fields)
+        update_columns = [column for column in columns if column not in conflict_fields]
+        if on_conflict == OnConflict.SKIP or not update_columns:
+            return f"ON CONFLICT ({target}) DO NOTHING"
+        assignments = ", ".join(
+            f'"{column}" = EXCLUDED."{column}"' for column in update_columns
+        )
+        return f"ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+
+    @classmethod
+    async def _insert_batch(
+        cls,
+        session: AsyncSession,
+        columns: tuple[str, ...],
+        batch: tuple[dict, ...],
+        on_conflict: OnConflict,
+        conflict_fields: List[str] | None,
+    ) -> tuple[int, int]:
+        stmt = pg_insert(cls.model).values(list(batch))
+        update_columns = [c for c in columns if c not in (conflict_fields or [])]
+        if on_conflict == OnConflict.SKIP or (
+            on_conflict == OnConflict.UPDATE and not update_columns
+        ):
+            stmt = stmt.on_conflict_do_nothing(index_elements=conflict_fields)
+        elif on_conflict == OnConflict.UPDATE:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_fields,
+                set_={column: stmt.excluded[column] for column in update_columns},
+            )
+        result = await session.execute(
+            stmt.returning(literal_column("(xmax = 0)").label("inserted"))
+        )
+        rows = result.all()
+        inserted = sum(1 for row in rows if row.inserted)
+        return inserted, len(rows) - inserted
+
+    @classmethod
+    async def _sync_id_sequence(cls, session: AsyncSession) -> None:
+        # После вставки явных id сдвигаем sequence, иначе следующий add() получит дубликат
+        table = cls.model.__tablename__
+        await session.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f'COALESCE((SELECT max(id) FROM "{table}"), 0) + 1, false)'
+            )
+        )
+
+    @staticmethod
+    def _raise_integrity_error(error: BaseException | None) -> None:
+        # SQLAlchemy оборачивает исключение asyncpg, исходное лежит в __cause__
+        for exc in (error, getattr(error, "__cause__", None)):
+            if isinstance(exc, UniqueViolationError):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="duplicate key value violates unique constraint",
+                )
+            if isinstance(exc, NotNullViolationError):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="null value in column violates not-null constraint",
+                )
+
     @classmethod
     async def update(cls, session: AsyncSession, filters: BaseModel, values: BaseModel):
         # Обновить записи по фильтрам
@@ -157,6 +384,7 @@ class BaseDAO(Generic[T]):
             result = await session.execute(query)
             await session.flush()
             logger.info(f"Обновлено {result.rowcount} записей.")
+            await cls._on_write(session)
             return result.rowcount
         except IntegrityError as e:
             if isinstance(e.orig, UniqueViolationError):
@@ -188,6 +416,7 @@ class BaseDAO(Generic[T]):
             result = await session.execute(query)
             await session.flush()
             logger.info(f"Удалено {result.rowcount} записей.")
+            await cls._on_write(session)
             return result.rowcount
         except SQLAlchemyError as e:
             await session.rollback()
@@ -217,6 +446,8 @@ class BaseDAO(Generic[T]):
 
             # Удаление объекта через ORM
             await session.delete(obj)
+            # Хук регистрирует сброс кешей на коммит, поэтому он должен быть до коммита
+            await cls._on_write(session)
             await session.commit()
 
             logger.info(f"Запись {cls.model.__name__} успешно удалена: {filter_dict}")
@@ -228,22 +459,91 @@ class BaseDAO(Generic[T]):
             raise e
 
     @classmethod
-    async def count(cls, session: AsyncSession, filters: BaseModel):
-        print(filters)
-        # Подсчитать количество записей
+    async def count(
+        cls,
+        session: AsyncSession,
+        filters: BaseModel,
+        strategy: CountStrategy = CountStrategy.EXACT,
+    ) -> tuple[int, CountStrategy]:
+        """
+        Подсчитать количество записей.
+
+        Возвращает количество и стратегию, которой оно на самом деле получено:
+        без статистики или кеша считается точно и возвращается EXACT.
+        """
         filter_dict = filters.model_dump(exclude_none=True)
         logger.info(
-            f"Подсчет количества записей {cls.model.__name__} по фильтру: {filter_dict}"
+            f"Подсчет количества записей {cls.model.__name__} по фильтру: {filter_dict}, стратегия: {strategy.value}"
         )
+        if strategy == CountStrategy.ESTIMATE:
+            count = await cls._estimate_count(session, filter_dict)
+            if count is not None:
+                return count, CountStrategy.ESTIMATE
+        elif strategy == CountStrategy.CACHED:
+            count = await get_cached_count(cls.model.__tablename__, filter_dict)
+            if count is not None:
+                logger.info(f"Количество записей взято из кеша: {count}.")
+                return count, CountStrategy.CACHED
         try:
             query = select(func.count(cls.model.id)).filter_by(**filter_dict)
             result = await session.execute(query)
             count = result.scalar()
             logger.info(f"Найдено {count} записей.")
-            return count
         except SQLAlchemyError as e:
             logger.error(f"Ошибка при подсчете записей: {e}")
             raise
+        if strategy == CountStrategy.CACHED:
+            await set_cached_count(cls.model.__tablename__, filter_dict, count)
+        return count, CountStrategy.EXACT
+
+    @classmethod
+    async def _estimate_count(
+        cls, session: AsyncSession, filter_dict: dict
+    ) -> int | None:
+        """
+        Оценка количества записей по статистике планировщика.
+        Без фильтров берется pg_class.reltuples, с фильтрами - оценка строк из EXPLAIN.
+        Возвращает None, если статистики нет (таблица ни разу не анализировалась).
+        """
+        try:
+            if not filter_dict:
+                result = await session.execute(
+                    text(
+                        "SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"
+                    ),
+                    {"table": cls.model.__tablename__},
+                )
+                estimate = result.scalar()
+                return estimate if estimate is not None and estimate >= 0 else None
+
+            # Компилируем диалектом текущего соединения, чтобы экранирование
+            # литералов совпало с тем, что ожидает драйвер
+            connection = await session.connection()
+            query = select(cls.model.id).filter_by(**filter_dict)
+            compiled = query.compile(
+                dialect=connection.dialect,
+                compile_kwargs={"literal_binds": True},
+            )
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {compiled}"
+            )
+            plan = result.scalar()
+            if isinstance(plan, (str, bytes)):
+                plan = orjson.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при оценке количества записей: {e}")
+            raise
+        except (NotImplementedError, CompileError) as e:
+            # literal_binds умеет не все типы - в этом случае считаем точно
+            logger.warning(f"Не удалось построить EXPLAIN для оценки: {e}")
+            return None
+
+    @classmethod
+    async def _on_write(cls, session: AsyncSession) -> None:
+        """Хук после изменения данных таблицы: сбрасывает производные кеши после коммита."""
+        table = cls.model.__tablename__
+        on_commit(session, f"counts:{table}", lambda: invalidate_counts(table))
 
     @classmethod
     async def paginate(
@@ -280,6 +580,94 @@ class BaseDAO(Generic[T]):
             logger.error(f"Ошибка при пагинации записей: {e}")
             raise
 
+    @classmethod
+    async def paginate_by_cursor(
+        cls,
+        session: AsyncSession,
+        cursor: str | None = None,
+        page_size: int = 10,
+        filters: BaseModel | None = None,
+        order_by: str = "created_at",
+        order_direction: str = "desc",
+    ) -> tuple[list[T], str | None, str | None]:
+        """
+        Keyset-пагинация по паре (order_by, id) вместо OFFSET.
+
+        Возвращает записи страницы, курсор следующей и курсор предыдущей страницы.
+        Колонка `order_by` должна быть NOT NULL, иначе строки с NULL не попадут в выборку.
+        """
+        filter_dict = filters.model_dump(exclude_none=True) if filters else {}
+        logger.info(
+            f"Keyset-пагинация записей {cls.model.__name__} по фильтру: {filter_dict}, размер страницы: {page_size}"
+        )
+        order_column = getattr(cls.model, order_by)
+        descending = order_direction.lower() == "desc"
+        backwards = False
+
+        query = select(cls.model).filter_by(**filter_dict)
+        if cursor:
+            try:
+                position = decode_cursor(cursor)
+                if position["k"] != order_by or position["d"] not in ("next", "prev"):
+                    raise ValueError("cursor does not match ordering")
+                value = cls._cursor_value(order_column, position["v"])
+                last_id = int(position["id"])
+            except (ValueError, KeyError, TypeError) as e:
+                logger.error(f"Некорректный курсор {cursor!r}: {e}")
+                raise BadRequestException(message="Invalid cursor")
+            backwards = position["d"] == "prev"
+            key = tuple_(order_column, cls.model.id)
+            if descending != backwards:
+                query = query.where(key < tuple_(value, last_id))
+            else:
+                query = query.where(key > tuple_(value, last_id))
+
+        # При движении назад сканируем в обратном порядке и разворачиваем результат
+        if descending != backwards:
+            query = query.order_by(order_column.desc(), cls.model.id.desc())
+        else:
+            query = query.order_by(order_column.asc(), cls.model.id.asc())
+
+        try:
+            result = await session.execute(query.limit(page_size + 1))
+            records = list(result.scalars().all())
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при keyset-пагинации записей: {e}")
+            raise
+
+        has_more = len(records) > page_size
+        records = records[:page_size]
+        if backwards:
+            records.reverse()
+
+        next_cursor = prev_cursor = None
+        if records:
+            if has_more or backwards:
+                next_cursor = cls._make_cursor(records[-1], order_by, "next")
+            if (has_more and backwards) or (cursor and not backwards):
+                prev_cursor = cls._make_cursor(records[0], order_by, "prev")
+        logger.info(f"Найдено {len(records)} записей по курсору.")
+        return records, next_cursor, prev_cursor
+
+    @staticmethod
+    def _make_cursor(record: Any, order_by: str, direction: str) -> str:
+        value = getattr(record, order_by)
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        return encode_cursor({"k": order_by, "v": value, "id": record.id, "d": direction})
+
+    @staticmethod
+    def _cursor_value(order_column: Any, value: Any) -> Any:
+        # Восстанавливаем тип значения, потерянный при сериализации в JSON
+        python_type = order_column.type.python_type
+        if python_type is datetime and isinstance(value, str):
+            return datetime.fromisoformat(value)
+        if python_type is date and isinstance(value, str):
+            return date.fromisoformat(value)
+        if not isinstance(value, python_type):
+            raise ValueError(f"unexpected cursor value type {type(value).__name__}")
+        return value
+
     @classmethod
     async def find_by_ids(cls, session: AsyncSession, ids: List[int]) -> List[Any]:
         """Найти несколько записей по списку ID"""
@@ -297,77 +685,177 @@ class BaseDAO(Generic[T]):
     @classmethod
     async def upsert(
         cls, session: AsyncSession, unique_fields: List[str], values: BaseModel
-    ):
-        """Создать запись или обновить существующую"""
+    ) -> T:
+        """
+        Создать запись или обновить существующую одним запросом
+        INSERT ... ON CONFLICT (unique_fields) DO UPDATE ... RETURNING.
+        По unique_fields должен существовать уникальный индекс.
+        """
         values_dict = values.model_dump(exclude_unset=True)
-        filter_dict = {
-            field: values_dict[field] for field in unique_fields if field in values_dict
-        }
-
-        logger.info(f"Upsert для {cls.model.__name__}")
+        missing = [field for field in unique_fields if field not in values_dict]
+        if missing:
+            raise ValueError(f"В значениях нет уникальных полей: {missing}")
+
+        logger.info(f"Upsert для {cls.model.__name__} по полям {unique_fields}")
+        stmt = cls._upsert_statement(
+            pg_insert(cls.model).values(**values_dict),
+            unique_fields,
+            values_dict.keys(),
+        )
         try:
-            existing = await cls.find_one_or_none(
-                session, BaseModel.construct(**filter_dict)
+            result = await session.execute(
+                stmt,
+                execution_options={"populate_existing": True},
             )
-            if existing:
-                # Обновляем существующую запись
-                for key, value in values_dict.items():
-                    setattr(existing, key, value)
-                await session.flush()
-                logger.info(f"Обновлена существующая запись {cls.model.__name__}")
-                return existing
-            else:
-                # Создаем новую запись
-                new_instance = cls.model(**values_dict)
-                session.add(new_instance)
-                await session.flush()
-                logger.info(f"Создана новая запись {cls.model.__name__}")
-                return new_instance
+            record = result.scalar_one()
+            await session.flush()
+            logger.info(f"Upsert записи {cls.model.__name__} с ID {record.id} выполнен")
+            await cls._on_write(session)
+            return record
         except IntegrityError as e:
-            if isinstance(e.orig, UniqueViolationError):
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="duplicate key value violates unique constraint",
-                )
-            elif isinstance(e.orig, NotNullViolationError):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="null value in column violates not-null constraint",
-                )
-
+            cls._raise_integrity_error(e.orig)
+            raise
         except SQLAlchemyError as e:
             await session.rollback()
             logger.error(f"Ошибка при upsert: {e}")
             raise
 
     @classmethod
-    async def bulk_update(cls, session: AsyncSession, records: List[BaseModel]) -> int:
-        """Массовое обновление записей"""
+    async def upsert_many(
+        cls,
+        session: AsyncSession,
+        unique_fields: List[str],
+        values: List[BaseModel],
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> list[T]:
+        """
+        Пакетный upsert для импорта из внешних систем.
+        Повторы одного ключа внутри вызова схлопываются, побеждает последнее значение.
+        """
+        groups: dict[tuple[str, ...], dict[tuple, dict]] = {}
+        for item in values:
+            values_dict = item.model_dump(exclude_unset=True)
+            try:
+                key = tuple(values_dict[field] for field in unique_fields)
+            except KeyError as e:
+                raise ValueError(f"В значениях нет уникального поля {e}") from e
+            groups.setdefault(tuple(values_dict), {})[key] = values_dict
+
+        logger.info(
+            f"Пакетный upsert {cls.model.__name__}. Количество: {len(values)}, групп: {len(groups)}"
+        )
+        params_per_row = len(cls.model.__table__.columns)
+        size = min(batch_size, POSTGRES_MAX_PARAMS // params_per_row)
+        records: list[T] = []
+        try:
+            for columns, rows in groups.items():
+                for batch in batched(rows.values(), size):
+                    stmt = cls._upsert_statement(
+                        pg_insert(cls.model).values(list(batch)),
+                        unique_fields,
+                        columns,
+                    )
+                    result = await session.execute(
+                        stmt,
+                        execution_options={"populate_existing": True},
+                    )
+                    records.extend(result.scalars().all())
+            await session.flush()
+            logger.info(f"Upsert выполнен для {len(records)} записей")
+            await cls._on_write(session)
+            return records
+        except IntegrityError as e:
+            cls._raise_integrity_error(e.orig)
+            raise
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Ошибка при пакетном upsert: {e}")
+            raise
+
+    @classmethod
+    def _upsert_statement(cls, stmt, unique_fields: List[str], columns):
+        update_columns = [column for column in columns if column not in unique_fields]
+        # ON CONFLICT не применяет onupdate, поэтому updated_at выставляем сами
+        set_ = {column: stmt.excluded[column] for column in update_columns}
+        if set_ and "updated_at" not in set_:
+            set_["updated_at"] = func.now()
+        if not set_:
+            # Обновлять нечего, но DO UPDATE нужен, чтобы RETURNING вернул существующую строку
+            set_ = {field: stmt.excluded[field] for field in unique_fields}
+        return stmt.on_conflict_do_update(
+            index_elements=unique_fields,
+            set_=set_,
+        ).returning(cls.model)
+
+    @classmethod
+    async def bulk_update(
+        cls,
+        session: AsyncSession,
+        records: List[BaseModel],
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> BulkUpdateResult:
+        """
+        Массовое обновление записей по id.
+
+        Записи группируются по набору обновляемых колонок, каждая группа уходит
+        одним UPDATE ... FROM (VALUES ...) на пачку, а не отдельным запросом на запись.
+        """
         logger.info(f"Массовое обновление записей {cls.model.__name__}")
+        groups: dict[tuple[str, ...], list[dict]] = {}
+        result = BulkUpdateResult()
+        for record in records:
+            record_dict = record.model_dump(exclude_unset=True)
+            columns = tuple(k for k in record_dict if k != "id")
+            if "id" not in record_dict or not columns:
+                result.skipped += 1
+                continue
+            groups.setdefault(columns, []).append(record_dict)
+
         try:
-            updated_count = 0
-            for record in records:
-                record_dict = record.model_dump(exclude_unset=True)
-                if "id" not in record_dict:
-                    continue
-
-                update_data = {k: v for k, v in record_dict.items() if k != "id"}
-                stmt = (
-                    sqlalchemy_update(cls.model)
-                    .filter_by(id=record_dict["id"])
-                    .values(**update_data)
-                )
-                result = await session.execute(stmt)
-                updated_count += result.rowcount
+            for columns, rows in groups.items():
+                size = min(batch_size, POSTGRES_MAX_PARAMS // (len(columns) + 1))
+                for batch in batched(rows, size):
+                    rowcount = await cls._update_batch(session, columns, batch)
+                    result.batch_rowcounts.append(rowcount)
+                    result.updated += rowcount
 
             await session.flush()
-            logger.info(f"Обновлено {updated_count} записей")
-            return updated_count
+            logger.info(
+                f"Обновлено {result.updated} записей за {len(result.batch_rowcounts)} запросов"
+            )
+            await cls._on_write(session)
+            return result
+        except IntegrityError as e:
+            cls._raise_integrity_error(e.orig)
+            raise
         except SQLAlchemyError as e:
             await session.rollback()
             logger.error(f"Ошибка при массовом обновлении: {e}")
             raise
 
+    @classmethod
+    async def _update_batch(
+        cls,
+        session: AsyncSession,
+        columns: tuple[str, ...],
+        batch: tuple[dict, ...],
+    ) -> int:
+        table_columns = cls.model.__table__.c
+        # Типы колонок задаем явно, чтобы параметры VALUES не резолвились в text
+        source = values(
+            column("id", table_columns.id.type),
+            *[column(name, table_columns[name].type) for name in columns],
+            name="v",
+        ).data([(row["id"], *(row[name] for name in columns)) for row in batch])
+        stmt = (
+            sqlalchemy_update(cls.model)
+            .where(cls.model.id == source.c.id)
+            .values({name: source.c[name] for name in columns})
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(stmt)
+        return result.rowcount
+
     @classmethod
     async def delete_many(cls, session: AsyncSession, ids: List[int]) -> int:
         """Удалить несколько записей по списку ID"""
@@ -381,6 +869,7 @@ class BaseDAO(Generic[T]):
             result = await session.execute(query)
             await session.flush()
             logger.info(f"Удалено {result.rowcount} записей.")
+            await cls._on_write(session)
             return result.rowcount
         except SQLAlchemyError as e:
             await session.rollback()
@@ -1,10 +1,26 @@
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.db import on_commit
+from app.core.utils.cache import invalidate_leaderboard
 from app.dao import BaseDAO
 from app.models.branch import Branch
 from app.schemas.branch import BranchRead, Feedback
 
+RATINGS = (1, 2, 3, 4, 5)
+
+# votes_count и rating - генерируемые столбцы, Postgres обновляет их вместе со счетчиками
+BRANCH_COLUMNS = """
+    id,
+    name,
+    rating_1_count,
+    rating_2_count,
+    rating_3_count,
+    rating_4_count,
+    rating_5_count,
+    rating
+"""
+
 
 class BranchDAO(BaseDAO):
     model = Branch
@@ -12,38 +28,30 @@ class BranchDAO(BaseDAO):
     @classmethod
     async def get_all(cls, session: AsyncSession):
         query = text(
-            """
-            SELECT 
-                id, 
-                name,
-                rating_1_count,
-                rating_2_count,
-                rating_3_count,
-                rating_4_count,
-                rating_5_count,
-                (rating_1_count + rating_2_count + rating_3_count + rating_4_count + rating_5_count) AS votes_count,
-                CASE 
-                    WHEN (rating_1_count + rating_2_count + rating_3_count + rating_4_count + rating_5_count) = 0 
-                    THEN 0
-                    ELSE (
-                        (1 * rating_1_count +
-                         2 * rating_2_count +
-                         3 * rating_3_count +
-                         4 * rating_4_count +
-                         5 * rating_5_count
-                        )::float
-                        /
-                        (rating_1_count + rating_2_count + rating_3_count + rating_4_count + rating_5_count)
-                    )
-                END AS rating
+            f"""
+            SELECT {BRANCH_COLUMNS}
             FROM branches
-            ORDER BY votes_count DESC
+            ORDER BY votes_count DESC, id
             """
         )
         result = await session.execute(query)
         branches = result.mappings().all()
         return [BranchRead(**branch) for branch in branches]
 
+    @classmethod
+    async def _on_write(cls, session: AsyncSession) -> None:
+        await super()._on_write(session)
+        on_commit(session, "leaderboard", invalidate_leaderboard)
+
+    @classmethod
+    async def get_branch(
+        cls, session: AsyncSession, branch_id: int
+    ) -> BranchRead | None:
+        query = text(f"SELECT {BRANCH_COLUMNS} FROM branches WHERE id = :branch_id")
+        result = await session.execute(query, {"branch_id": branch_id})
+        row = result.mappings().one_or_none()
+        return BranchRead(**row) if row else None
+
     @classmethod
     async def add_feedback(
         cls, session: AsyncSession, feedback: Feedback
@@ -54,31 +62,46 @@ class BranchDAO(BaseDAO):
             UPDATE branches
             SET rating_{feedback.rating}_count = rating_{feedback.rating}_count + 1
             WHERE id = :branch_id
-            RETURNING 
-                id, 
-                name,
-                rating_1_count,
-                rating_2_count,
-                rating_3_count,
-                rating_4_count,
-                rating_5_count,
-                CASE 
-                    WHEN (rating_1_count + rating_2_count + rating_3_count + rating_4_count + rating_5_count) = 0 
-                    THEN 0
-                    ELSE (
-                        (1 * rating_1_count +
-                         2 * rating_2_count +
-                         3 * rating_3_count +
-                         4 * rating_4_count +
-                         5 * rating_5_count
-                        )::float
-                        /
-                        (rating_1_count + rating_2_count + rating_3_count + rating_4_count + rating_5_count)
-                    )
-                END AS rating
+            RETURNING {BRANCH_COLUMNS}
             """
         )
         result = await session.execute(query, {"branch_id": feedback.branch_id})
         row = result.mappings().one()
         await session.commit()
         return BranchRead(**row)
+
+    @classmethod
+    async def apply_feedback_deltas(
+        cls,
+        session: AsyncSession,
+        deltas: dict[int, list[int]],
+    ) -> int:
+        """
+        Прибавляет накопленные голоса одним UPDATE: `deltas` - {branch_id: [d1, ..., d5]}.
+
+        Возвращает число обновленных филиалов.
+        """
+        if not deltas:
+            return 0
+        branch_ids = sorted(deltas)
+        params = {"ids": branch_ids}
+        for index, rating in enumerate(RATINGS):
+            params[f"r{rating}"] = [
+                deltas[branch_id][index] for branch_id in branch_ids
+            ]
+        set_clause = ", ".join(
+            f"rating_{rating}_count = b.rating_{rating}_count + d.r{rating}"
+            for rating in RATINGS
+        )
+        arrays = ", ".join(f"CAST(:r{rating} AS integer[])" for rating in RATINGS)
+        columns = ", ".join(f"r{rating}" for rating in RATINGS)
+        query = text(
+            f"""
+            UPDATE branches AS b
+            SET {set_clause}
+            FROM unnest(CAST(:ids AS integer[]), {arrays}) AS d(id, {columns})
+            WHERE b.id = d.id
+            """
+        )
+        result = await session.execute(query, params)
+        return result.rowcount
@@ -1,6 +1,8 @@
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.db import on_commit
+from app.core.utils.cache import invalidate_search
 from app.dao import BaseDAO
 from app.models.departments import Department
 from app.schemas.department import (
@@ -12,6 +14,12 @@ from app.schemas.department import (
 class DepartmentDAO(BaseDAO):
     model = Department
 
+    @classmethod
+    async def _on_write(cls, session: AsyncSession) -> None:
+        await super()._on_write(session)
+        # Фильтр поиска по роли зависит от departments.role_id
+        on_commit(session, "search", invalidate_search)
+
     @classmethod
     async def get_role_id(cls, session: AsyncSession, department_id: int) -> int | None:
         query = select(cls.model.role_id).filter(cls.model.id == department_id)
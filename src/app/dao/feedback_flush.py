@@ -0,0 +1,35 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dao import BaseDAO
+from app.models.feedback_flush import FeedbackFlush
+
+
+class FeedbackFlushDAO(BaseDAO):
+    model = FeedbackFlush
+
+    @classmethod
+    async def mark_applied(cls, session: AsyncSession, flush_id: str) -> bool:
+        """
+        Отмечает пачку перенесенной в текущей транзакции.
+
+        False - пачка уже перенесена. Параллельная вставка того же id ждет
+        коммита первой транзакции на уникальном индексе и тоже получает False.
+        """
+        stmt = (
+            pg_insert(FeedbackFlush)
+            .values(flush_id=flush_id)
+            .on_conflict_do_nothing(index_elements=[FeedbackFlush.flush_id])
+            .returning(FeedbackFlush.id)
+        )
+        return (await session.execute(stmt)).scalar_one_or_none() is not None
+
+    @classmethod
+    async def remove_older_than(cls, session: AsyncSession, max_age: int) -> None:
+        deadline = datetime.now(UTC) - timedelta(seconds=max_age)
+        await session.execute(
+            delete(FeedbackFlush).where(FeedbackFlush.created_at < deadline)
+        )
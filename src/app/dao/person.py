@@ -1,15 +1,62 @@
+import hashlib
+import logging
 from datetime import timedelta
-from typing import List
+from typing import AsyncIterator, List
 
-from sqlalchemy import text
+import orjson
+from sqlalchemy import Select, func, or_, select, text, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.db import on_commit
+from app.core.exceptions import BadRequestException
+from app.core.utils.cache import invalidate_search
+from app.core.utils.cursor import decode_cursor, encode_cursor
 from app.dao import BaseDAO
+from app.models.departments import Department
 from app.models.persons import Person
+from app.models.roles import Role
 from app.schemas.department import DepartmentRead
-from app.schemas.person import PersonExcel, PersonFullRead
+from app.schemas.person import PersonExcel, PersonFullRead, PersonSearchFilter
 from app.schemas.role import RoleRead
 
+logger = logging.getLogger(__name__)
+
+SEARCH_LIMIT = 20
+EXPORT_BATCH_SIZE = 1000
+
+
+FULL_READ_COLUMNS = (
+    Person.id,
+    Person.first_name,
+    Person.last_name,
+    Person.image_url,
+    Department.id.label("department_id"),
+    Department.name.label("department_name"),
+    Role.id.label("role_id"),
+    Role.name.label("role_name"),
+)
+
+
+def normalize_search(search: str) -> str:
+    return " ".join(search.lower().split())
+
+
+def encode_search_cursor(score: float, person_id: int) -> str:
+    return encode_cursor({"s": score, "id": person_id})
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        position = decode_cursor(cursor)
+        return float(position["s"]), int(position["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        logger.error(f"Некорректный курсор поиска {cursor!r}: {e}")
+        raise BadRequestException(message="Invalid cursor")
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 
 class PersonDAO(BaseDAO):
     model = Person
@@ -47,60 +94,190 @@ class PersonDAO(BaseDAO):
         return None
 
     @classmethod
-    async def get_persons_excel(cls, session: AsyncSession) -> List[PersonExcel]:
-        query = text(
-            """
-            SELECT 
-                p.id AS id,
-                p.first_name AS first_name,
-                p.last_name AS last_name,
-                d.name AS department,
-                p.image_url AS image_url,
-                r.name AS role,
-                p.created_at AS created_at
-            FROM persons p
-            JOIN departments d ON p.department_id = d.id
-            JOIN roles r ON d.role_id = r.id
-            """
+    async def stream_persons_excel(
+        cls,
+        session: AsyncSession,
+        department_id: int | None = None,
+        role_id: int | None = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[PersonExcel]:
+        """
+        Строки выгрузки через серверный курсор: в памяти не больше `batch_size` строк.
+
+        Курсор живет внутри транзакции, поэтому сессию нельзя коммитить до конца итерации.
+        """
+        query = (
+            select(
+                Person.id,
+                Person.first_name,
+                Person.last_name,
+                Person.image_url,
+                Person.created_at,
+                Person.updated_at,
+                Department.name.label("department"),
+                Role.name.label("role"),
+            )
+            .join(Department, Person.department_id == Department.id)
+            .join(Role, Department.role_id == Role.id)
+            .order_by(Person.id)
+            .execution_options(yield_per=batch_size)
         )
+        if department_id is not None:
+            query = query.where(Department.id == department_id)
+        if role_id is not None:
+            query = query.where(Role.id == role_id)
+
+        result = await session.stream(query)
+        async for record in result.mappings():
+            yield PersonExcel(
+                id=record["id"],
+                first_name=record["first_name"],
+                last_name=record["last_name"],
+                department=f'Agro/{record["role"].lower()}/{record["department"].upper()}',
+                image_url=record["image_url"],
+                created_at=record["created_at"].strftime("%Y/%m/%d %H:%M:%S"),
+                extented_at=(record["created_at"] + timedelta(days=365 * 10)).strftime("%Y/%m/%d %H:%M:%S"),
+                updated_at=record["updated_at"].isoformat() if record["updated_at"] else None,
+            )
+
+    @classmethod
+    async def get_export_version(cls, session: AsyncSession) -> str:
+        """
+        Версия данных выгрузки: меняется при любом изменении persons, departments или roles.
+
+        count и sum(id) ловят вставки и удаления, сумма времен изменения - правки строк.
+        Сумма, а не max: updated_at = now() - время начала транзакции, и поздно
+        закоммиченная правка может оказаться старше уже учтенного максимума.
+        """
+        changed_at = "extract(epoch FROM coalesce(updated_at, created_at))"
+        query = text(f"""
+            SELECT 'persons' AS name, count(*) AS count, sum(id) AS ids, sum({changed_at}) AS changed
+            FROM persons
+            UNION ALL
+            SELECT 'departments', count(*), sum(id), sum({changed_at})
+            FROM departments
+            UNION ALL
+            SELECT 'roles', count(*), sum(id), sum({changed_at})
+            FROM roles
+        """)
         result = await session.execute(query)
-        records = result.mappings().all()
-        response = [PersonExcel(
-            id=record["id"],
-            first_name=record["first_name"],
-            last_name=record["last_name"],
-            department=f'Agro/{record["role"].lower()}/{record["department"].upper()}',
-            image_url=record["image_url"],
-            created_at=record["created_at"].strftime("%Y/%m/%d %H:%M:%S"),
-            extented_at=(record["created_at"] + timedelta(days=365 * 10)).strftime("%Y/%m/%d %H:%M:%S"),
-        ) for record in records]
-        return response
+        version = [
+            [record["name"], record["count"], str(record["ids"]), str(record["changed"])]
+            for record in result.mappings().all()
+        ]
+        return hashlib.sha1(orjson.dumps(version)).hexdigest()
+
+    @staticmethod
+    def _search_filter(
+        query: Select,
+        term: str,
+        filters: PersonSearchFilter,
+    ) -> Select:
+        # Подстрока и триграммная похожесть (%), оба условия используют GIN-индекс
+        query = (
+            query.join(Department, Person.department_id == Department.id)
+            .join(Role, Department.role_id == Role.id)
+            .where(
+                or_(
+                    Person.full_name.like(f"%{escape_like(term)}%", escape="\\"),
+                    Person.full_name.op("%")(term),
+                )
+            )
+        )
+        if filters.department_id is not None:
+            query = query.where(Department.id == filters.department_id)
+        if filters.role_id is not None:
+            query = query.where(Role.id == filters.role_id)
+        return query
 
     @classmethod
-    async def search(cls, session: AsyncSession, search: str) -> List[PersonFullRead]:
-        query = text("""
-            SELECT 
-                p.id AS id,
-                p.first_name AS first_name,
-                p.last_name AS last_name,
-                d.name AS department_name,
-                d.id AS department_id,
-                p.image_url AS image_url,
-                r.name AS role_name,
-                r.id AS role_id
-            FROM persons p
-            JOIN departments d ON p.department_id = d.id
-            JOIN roles r ON d.role_id = r.id
-            WHERE p.first_name || ' ' || p.last_name LIKE :search
-            """)
-        result = await session.execute(query, {"search": f"%{search}%"})
+    async def search(
+        cls,
+        session: AsyncSession,
+        search: str,
+        limit: int = SEARCH_LIMIT,
+        cursor: str | None = None,
+        filters: PersonSearchFilter | None = None,
+    ) -> tuple[List[PersonFullRead], str | None]:
+        """
+        Поиск по `full_name` (pg_trgm): подстрока или триграммная похожесть без учета регистра.
+
+        Результаты отсортированы по similarity, затем по id; следующая страница - по курсору.
+        Возвращает найденных сотрудников и курсор следующей страницы.
+        """
+        term = normalize_search(search)
+        if not term:
+            return [], None
+        score = func.similarity(Person.full_name, term)
+        query = cls._search_filter(
+            select(*FULL_READ_COLUMNS, score.label("score")),
+            term,
+            filters or PersonSearchFilter(),
+        )
+        if cursor:
+            last_score, last_id = decode_search_cursor(cursor)
+            query = query.where(tuple_(score, Person.id) < tuple_(last_score, last_id))
+        query = query.order_by(score.desc(), Person.id.desc()).limit(limit + 1)
+
+        result = await session.execute(query)
         records = result.mappings().all()
-        response = [PersonFullRead(
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            last = records[-1]
+            next_cursor = encode_search_cursor(last["score"], last["id"])
+        return [cls._full_read(record) for record in records], next_cursor
+
+    @classmethod
+    async def search_ranked(
+        cls,
+        session: AsyncSession,
+        term: str,
+        max_results: int,
+        filters: PersonSearchFilter | None = None,
+    ) -> list[tuple[int, str, float]]:
+        """Ранжированный список (id, full_name, similarity) для кеша поиска."""
+        score = func.similarity(Person.full_name, term)
+        query = cls._search_filter(
+            select(Person.id, Person.full_name, score),
+            term,
+            filters or PersonSearchFilter(),
+        )
+        query = query.order_by(score.desc(), Person.id.desc()).limit(max_results)
+        result = await session.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    @classmethod
+    async def get_full_by_ids(
+        cls,
+        session: AsyncSession,
+        ids: List[int],
+    ) -> List[PersonFullRead]:
+        """Сотрудники с отделом и ролью в порядке `ids`."""
+        if not ids:
+            return []
+        query = (
+            select(*FULL_READ_COLUMNS)
+            .join(Department, Person.department_id == Department.id)
+            .join(Role, Department.role_id == Role.id)
+            .where(Person.id.in_(ids))
+        )
+        result = await session.execute(query)
+        by_id = {record["id"]: record for record in result.mappings().all()}
+        return [cls._full_read(by_id[person_id]) for person_id in ids if person_id in by_id]
+
+    @staticmethod
+    def _full_read(record) -> PersonFullRead:
+        return PersonFullRead(
             id=record["id"],
             first_name=record["first_name"],
             last_name=record["last_name"],
             department=DepartmentRead(id=record["department_id"], role_id=record["role_id"], name=record["department_name"]),
             role=RoleRead(id=record["role_id"], name=record["role_name"]),
             image_url=record["image_url"],
-        ) for record in records]
-        return response
\ No newline at end of file
+        )
+
+    @classmethod
+    async def _on_write(cls, session: AsyncSession) -> None:
+        await super()._on_write(session)
+        on_commit(session, "search", invalidate_search)
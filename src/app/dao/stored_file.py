@@ -0,0 +1,71 @@
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dao import BaseDAO
+from app.models.stored_file import StoredFile
+
+
+class StoredFileDAO(BaseDAO):
+    model = StoredFile
+
+    @staticmethod
+    async def lock_digest(session: AsyncSession, sha256: str) -> None:
+        """
+        Блокировка файла до конца транзакции (pg_advisory_xact_lock).
+
+        Сериализует добавление ссылки и удаление файла без ссылок: строки
+        stored_files для этого мало, после удаления последней ссылки ее уже нет.
+        """
+        key = int.from_bytes(bytes.fromhex(sha256[:16]), "big", signed=True)
+        await session.execute(select(func.pg_advisory_xact_lock(key)))
+
+    @classmethod
+    async def is_referenced(cls, session: AsyncSession, sha256: str) -> bool:
+        query = select(StoredFile.id).where(StoredFile.sha256 == sha256)
+        return (await session.execute(query)).first() is not None
+
+    @classmethod
+    async def acquire(
+        cls,
+        session: AsyncSession,
+        sha256: str,
+        path: str,
+        size: int,
+    ) -> int:
+        """Добавляет ссылку на файл и возвращает новое число ссылок."""
+        await cls.lock_digest(session, sha256)
+        stmt = pg_insert(StoredFile).values(
+            sha256=sha256,
+            path=path,
+            size=size,
+            ref_count=1,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StoredFile.sha256],
+            set_={
+                "ref_count": StoredFile.ref_count + 1,
+                "updated_at": func.now(),
+            },
+        ).returning(StoredFile.ref_count)
+        ref_count = (await session.execute(stmt)).scalar_one()
+        await cls._on_write(session)
+        return ref_count
+
+    @classmethod
+    async def release(cls, session: AsyncSession, sha256: str) -> int | None:
+        """
+        Убирает ссылку на файл и возвращает оставшееся число ссылок.
+        None - файла нет в учете (загружен до content-addressed хранилища).
+        """
+        stmt = (
+            update(StoredFile)
+            .where(StoredFile.sha256 == sha256)
+            .values(ref_count=StoredFile.ref_count - 1, updated_at=func.now())
+            .returning(StoredFile.ref_count)
+        )
+        ref_count = (await session.execute(stmt)).scalar_one_or_none()
+        if ref_count is not None and ref_count <= 0:
+            await session.execute(delete(StoredFile).where(StoredFile.sha256 == sha256))
+        await cls._on_write(session)
+        return ref_count
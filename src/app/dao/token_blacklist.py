@@ -2,7 +2,9 @@ from datetime import UTC, datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.auth.blacklist import token_blacklist
 from app.core.auth.utils import decode_jwt
+from app.core.db import on_commit
 from app.dao import BaseDAO
 from app.models.token_blacklist import TokenBlacklist
 from app.schemas.token_blacklist import (
@@ -35,6 +37,14 @@ class TokenBlacklistDAO(BaseDAO):
                 }
             ),
         )
+        jti = payload.get("jti")
+        # Публикуем только после коммита: иначе пересборка фильтра, прочитавшая
+        # Postgres до коммита, заменит фильтр без этого JTI
+        on_commit(
+            session,
+            f"blacklist:{jti}",
+            lambda: token_blacklist.add(jti=jti, expires_at=expires_at),
+        )
 
     @classmethod
     async def get_token_by_jti(
@@ -56,7 +66,14 @@ class TokenBlacklistDAO(BaseDAO):
         session: AsyncSession,
         jti: str,
     ) -> bool:
-        """Проверяет, находится ли токен в черном списке"""
+        """
+        Проверяет, находится ли токен в черном списке.
+        Сначала Bloom-фильтр и Redis, в Postgres идем, только если они не могут
+        ответить (Redis недоступен или фильтр еще не синхронизирован).
+        """
+        cached = await token_blacklist.is_blacklisted(jti)
+        if cached is not None:
+            return cached
         token = await cls.get_token_by_jti(
             session=session,
             jti=jti,
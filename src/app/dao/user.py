@@ -1,5 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.auth.user_cache import user_cache
+from app.core.db import on_commit
 from app.dao import BaseDAO
 from app.models.user import User
 from app.schemas.user import (
@@ -24,3 +26,30 @@ class UserDAO(BaseDAO):
             ),
         )
         return user if user else None
+
+    @classmethod
+    async def get_user_read_by_id(
+        cls,
+        session: AsyncSession,
+        user_id: int,
+    ) -> UserRead | None:
+        """Пользователь для авторизации: сначала кеш, затем Postgres."""
+        user = await user_cache.get(user_id)
+        if user is not None:
+            return user
+        db_user = await cls.find_one_or_none_by_id(
+            session=session,
+            data_id=user_id,
+        )
+        if db_user is None:
+            return None
+        user = UserRead.model_validate(db_user)
+        await user_cache.set(user)
+        return user
+
+    @classmethod
+    async def _on_write(cls, session: AsyncSession) -> None:
+        # Запись может затронуть любые строки по фильтру, поэтому сбрасываем весь кеш.
+        # До коммита параллельный запрос вернул бы в кеш старые is_active/is_superuser
+        await super()._on_write(session)
+        on_commit(session, "users", user_cache.invalidate)
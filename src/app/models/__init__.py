@@ -2,9 +2,11 @@ __all__ = (
     "Base",
     "Branch",
     "Department",
+    "FeedbackFlush",
     "Person",
     "Post",
     "Role",
+    "StoredFile",
     "TokenBlacklist",
     "User",
 )
@@ -12,8 +14,10 @@ __all__ = (
 from .base import Base
 from .branch import Branch
 from .departments import Department
+from .feedback_flush import FeedbackFlush
 from .persons import Person
 from .post import Post
 from .roles import Role
+from .stored_file import StoredFile
 from .token_blacklist import TokenBlacklist
 from .user import User
@@ -1,10 +1,24 @@
-from sqlalchemy import Integer, String
+from sqlalchemy import Computed, Float, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
 
+VOTES_COUNT_SQL = (
+    "rating_1_count + rating_2_count + rating_3_count + rating_4_count + rating_5_count"
+)
+RATING_SQL = (
+    f"CASE WHEN ({VOTES_COUNT_SQL}) = 0 THEN 0 "
+    "ELSE (1 * rating_1_count + 2 * rating_2_count + 3 * rating_3_count"
+    f" + 4 * rating_4_count + 5 * rating_5_count)::float / ({VOTES_COUNT_SQL}) END"
+)
+
 
 class Branch(Base):
+    __table_args__ = (
+        # Сортировка рейтинга филиалов
+        Index("ix_branches_votes_count", text("votes_count DESC"), "id"),
+    )
+
     name: Mapped[str] = mapped_column(
         String(255),
         unique=True,
@@ -34,3 +48,12 @@ class Branch(Base):
         nullable=False,
         default=0,
     )
+    # Итоги считает Postgres при каждом изменении счетчиков
+    votes_count: Mapped[int] = mapped_column(
+        Integer,
+        Computed(VOTES_COUNT_SQL, persisted=True),
+    )
+    rating: Mapped[float] = mapped_column(
+        Float,
+        Computed(RATING_SQL, persisted=True),
+    )
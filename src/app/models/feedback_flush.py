@@ -0,0 +1,14 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class FeedbackFlush(Base):
+    """Пачка голосов из Redis, уже перенесенная в счетчики филиалов."""
+
+    flush_id: Mapped[str] = mapped_column(
+        String(32),
+        unique=True,
+        index=True,
+    )
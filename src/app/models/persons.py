@@ -1,11 +1,40 @@
-
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import DDL, FetchedValue, ForeignKey, Index, String, event
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
 
+# full_name заполняет триггер, а не STORED generated column: добавление
+# вычисляемой колонки переписывает всю таблицу под ACCESS EXCLUSIVE
+FULL_NAME_FUNCTION = DDL(
+    """
+    CREATE OR REPLACE FUNCTION persons_set_full_name() RETURNS trigger AS $$
+    BEGIN
+        NEW.full_name := lower(NEW.first_name || ' ' || NEW.last_name);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """
+)
+FULL_NAME_TRIGGER = DDL(
+    """
+    CREATE TRIGGER persons_set_full_name
+    BEFORE INSERT OR UPDATE OF first_name, last_name ON persons
+    FOR EACH ROW EXECUTE FUNCTION persons_set_full_name()
+    """
+)
+
 
 class Person(Base):
+    __table_args__ = (
+        # Триграммный индекс для поиска по подстроке и похожести (pg_trgm)
+        Index(
+            "ix_persons_full_name_trgm",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+    )
+
     first_name: Mapped[str] = mapped_column(
         String(255),
         nullable=False,
@@ -14,6 +43,12 @@ class Person(Base):
         String(255),
         nullable=False,
     )
+    full_name: Mapped[str] = mapped_column(
+        String(511),
+        nullable=True,
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
+    )
     image_url: Mapped[str] = mapped_column(
         String(255),
         nullable=False,
@@ -22,3 +57,15 @@ class Person(Base):
         ForeignKey("departments.id"),
         nullable=False,
     )
+
+
+event.listen(
+    Person.__table__,
+    "after_create",
+    FULL_NAME_FUNCTION.execute_if(dialect="postgresql"),
+)
+event.listen(
+    Person.__table__,
+    "after_create",
+    FULL_NAME_TRIGGER.execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,24 @@
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class StoredFile(Base):
+    sha256: Mapped[str] = mapped_column(
+        String(64),
+        unique=True,
+        index=True,
+    )
+    path: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+    )
+    size: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+    )
+    ref_count: Mapped[int] = mapped_column(
+        default=1,
+        server_default="1",
+    )
@@ -1,4 +1,5 @@
 __all__ = [
+    "CountStrategy",
     "DataResponse",
     "ListResponse",
     "PaginatedListResponse",
@@ -7,6 +8,7 @@ __all__ = [
 ]
 
 from .response import (
+    CountStrategy,
     DataResponse,
     ListResponse,
     PaginatedListResponse,
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class BulkInsertResult(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+
+class BulkUpdateResult(BaseModel):
+    updated: int = 0
+    skipped: int = 0
+    batch_rowcounts: list[int] = []
@@ -0,0 +1,34 @@
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel, computed_field
+
+from app.core.config import settings
+
+
+class ExportStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class ExportJobRead(BaseModel):
+    job_id: str
+    status: ExportStatus
+    rows: int = 0
+    images: int = 0
+    failed_images: int = 0
+    created_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
+
+    @computed_field
+    @property
+    def download_url(self) -> str | None:
+        if self.status != ExportStatus.DONE:
+            return None
+        return (
+            f"{settings.api.prefix}{settings.api.v1.prefix}{settings.api.v1.exports}"
+            f"/{self.job_id}/download"
+        )
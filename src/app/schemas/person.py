@@ -1,10 +1,28 @@
 
-from pydantic import BaseModel
+from typing import Literal
 
+from pydantic import BaseModel, computed_field
+
+from app.core.services.image_variants import MEDIUM, THUMBNAIL, variant_url
+from app.core.utils.spreadsheet import SpreadsheetFormat
 from app.schemas.department import DepartmentRead
 from app.schemas.role import RoleRead
 
 
+class PersonImageVariants(BaseModel):
+    """URL превью и среднего размера, вычисляются из `image_url`."""
+
+    @computed_field
+    @property
+    def thumbnail_url(self) -> str:
+        return variant_url(self.image_url, THUMBNAIL)
+
+    @computed_field
+    @property
+    def medium_url(self) -> str:
+        return variant_url(self.image_url, MEDIUM)
+
+
 class PersonBase(BaseModel):
     first_name: str
     last_name: str
@@ -16,7 +34,7 @@ class PersonCreate(PersonBase):
     pass
 
 
-class PersonRead(PersonBase):
+class PersonRead(PersonBase, PersonImageVariants):
     id: int
     #department: DepartmentRead
     
@@ -30,12 +48,17 @@ class PersonFilter(PersonBase):
     image_url : str | None = None
     department_id : int | None = None
 
+class PersonSearchFilter(BaseModel):
+    department_id: int | None = None
+    role_id: int | None = None
+
+
 class PersonUpdate(BaseModel):
     first_name: str | None = None
     last_name: str | None = None
     department_id: int | None = None
 
-class PersonFullRead(BaseModel):
+class PersonFullRead(PersonImageVariants):
     id: int
     first_name: str
     last_name: str
@@ -51,6 +74,23 @@ class PersonExcel(BaseModel):
     department: str
     created_at: str
     extented_at: str
+    updated_at: str | None = None
+
+ExportColumn = Literal[
+    "id",
+    "first_name",
+    "last_name",
+    "department",
+    "created_at",
+    "extented_at",
+]
+
+class PersonExportSpec(BaseModel):
+    """Параметры выгрузки: передаются в задачу воркера вместо самих строк."""
+    department_id: int | None = None
+    role_id: int | None = None
+    columns: list[ExportColumn] | None = None
+    format: SpreadsheetFormat = "xlsx"
 
 class PersonImport(BaseModel):
     id: int
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Generic, Optional, TypeVar
 
 from pydantic import BaseModel
@@ -12,6 +13,13 @@ class DataResponse(BaseModel, Generic[SchemaType]):
 class ListResponse(BaseModel, Generic[SchemaType]):
     data: list[SchemaType]
     total: int
+    next_cursor: Optional[str] = None
+
+
+class CountStrategy(str, Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    CACHED = "cached"
 
 
 class Pagination(BaseModel):
@@ -19,6 +27,9 @@ class Pagination(BaseModel):
     items_per_page: Optional[int] = None
     total: Optional[int] = None
     total_pages: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class PaginatedListResponse(BaseModel, Generic[SchemaType]):
@@ -28,25 +39,29 @@ class PaginatedListResponse(BaseModel, Generic[SchemaType]):
 
 def get_pagination(
     total_count: int,
-    page: int,
+    page: int | None,
     page_size: int,
+    count_strategy: CountStrategy = CountStrategy.EXACT,
 ) -> Pagination:
     """
     Создает объект пагинации на основе общего количества элементов, текущей страницы и размера страницы.
 
     Args:
         total_count: Общее количество элементов
-        page: Текущая страница
+        page: Текущая страница (None в режиме курсора)
         page_size: Размер страницы
+        count_strategy: Стратегия, которой был получен total_count
 
     Returns:
-        Pagination: Объект с информацией о пагинации
+        Pagination: Объект с информацией о пагинации; курсоры keyset-пагинации
+        добавляет вызывающий код
     """
 
     return Pagination(
         page=page,
         items_per_page=page_size,
         total=total_count or 0,
+        total_is_estimate=count_strategy == CountStrategy.ESTIMATE,
         total_pages=total_count // page_size
         + (1 if total_count % page_size > 0 else 0),
     )
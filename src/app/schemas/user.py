@@ -58,6 +58,10 @@ class UserUpdateInternal(UserUpdate):
     tier_id: int | None = None
 
 
+class UserPasswordUpdate(BaseModel):
+    hashed_password: str
+
+
 class UserFilter(BaseModel):
     id: Optional[int] = None
     name: Optional[str] = None
@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.core.utils.create_zip import export_headers, export_row
+from app.core.utils.spreadsheet import write_spreadsheet
+from app.schemas.person import PersonExcel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def fake_person(person_id: int) -> PersonExcel:
+    return PersonExcel(
+        id=person_id,
+        first_name=f"имя{person_id}",
+        last_name=f"фамилия{person_id}",
+        image_url=f"storage/persons/{person_id}.jpg",
+        department=f"Agro/role/DEPARTMENT{person_id % 50}",
+        created_at="2025/01/01 00:00:00",
+        extented_at="2035/01/01 00:00:00",
+    )
+
+
+async def fake_rows(count: int):
+    for person_id in range(1, count + 1):
+        yield export_row(fake_person(person_id))
+
+
+async def pandas_export(path: str, count: int) -> None:
+    # Прежний путь: список dict -> DataFrame -> to_excel
+    import pandas as pd
+
+    headers = export_headers()
+    rows = [dict(zip(headers, row)) async for row in fake_rows(count)]
+    df = pd.DataFrame(rows, columns=headers)
+    df.to_excel(path, index=False)
+
+
+async def streaming_export(path: str, count: int, format: str) -> None:
+    await write_spreadsheet(path, export_headers(), fake_rows(count), format=format)
+
+
+async def measure(name: str, export, path: str) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    await export(path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = os.path.getsize(path)
+    logger.info(
+        f"{name:<10} {elapsed:8.2f} s  peak {peak / 1024 / 1024:8.1f} MB  file {size / 1024 / 1024:6.1f} MB"
+    )
+
+
+async def main(count: int) -> None:
+    logger.info(f"Строк: {count}")
+    with tempfile.TemporaryDirectory() as directory:
+        await measure(
+            "pandas",
+            lambda path: pandas_export(path, count),
+            os.path.join(directory, "pandas.xlsx"),
+        )
+        await measure(
+            "xlsx",
+            lambda path: streaming_export(path, count, "xlsx"),
+            os.path.join(directory, "streaming.xlsx"),
+        )
+        await measure(
+            "csv",
+            lambda path: streaming_export(path, count, "csv"),
+            os.path.join(directory, "streaming.csv"),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Сравнение выгрузки таблицы через pandas и построчной записи",
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    asyncio.run(main(parser.parse_args().rows))
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import SOURCE_DIR
 from app.core.db import db_helper
+from app.dao import OnConflict
 from app.dao.department import DepartmentDAO
 from app.schemas.department import DepartmentCreate, DepartmentFilter
 
@@ -18,21 +19,30 @@ async def create_departments(session: AsyncSession) -> None:
         DEPARTMENTS_JSON_PATH = f"{SOURCE_DIR}/data/departments.json"
         with open(DEPARTMENTS_JSON_PATH, encoding="utf-8") as file:
             departments = json.load(file)
-        departments_count = await DepartmentDAO.count(
+        departments_count, _ = await DepartmentDAO.count(
             session=session,
             filters=DepartmentFilter(),
         )
         if departments_count > 0:
             logger.info("Departments already exist.")
             return
-        for department in departments:
-            await DepartmentDAO.add(
-                session=session,
-                values=DepartmentCreate(
+        result = await DepartmentDAO.bulk_insert(
+            session=session,
+            instances=[
+                DepartmentCreate(
                     name=department["name"],
                     role_id=department["role_id"],
-                ),
-            )
+                )
+                for department in departments
+            ],
+            on_conflict=OnConflict.SKIP,
+            conflict_fields=["name"],
+        )
+        logger.info(
+            "Departments imported: %s inserted, %s skipped",
+            result.inserted,
+            result.skipped,
+        )
 
         await session.commit()
 
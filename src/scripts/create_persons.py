@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import SOURCE_DIR
 from app.core.db import db_helper
+from app.dao import OnConflict
 from app.dao.person import PersonDAO
 from app.schemas.person import PersonFilter, PersonImport
 
@@ -18,24 +19,33 @@ async def create_persons(session: AsyncSession) -> None:
         PERSONS_JSON_PATH = f"{SOURCE_DIR}/data/persons.json"
         with open(PERSONS_JSON_PATH, encoding="utf-8") as file:
             people = json.load(file)
-        people_count = await PersonDAO.count(
+        people_count, _ = await PersonDAO.count(
             session=session,
             filters=PersonFilter(),
         )
         if people_count > 0:
             logger.info("People already exist.")
             return
-        for person in people:
-            await PersonDAO.add(
-                session=session,
-                values=PersonImport(
+        result = await PersonDAO.bulk_insert(
+            session=session,
+            instances=[
+                PersonImport(
                     id=person["person_id"],
                     first_name=person["first_name"],
                     last_name=person["last_name"],
                     image_url=f'storage/persons/{person["image"].split("/")[-1]}',
-                    department_id=person["department_id"]
-                ),
-            )
+                    department_id=person["department_id"],
+                )
+                for person in people
+            ],
+            on_conflict=OnConflict.SKIP,
+            conflict_fields=["id"],
+        )
+        logger.info(
+            "Persons imported: %s inserted, %s skipped",
+            result.inserted,
+            result.skipped,
+        )
 
         await session.commit()
 
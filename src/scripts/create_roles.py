@@ -18,7 +18,7 @@ async def create_roles(session: AsyncSession) -> None:
         ROLES_JSON_PATH = f"{SOURCE_DIR}/data/roles.json"
         with open(ROLES_JSON_PATH, encoding="utf-8") as file:
             roles = json.load(file)
-        roles_count = await RoleDAO.count(
+        roles_count, _ = await RoleDAO.count(
             session=session,
             filters=RoleFilter(),
         )
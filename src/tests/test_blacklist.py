@@ -0,0 +1,121 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.auth.blacklist import BloomFilter, token_blacklist
+from app.core.utils import redis_client
+from app.dao.token_blacklist import TokenBlacklistDAO
+
+CAPACITY = 1000
+ERROR_RATE = 0.01
+PROBES = 10000
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    jtis = [f"jti-{i}" for i in range(1000)]
+
+    for jti in jtis:
+        bloom.add(jti)
+
+    assert all(jti in bloom for jti in jtis)
+
+
+def test_bloom_filter_false_positive_rate() -> None:
+    bloom = BloomFilter(capacity=CAPACITY, error_rate=ERROR_RATE)
+    for i in range(CAPACITY):
+        bloom.add(f"jti-{i}")
+
+    false_positives = sum(f"other-{i}" in bloom for i in range(PROBES))
+
+    # Запас в 3 раза от расчетной доли ложных срабатываний
+    assert false_positives < PROBES * ERROR_RATE * 3
+
+
+class FakeRedis:
+    def __init__(self, keys: set[str]) -> None:
+        self.keys = keys
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.keys)
+
+
+@pytest.fixture
+def blacklist(monkeypatch):
+    monkeypatch.setattr(token_blacklist, "bloom", BloomFilter(CAPACITY, ERROR_RATE))
+    monkeypatch.setattr(token_blacklist, "synced", True)
+    monkeypatch.setattr(redis_client, "client", None)
+    return token_blacklist
+
+
+@pytest.fixture
+def postgres(monkeypatch):
+    """Записи черного списка в Postgres; `queries` - JTI, за которыми туда ходили."""
+    rows: dict[str, bool] = {}
+    queries: list[str] = []
+
+    async def get_token_by_jti(session, jti: str):
+        queries.append(jti)
+        if jti not in rows:
+            return None
+        return SimpleNamespace(jti=jti, is_blacklisted=rows[jti])
+
+    monkeypatch.setattr(TokenBlacklistDAO, "get_token_by_jti", get_token_by_jti)
+    return SimpleNamespace(rows=rows, queries=queries)
+
+
+def is_blacklisted(jti: str) -> bool:
+    return asyncio.run(TokenBlacklistDAO.is_token_blacklisted(session=None, jti=jti))
+
+
+def test_filter_miss_does_not_query_postgres(blacklist, postgres) -> None:
+    postgres.rows["jti"] = True
+
+    assert is_blacklisted("jti") is False
+    assert postgres.queries == []
+
+
+def test_unsynced_cache_defers_to_postgres(blacklist, postgres, monkeypatch) -> None:
+    # До первой пересборки в Redis нет ключей для ранее отозванных JTI
+    monkeypatch.setattr(blacklist, "synced", False)
+    monkeypatch.setattr(redis_client, "client", FakeRedis(set()))
+    postgres.rows["jti"] = True
+
+    assert is_blacklisted("jti") is True
+    assert postgres.queries == ["jti"]
+
+
+def test_filter_hit_is_confirmed_by_redis(blacklist, postgres, monkeypatch) -> None:
+    monkeypatch.setattr(redis_client, "client", FakeRedis({"blacklist:revoked"}))
+    blacklist.bloom.add("revoked")
+    blacklist.bloom.add("false-positive")
+
+    assert is_blacklisted("revoked") is True
+    assert is_blacklisted("false-positive") is False
+    assert postgres.queries == []
+
+
+def test_filter_hit_without_redis_queries_postgres(blacklist, postgres) -> None:
+    blacklist.bloom.add("jti")
+    postgres.rows["jti"] = True
+
+    assert is_blacklisted("jti") is True
+    assert is_blacklisted("missing") is False
+    assert postgres.queries == ["jti"]
+
+
+def test_rebuild_keeps_jti_published_during_load(blacklist, monkeypatch) -> None:
+    expires_at = datetime.now(UTC) + timedelta(hours=1)
+
+    async def load_active(now: datetime) -> list[tuple[str, datetime]]:
+        # Сообщение pub/sub о JTI, закоммиченном после выборки
+        blacklist._remember("late")
+        return [("stored", expires_at)]
+
+    monkeypatch.setattr(blacklist, "_load_active", load_active)
+    asyncio.run(blacklist.rebuild())
+
+    assert "stored" in blacklist.bloom
+    assert "late" in blacklist.bloom
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from app.core.config import CaptchaSettings
+from app.core.services.captcha import SERVER_ERROR, CaptchaClient, CircuitState
+
+SERVICE_UNAVAILABLE = 503
+FAILURE_THRESHOLD = 2
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Поведение задает тест через атрибуты сервера
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        self.server.requests.append(form)
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        if self.server.status_code >= SERVER_ERROR:
+            self.send_response(self.server.status_code)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        token = form["token"][0]
+        payload = self.server.payload or {
+            "status": "ok" if token.startswith("good") else "failed"
+        }
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.requests = []
+    server.delay = 0.0
+    server.status_code = 200
+    server.payload = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(server, **overrides) -> CaptchaClient:
+    options = dict(
+        URL=f"http://127.0.0.1:{server.server_address[1]}/validate",
+        CONNECT_TIMEOUT=0.5,
+        TIMEOUT=0.5,
+        MAX_CONNECTIONS=4,
+        MAX_KEEPALIVE_CONNECTIONS=4,
+        FAILURE_THRESHOLD=FAILURE_THRESHOLD,
+        RECOVERY_TIMEOUT=60.0,
+        FAIL_OPEN=False,
+        REPLAY_CACHE_TTL=60.0,
+        REPLAY_CACHE_SIZE=100,
+    )
+    options.update(overrides)
+    return CaptchaClient(CaptchaSettings(**options), secret="secret")
+
+
+async def verify_all(client: CaptchaClient, *tokens: str) -> list[bool]:
+    await client.start()
+    try:
+        return [await client.verify(token, ip="10.0.0.1") for token in tokens]
+    finally:
+        await client.close()
+
+
+def test_verify_accepts_valid_and_rejects_invalid_token(stub_server) -> None:
+    client = make_client(stub_server)
+
+    assert asyncio.run(verify_all(client, "good-1", "bad-1")) == [True, False]
+    assert stub_server.requests[0] == {
+        "secret": ["secret"],
+        "token": ["good-1"],
+        "ip": ["10.0.0.1"],
+    }
+
+
+def test_replayed_token_is_rejected_without_request(stub_server) -> None:
+    client = make_client(stub_server)
+
+    assert asyncio.run(verify_all(client, "good-1", "good-1")) == [True, False]
+    assert len(stub_server.requests) == 1
+    assert client.stats.replays == 1
+
+
+def test_breaker_opens_after_timeouts_and_fails_closed(stub_server) -> None:
+    stub_server.delay = 1.0
+    client = make_client(stub_server, TIMEOUT=0.2)
+
+    assert asyncio.run(verify_all(client, "good-1", "good-2", "good-3")) == [False] * 3
+    assert client.breaker.state == CircuitState.OPEN
+    assert client.stats.errors == FAILURE_THRESHOLD
+    assert client.stats.short_circuited == 1
+
+
+def test_fail_open_accepts_while_service_is_down(stub_server) -> None:
+    stub_server.status_code = SERVICE_UNAVAILABLE
+    client = make_client(stub_server, FAIL_OPEN=True)
+
+    assert asyncio.run(verify_all(client, "bad-1", "bad-2", "bad-3")) == [True] * 3
+    assert len(stub_server.requests) == FAILURE_THRESHOLD
+
+
+def test_half_open_trial_closes_breaker(stub_server) -> None:
+    stub_server.status_code = SERVICE_UNAVAILABLE
+    client = make_client(stub_server, RECOVERY_TIMEOUT=0.1)
+
+    async def scenario() -> list[bool]:
+        await client.start()
+        try:
+            results = [await client.verify("good-1"), await client.verify("good-2")]
+            stub_server.status_code = 200
+            await asyncio.sleep(0.15)
+            results.append(await client.verify("good-3"))
+            return results
+        finally:
+            await client.close()
+
+    assert asyncio.run(scenario()) == [False, False, True]
+    assert client.breaker.state == CircuitState.CLOSED
+
+
+def test_unexpected_body_counts_as_failure(stub_server) -> None:
+    stub_server.payload = ["ok"]
+    client = make_client(stub_server)
+
+    assert asyncio.run(verify_all(client, "good-1")) == [False]
+    assert client.stats.errors == 1
+    assert client.breaker.failures == 1
+
+
+def test_cancelled_trial_releases_half_open_breaker(stub_server) -> None:
+    stub_server.status_code = SERVICE_UNAVAILABLE
+    client = make_client(stub_server, RECOVERY_TIMEOUT=0.1)
+
+    async def scenario() -> bool:
+        await client.start()
+        try:
+            await client.verify("good-1")
+            await client.verify("good-2")
+            await asyncio.sleep(0.15)
+            stub_server.status_code = 200
+            stub_server.delay = 0.3
+            # Пробный запрос отменяется, не дождавшись ответа
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.verify("good-3"), timeout=0.05)
+            stub_server.delay = 0.0
+            return await client.verify("good-4")
+        finally:
+            await client.close()
+
+    assert asyncio.run(scenario()) is True
+    assert client.breaker.state == CircuitState.CLOSED
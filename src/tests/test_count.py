@@ -0,0 +1,59 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.dao.role import RoleDAO
+from app.models import Role
+from app.schemas import CountStrategy
+from app.schemas.response import get_pagination
+from app.schemas.role import RoleFilter
+
+ROLES = ["admin", "manager", "viewer"]
+
+
+def count_roles(tmp_path, strategy: CountStrategy) -> tuple[int, CountStrategy]:
+    async def scenario() -> tuple[int, CountStrategy]:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Role.__table__.create)
+        maker = async_sessionmaker(bind=engine, expire_on_commit=False)
+        try:
+            async with maker() as session:
+                session.add_all(Role(name=name) for name in ROLES)
+                await session.flush()
+                return await RoleDAO.count(
+                    session=session,
+                    filters=RoleFilter(),
+                    strategy=strategy,
+                )
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(scenario())
+
+
+def test_estimate_without_statistics_is_reported_as_exact(
+    tmp_path, monkeypatch
+) -> None:
+    async def no_statistics(session, filter_dict):
+        return None
+
+    monkeypatch.setattr(RoleDAO, "_estimate_count", no_statistics)
+
+    count, strategy = count_roles(tmp_path, CountStrategy.ESTIMATE)
+
+    assert (count, strategy) == (len(ROLES), CountStrategy.EXACT)
+    pagination = get_pagination(count, page=1, page_size=2, count_strategy=strategy)
+    assert not pagination.total_is_estimate
+
+
+def test_estimate_is_reported_as_estimate(tmp_path, monkeypatch) -> None:
+    async def estimate(session, filter_dict):
+        return 100
+
+    monkeypatch.setattr(RoleDAO, "_estimate_count", estimate)
+
+    assert count_roles(tmp_path, CountStrategy.ESTIMATE) == (
+        100,
+        CountStrategy.ESTIMATE,
+    )
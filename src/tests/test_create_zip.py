@@ -0,0 +1,45 @@
+import asyncio
+import contextlib
+
+from app.core.utils import create_zip
+from app.dao.person import PersonDAO
+from app.schemas.person import PersonExcel, PersonExportSpec
+
+
+def test_session_is_released_before_entries_are_streamed(monkeypatch) -> None:
+    people = [
+        PersonExcel(
+            id=index,
+            first_name="Иван",
+            last_name="Петров",
+            image_url=f"storage/persons/{index}.jpg",
+            department="Отдел",
+            created_at="2025-01-01",
+            extented_at="2026-01-01",
+        )
+        for index in range(1, 4)
+    ]
+    events = []
+
+    @contextlib.asynccontextmanager
+    async def session_factory():
+        events.append("open")
+        yield None
+        events.append("close")
+
+    async def stream_persons_excel(session, department_id=None, role_id=None):
+        for person in people:
+            yield person
+
+    monkeypatch.setattr(create_zip.db_helper, "session_factory", session_factory)
+    monkeypatch.setattr(PersonDAO, "stream_persons_excel", stream_persons_excel)
+
+    async def collect() -> None:
+        async for entry in create_zip.person_export_entries(PersonExportSpec()):
+            events.append(entry.arcname)
+
+    asyncio.run(collect())
+
+    assert events[:2] == ["open", "close"]
+    assert events[-1] == f"{create_zip.SHEET_NAME}.xlsx"
+    assert len(events) == len(people) + 3
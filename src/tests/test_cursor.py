@@ -0,0 +1,23 @@
+import pytest
+
+from app.core.utils.cursor import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip() -> None:
+    payload = {
+        "k": "created_at",
+        "v": "2025-08-04T20:25:00+00:00",
+        "id": 42,
+        "d": "next",
+    }
+
+    cursor = encode_cursor(payload)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == payload
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor!", "W10", ""])
+def test_decode_invalid_cursor(cursor: str) -> None:
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,32 @@
+import os
+import time
+
+from app.core.services import export_cache
+from app.core.services.export_cache import ExportCache
+from app.core.services.export_jobs import remove_expired_exports
+from app.schemas.person import PersonExportSpec
+
+DAY = 24 * 60 * 60
+
+
+def test_materialized_archive_outlives_old_cache(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(export_cache, "export_dir", lambda: str(tmp_path))
+    monkeypatch.setattr(
+        "app.core.services.export_jobs.export_dir", lambda: str(tmp_path)
+    )
+    cache = ExportCache(PersonExportSpec())
+    os.makedirs(os.path.dirname(cache.archive_path))
+    with open(cache.archive_path, "wb") as file:
+        file.write(b"zip")
+    # Кеш собран почти сутки назад
+    old = time.time() - DAY + 60
+    os.utime(cache.archive_path, (old, old))
+
+    destination = str(tmp_path / "job.zip")
+    cache.materialize(destination)
+
+    assert os.path.getmtime(destination) > old
+    # Через пару минут архив задачи, созданный только что, еще не истек
+    monkeypatch.setattr(time, "time", lambda: old + DAY + 60)
+    assert remove_expired_exports(DAY) == 0
+    assert os.path.isfile(destination)
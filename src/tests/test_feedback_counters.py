@@ -0,0 +1,161 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.services.feedback_counters import (
+    FLUSHING_KEY,
+    PENDING_KEY,
+    _parse,
+    flush_votes,
+    merge_pending,
+    votes_count,
+)
+from app.core.services.leaderboard import etag_matches, make_etag
+from app.dao.branch import BranchDAO
+from app.dao.feedback_flush import FeedbackFlushDAO
+from app.schemas.branch import BranchRead
+
+
+def test_merge_pending_recomputes_counts_and_rating() -> None:
+    branch = BranchRead(
+        id=1,
+        name="branch",
+        rating_1_count=1,
+        rating_2_count=0,
+        rating_3_count=0,
+        rating_4_count=0,
+        rating_5_count=1,
+        rating=3,
+    )
+    pending = _parse({b"1:5": b"2", b"2:1": b"4"}, _parse({b"1:5": b"1"}))
+
+    merged = merge_pending(branch, pending)
+
+    assert pending == {1: [0, 0, 0, 0, 3], 2: [4, 0, 0, 0, 0]}
+    assert merged.rating_5_count == branch.rating_5_count + pending[1][4]
+    assert votes_count(merged) == votes_count(branch) + sum(pending[1])
+    assert merged.rating == (1 + 5 * 4) / 5
+    assert merge_pending(branch, {}) is branch
+
+
+def test_etag_matches() -> None:
+    etag = make_etag(b'{"data":[],"total":0}')
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+class FakeRedis:
+    """Ключи и хеши в словаре; `fail_delete` - обрыв связи сразу после коммита."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, object] = {}
+        self.fail_delete = False
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.data)
+
+    async def rename(self, source: str, destination: str) -> None:
+        self.data[destination] = self.data.pop(source)
+
+    async def set(self, key: str, value: str, nx: bool = False) -> None:
+        if not (nx and key in self.data):
+            self.data[key] = value.encode()
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    async def hgetall(self, key: str) -> dict:
+        return dict(self.data.get(key, {}))
+
+    async def delete(self, *keys: str) -> None:
+        if self.fail_delete:
+            raise RedisConnectionError("connection lost")
+        for key in keys:
+            self.data.pop(key, None)
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    def __getattr__(self, name: str):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    async def execute(self) -> list:
+        return [
+            await getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.calls
+        ]
+
+
+@pytest.fixture
+def postgres(monkeypatch):
+    """Счетчики филиалов и отметки пачек, которые видны только после коммита."""
+    db = SimpleNamespace(counts={}, flushes=set(), staged=None)
+
+    async def mark_applied(session, flush_id: str) -> bool:
+        if flush_id in db.flushes:
+            return False
+        db.staged = (flush_id, None)
+        return True
+
+    async def apply_feedback_deltas(session, deltas) -> int:
+        db.staged = (db.staged[0], deltas)
+        return len(deltas)
+
+    async def remove_older_than(session, max_age: int) -> None:
+        pass
+
+    async def commit() -> None:
+        flush_id, deltas = db.staged
+        db.flushes.add(flush_id)
+        for branch_id, delta in deltas.items():
+            counts = db.counts.setdefault(branch_id, [0] * len(delta))
+            db.counts[branch_id] = [a + b for a, b in zip(counts, delta)]
+        db.staged = None
+
+    async def rollback() -> None:
+        db.staged = None
+
+    monkeypatch.setattr(FeedbackFlushDAO, "mark_applied", mark_applied)
+    monkeypatch.setattr(FeedbackFlushDAO, "remove_older_than", remove_older_than)
+    monkeypatch.setattr(BranchDAO, "apply_feedback_deltas", apply_feedback_deltas)
+    db.session = SimpleNamespace(commit=commit, rollback=rollback)
+    return db
+
+
+def test_flush_is_not_applied_twice_after_lost_cleanup(postgres) -> None:
+    redis = FakeRedis()
+    redis.data[PENDING_KEY] = {b"1:5": b"2"}
+
+    redis.fail_delete = True
+    with pytest.raises(RedisConnectionError):
+        asyncio.run(flush_votes(redis, postgres.session))
+    # Коммит прошел, а пачка осталась в Redis
+    assert postgres.counts == {1: [0, 0, 0, 0, 2]}
+    assert FLUSHING_KEY in redis.data
+
+    redis.fail_delete = False
+    assert asyncio.run(flush_votes(redis, postgres.session)) == 0
+    assert postgres.counts == {1: [0, 0, 0, 0, 2]}
+    assert redis.data == {}
+
+    redis.data[PENDING_KEY] = {b"1:1": b"1"}
+    assert asyncio.run(flush_votes(redis, postgres.session)) == 1
+    assert postgres.counts == {1: [1, 0, 0, 0, 2]}
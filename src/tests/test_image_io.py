@@ -0,0 +1,92 @@
+import asyncio
+import contextlib
+import io
+import zipfile
+
+from app.core.services.image_io import ERRORS_NAME, ImageReadStage
+from app.core.services.zip_stream import ZipEntry, stream_zip
+from app.core.utils import create_zip
+from app.dao.person import PersonDAO
+from app.schemas.person import PersonExcel, PersonExportSpec
+
+
+def test_image_read_stage_keeps_order_and_skips_missing_files(tmp_path) -> None:
+    paths = []
+    for index in range(10):
+        path = tmp_path / f"{index}.jpg"
+        path.write_bytes(bytes([index]) * 1000)
+        paths.append(path)
+    missing = tmp_path / "missing.jpg"
+    failed = []
+
+    async def on_error(entry: ZipEntry, error: Exception) -> None:
+        failed.append(entry.arcname)
+
+    async def entries():
+        for index, path in enumerate(paths):
+            yield ZipEntry(arcname=f"images/{index}.jpg", path=str(path))
+        yield ZipEntry(arcname="images/missing.jpg", path=str(missing))
+        yield ZipEntry(arcname="person.csv", write=lambda file: file.write(b"id\n"))
+
+    stage = ImageReadStage(workers=3, on_error=on_error)
+
+    async def collect() -> bytes:
+        return b"".join([chunk async for chunk in stream_zip(stage.run(entries()))])
+
+    archive = zipfile.ZipFile(io.BytesIO(asyncio.run(collect())))
+
+    names = archive.namelist()
+    assert names == [
+        *(f"images/{index}.jpg" for index in range(10)),
+        "person.csv",
+        ERRORS_NAME,
+    ]
+    assert archive.read("images/3.jpg") == paths[3].read_bytes()
+    assert "images/missing.jpg" in archive.read(ERRORS_NAME).decode()
+    assert failed == ["images/missing.jpg"]
+    assert stage.stats.files == len(paths)
+    assert stage.stats.failed == 1
+
+
+def test_sheet_entry_survives_read_ahead(tmp_path, monkeypatch) -> None:
+    people = []
+    for index in range(1, 4):
+        image = tmp_path / f"{index}.jpg"
+        image.write_bytes(bytes([index]) * 100)
+        people.append(
+            PersonExcel(
+                id=index,
+                first_name="Иван",
+                last_name=f"Петров{index}",
+                image_url=str(image),
+                department="Отдел",
+                created_at="2025-01-01",
+                extented_at="2026-01-01",
+            )
+        )
+
+    @contextlib.asynccontextmanager
+    async def session_factory():
+        yield None
+
+    async def stream_persons_excel(session, department_id=None, role_id=None):
+        for person in people:
+            yield person
+
+    monkeypatch.setattr(create_zip.db_helper, "session_factory", session_factory)
+    monkeypatch.setattr(PersonDAO, "stream_persons_excel", stream_persons_excel)
+    spec = PersonExportSpec(format="csv")
+    stage = ImageReadStage(workers=2)
+
+    async def collect() -> bytes:
+        chunks = stream_zip(stage.run(create_zip.person_export_entries(spec)))
+        return b"".join([chunk async for chunk in chunks])
+
+    archive = zipfile.ZipFile(io.BytesIO(asyncio.run(collect())))
+
+    assert archive.namelist()[-1] == f"{create_zip.SHEET_NAME}.csv"
+    assert (
+        len(archive.read(f"{create_zip.SHEET_NAME}.csv").splitlines())
+        == len(people) + 1
+    )
+    assert stage.stats.files == len(people)
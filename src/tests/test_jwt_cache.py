@@ -0,0 +1,61 @@
+import time
+
+import jwt
+import pytest
+
+from app.core.auth.utils import decode_jwt, encode_jwt, jwt_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_jwt_cache():
+    jwt_cache.clear()
+    yield
+    jwt_cache.clear()
+
+
+def test_decode_jwt_uses_cache() -> None:
+    token = encode_jwt({"sub": "1"})
+    hits = jwt_cache.stats.hits
+
+    first = decode_jwt(token)
+    second = decode_jwt(token)
+
+    assert first == second
+    assert first["sub"] == "1"
+    assert jwt_cache.stats.hits == hits + 1
+    assert len(jwt_cache) == 1
+
+
+def test_cached_payload_is_a_copy() -> None:
+    token = encode_jwt({"sub": "1"})
+    decode_jwt(token)["sub"] = "2"
+
+    assert decode_jwt(token)["sub"] == "1"
+
+
+def test_expired_entry_is_verified_again() -> None:
+    token = encode_jwt({"sub": "1"})
+    digest = jwt_cache.digest(token)
+    jwt_cache.set(digest, {"sub": "1", "exp": time.time() - 1})
+
+    assert jwt_cache.get(digest) is None
+    assert decode_jwt(token)["sub"] == "1"
+
+
+def test_invalid_token_is_not_cached() -> None:
+    with pytest.raises(jwt.InvalidTokenError):
+        decode_jwt("not-a-token")
+
+    assert len(jwt_cache) == 0
+
+
+def test_cache_is_bounded() -> None:
+    max_size = jwt_cache.max_size
+    jwt_cache.max_size = limit = 2
+    try:
+        for i in range(limit + 1):
+            decode_jwt(encode_jwt({"sub": str(i)}))
+    finally:
+        jwt_cache.max_size = max_size
+
+    assert len(jwt_cache) == limit
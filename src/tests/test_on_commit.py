@@ -0,0 +1,43 @@
+import asyncio
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.core.db import on_commit, on_rollback
+from app.core.db.session_maker import wait_after_commit
+
+
+def run_transaction(commit: bool) -> list[str]:
+    calls = []
+
+    async def record(name: str) -> None:
+        calls.append(name)
+
+    async def scenario() -> None:
+        engine = create_engine("sqlite://")
+        with Session(engine) as session:
+            session.execute(text("SELECT 1"))
+            on_commit(session, "counts", lambda: record("counts"))
+            # Повторная регистрация за транзакцию не дублирует сброс
+            on_commit(session, "counts", lambda: record("counts"))
+            on_commit(session, "search", lambda: record("search"))
+            on_rollback(session, "unlink", lambda: record("unlink"))
+            assert calls == []
+            if commit:
+                session.commit()
+            else:
+                session.rollback()
+            await wait_after_commit(session)
+            # Задача отката не ожидается явно; колбэки без await завершаются за один шаг
+            await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    return calls
+
+
+def test_callbacks_run_once_after_commit() -> None:
+    assert run_transaction(commit=True) == ["counts", "search"]
+
+
+def test_rollback_runs_only_rollback_callbacks() -> None:
+    assert run_transaction(commit=False) == ["unlink"]
@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+import bcrypt
+import pytest
+
+from app.core.auth.validation import authenticate_user
+from app.core.services.password_hasher import get_rounds, password_hasher
+from app.dao.user import UserDAO
+
+PASSWORD = "secret-password"
+# Минимальный cost bcrypt и следующий за ним, чтобы тест был быстрым
+OLD_ROUNDS = 4
+ROUNDS = 5
+
+
+def make_hash(rounds: int) -> str:
+    return bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=rounds)).decode()
+
+
+@pytest.fixture
+def users(monkeypatch):
+    """Пользователь в "БД" и записанные UserDAO.update."""
+    monkeypatch.setattr(password_hasher, "rounds", ROUNDS)
+    db = SimpleNamespace(user=None, updates=[])
+
+    async def find_one_or_none(session, filters):
+        return db.user
+
+    async def update(session, filters, values):
+        db.updates.append(values.hashed_password)
+        return 1
+
+    monkeypatch.setattr(UserDAO, "find_one_or_none", find_one_or_none)
+    monkeypatch.setattr(UserDAO, "update", update)
+    return db
+
+
+def login(password: str = PASSWORD):
+    return asyncio.run(
+        authenticate_user(phone_number="1", password=password, session=None)
+    )
+
+
+def test_get_rounds() -> None:
+    assert get_rounds(make_hash(OLD_ROUNDS)) == OLD_ROUNDS
+    assert get_rounds(make_hash(OLD_ROUNDS).encode()) == OLD_ROUNDS
+    assert get_rounds("plain-text") is None
+    assert get_rounds("$2b$12$") is None
+
+
+def test_needs_rehash(monkeypatch) -> None:
+    monkeypatch.setattr(password_hasher, "rounds", ROUNDS)
+
+    assert password_hasher.needs_rehash(make_hash(OLD_ROUNDS))
+    assert not password_hasher.needs_rehash(make_hash(ROUNDS))
+
+
+def test_login_upgrades_hash_with_lower_rounds(users) -> None:
+    users.user = SimpleNamespace(id=1, hashed_password=make_hash(OLD_ROUNDS))
+
+    assert login() is users.user
+    assert len(users.updates) == 1
+    assert get_rounds(users.updates[0]) == ROUNDS
+    assert bcrypt.checkpw(PASSWORD.encode(), users.updates[0].encode())
+
+
+def test_login_keeps_hash_with_current_rounds(users) -> None:
+    users.user = SimpleNamespace(id=1, hashed_password=make_hash(ROUNDS))
+
+    assert login() is users.user
+    assert users.updates == []
+
+
+def test_failed_login_does_not_rehash(users) -> None:
+    users.user = SimpleNamespace(id=1, hashed_password=make_hash(OLD_ROUNDS))
+
+    assert login("wrong-password") is None
+    assert users.updates == []
@@ -0,0 +1,23 @@
+import pytest
+
+from app.core.services.person_search import filter_ranked, similarity
+
+
+def test_similarity_matches_pg_trgm():
+    # SELECT similarity('word', 'two words') -> 0.36363637
+    assert similarity("word", "two words") == pytest.approx(4 / 11)
+    assert similarity("", "word") == 0.0
+    assert similarity("Ivan", "ivan") == 1.0
+
+
+def test_filter_ranked_narrows_prefix_results():
+    rows = [
+        (1, "ivan petrov", 0.4),
+        (2, "ivanna sidorova", 0.3),
+        (3, "petr ivanov", 0.3),
+    ]
+    ranked = filter_ranked(rows, "ivan p")
+    ids = [person_id for person_id, _, _ in ranked]
+    assert ids == [1, 3]
+    scores = [score for _, _, score in ranked]
+    assert scores == sorted(scores, reverse=True)
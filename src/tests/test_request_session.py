@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.dependencies.user import get_current_auth_user
+from app.api.v1.role import router as role_router
+from app.core.db.session_maker import session_manager
+from app.models import Role
+
+ROLES = ["admin", "manager"]
+
+
+class OneReplica:
+    """Реплика на той же базе: проверяет ветку get_read_session с отдельной сессией."""
+
+    def __init__(self, session_maker: async_sessionmaker) -> None:
+        self.session_maker = session_maker
+        self.opened = 0
+
+    async def open_session(self):
+        self.opened += 1
+        return self.session_maker()
+
+
+@pytest.fixture
+def session_maker(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+
+    async def prepare() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Role.__table__.create)
+        async with maker() as session:
+            session.add_all(Role(name=name) for name in ROLES)
+            await session.commit()
+
+    maker = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    asyncio.run(prepare())
+    monkeypatch.setattr(session_manager, "session_maker", maker)
+    monkeypatch.setattr(session_manager, "replicas", None)
+    yield maker
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def client(session_maker):
+    app = FastAPI()
+    app.include_router(role_router)
+    app.dependency_overrides[get_current_auth_user] = lambda: None
+    with TestClient(app) as client:
+        yield client
+
+
+def get_role_names(client: TestClient) -> list[str]:
+    response = client.get("/roles/get_all")
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.json()["total"] == len(ROLES)
+    return [role["name"] for role in response.json()["data"]]
+
+
+def test_read_route_serializes_rows_after_releasing_session(client) -> None:
+    assert get_role_names(client) == ROLES
+
+
+def test_read_route_on_replica_session(client, session_maker, monkeypatch) -> None:
+    replica = OneReplica(session_maker)
+    monkeypatch.setattr(session_manager, "replicas", replica)
+
+    assert get_role_names(client) == ROLES
+    assert replica.opened == 1
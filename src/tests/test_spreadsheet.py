@@ -0,0 +1,36 @@
+import asyncio
+import csv
+
+import pytest
+from openpyxl import load_workbook
+
+from app.core.utils.spreadsheet import write_spreadsheet
+
+HEADERS = ["Идентификатор", "Имя"]
+ROWS = [[1, "АЛИ"], [2, "ВАЛИ"], [3, "ОЛИ"]]
+
+
+async def rows():
+    for row in ROWS:
+        yield row
+
+
+@pytest.mark.parametrize("format", ["xlsx", "csv"])
+def test_write_spreadsheet(tmp_path, format: str) -> None:
+    path = tmp_path / f"person.{format}"
+
+    count = asyncio.run(
+        write_spreadsheet(str(path), HEADERS, rows(), format=format, batch_size=2)
+    )
+
+    assert count == len(ROWS)
+    if format == "xlsx":
+        sheet = load_workbook(path, read_only=True).active
+        written = [list(row) for row in sheet.iter_rows(values_only=True)]
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as file:
+            written = [
+                [int(row[0]) if row[0].isdigit() else row[0], row[1]]
+                for row in csv.reader(file)
+            ]
+    assert written == [HEADERS, *ROWS]
@@ -0,0 +1,28 @@
+import asyncio
+import io
+import zipfile
+
+from app.core.services.zip_stream import ZipEntry, stream_zip
+
+
+def test_stream_zip_stores_images_and_compresses_written_entries(tmp_path) -> None:
+    image = tmp_path / "image.jpg"
+    image.write_bytes(b"\xff\xd8\xff" + b"x" * 100_000)
+
+    async def entries():
+        yield ZipEntry(arcname="images/image.jpg", path=str(image))
+        yield ZipEntry(
+            arcname="person.csv",
+            write=lambda file: file.write(b"id\n1\n" * 1000),
+            compress=True,
+        )
+
+    async def collect() -> bytes:
+        return b"".join([chunk async for chunk in stream_zip(entries())])
+
+    archive = zipfile.ZipFile(io.BytesIO(asyncio.run(collect())))
+
+    assert archive.testzip() is None
+    assert archive.getinfo("images/image.jpg").compress_type == zipfile.ZIP_STORED
+    assert archive.getinfo("person.csv").compress_type == zipfile.ZIP_DEFLATED
+    assert archive.read("images/image.jpg") == image.read_bytes()